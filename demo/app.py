@@ -29,16 +29,8 @@ def process_image(image, mode, language):
         # Map language name to code
         lang_code = "id" if language == "Indonesian (Bahasa Indonesia)" else "en"
         
-        # Save temp image for the model (model expects a path)
-        temp_path = "temp_input.jpg"
-        image.save(temp_path)
-        
-        # Run detection
-        result = dara.detect(temp_path, mode, language=lang_code)
-        
-        # Clean up temp file
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+        # Run detection directly on the in-memory image (no temp file)
+        result = dara.detect(image, mode, language=lang_code)
             
         return result["result"], result["audio"]
 
@@ -92,7 +84,8 @@ with gr.Blocks(title="🪔 DARA - Detect & Assist Recognition AI", analytics_ena
                         Config.MODE_EMOTION, 
                         Config.MODE_MEDICINE, 
                         Config.MODE_CURRENCY, 
-                        Config.MODE_TEXT
+                        Config.MODE_TEXT,
+                        Config.MODE_AUTO
                     ],
                     value=Config.MODE_SCENE,
                     label="Select Mode",
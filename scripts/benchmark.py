@@ -1,12 +1,20 @@
 """
 DARA Benchmark Script
 Runs performance tests and generates research-quality statistics.
+
+Usage:
+    python scripts/benchmark.py
+    python scripts/benchmark.py --iterations 10 --save-baseline main
+    python scripts/benchmark.py --iterations 10 --compare main   # exits 1 on a regression
+    python scripts/benchmark.py --memory --iterations 50 --cache --audio   # peaks and leaks
 """
 
+import argparse
 import time
 import json
 import sys
 import os
+import tempfile
 from pathlib import Path
 from datetime import datetime
 from dataclasses import dataclass, asdict
@@ -16,6 +24,12 @@ import statistics
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+import torch
+
+from benchmark_gate import fingerprint, gate, machine_info, save_baseline
+from dara.services.metrics import model_memory_bytes
+from dara.utils.memory import MemoryProfiler, format_bytes, resident_memory_bytes
+
 
 @dataclass
 class BenchmarkResult:
@@ -27,6 +41,7 @@ class BenchmarkResult:
     result_length: int
     success: bool
     error: Optional[str] = None
+    timings: Optional[dict] = None
 
 
 @dataclass
@@ -44,13 +59,26 @@ class BenchmarkSummary:
     timestamp: str
     device: str
     model_id: str
+    cascade: Optional[dict] = None
+    stage_breakdown: Optional[dict] = None
+    quantization: str = "none"
+    machine: Optional[dict] = None
+    fingerprint: Optional[str] = None
+    # Milliseconds per request, per mode and stage (what baselines compare)
+    samples: Optional[dict] = None
+    # MemoryProfiler report plus load figures (with --memory)
+    memory: Optional[dict] = None
 
 
 def run_benchmark(
     image_paths: list,
     modes: list = None,
     iterations: int = 1,
-    warmup: int = 1
+    warmup: int = 1,
+    config=None,
+    profiler=None,
+    cache: bool = False,
+    audio: bool = False
 ) -> BenchmarkSummary:
     """
     Run comprehensive benchmark tests.
@@ -60,6 +88,11 @@ def run_benchmark(
         modes: List of modes to test (default: all)
         iterations: Number of iterations per image/mode
         warmup: Number of warmup runs
+        config: DARA Config (default: the global one)
+        profiler: MemoryProfiler to run every request under (slows
+            requests down; timings are then not comparable)
+        cache: Keep the inference cache on
+        audio: Generate TTS audio for every request
         
     Returns:
         BenchmarkSummary with statistics
@@ -72,10 +105,20 @@ def run_benchmark(
     
     # Initialize model
     print("\n📦 Loading DARA model...")
+    rss_before_load = resident_memory_bytes()
     start_load = time.time()
-    dara = DARA(enable_cache=False)  # Disable cache for accurate timing
+    dara = DARA(config=config, enable_cache=cache)  # Cache off by default for accurate timing
     load_time = time.time() - start_load
     print(f"   Model loaded in {load_time:.2f}s")
+    if profiler is not None:
+        load_memory = {
+            "rss_before_load": rss_before_load,
+            "rss_after_load": resident_memory_bytes(),
+            "model_bytes": model_memory_bytes(dara.model) if isinstance(dara.model, torch.nn.Module) else None
+        }
+        print(f"   RSS after load: {format_bytes(load_memory['rss_after_load'] or 0)} "
+              f"(+{format_bytes((load_memory['rss_after_load'] or 0) - (rss_before_load or 0))})")
+        profiler.start()
     print(f"   Device: {dara.device}")
     print(f"   Model: {dara.model_id}")
     
@@ -106,11 +149,15 @@ def run_benchmark(
             for i in range(iterations):
                 try:
                     start = time.perf_counter()
-                    result = dara.detect(
-                        img_path, 
-                        mode=mode, 
-                        generate_audio=False
-                    )
+                    if profiler is not None:
+                        result = profiler.detect(dara, img_path, mode=mode, generate_audio=audio)
+                    else:
+                        result = dara.detect(
+                            img_path, 
+                            mode=mode, 
+                            generate_audio=audio,
+                            return_timings=True
+                        )
                     elapsed = (time.perf_counter() - start) * 1000
                     
                     results.append(BenchmarkResult(
@@ -119,7 +166,8 @@ def run_benchmark(
                         inference_time_ms=elapsed,
                         confidence=result.get("confidence", 0),
                         result_length=len(result.get("result", "")),
-                        success=True
+                        success=True,
+                        timings=result.get("timings")
                     ))
                     
                     print(f"   ✓ {mode}: {elapsed:.1f}ms (conf: {result.get('confidence', 0):.2f})")
@@ -154,6 +202,25 @@ def run_benchmark(
                 "avg_confidence": statistics.mean(mode_confs)
             }
     
+    # Mean milliseconds per stage, per mode (see dara/utils/timing.py)
+    stage_breakdown = {}
+    samples = {}
+    for mode in modes:
+        per_stage = {}
+        for r in successful:
+            if r.mode == mode and r.timings:
+                for name, ms in r.timings.items():
+                    per_stage.setdefault(name, []).append(ms)
+        if per_stage:
+            stage_breakdown[mode] = {name: statistics.mean(values) for name, values in per_stage.items()}
+            samples[mode] = per_stage
+    machine = machine_info(dara.device)
+    
+    memory = None
+    if profiler is not None:
+        memory = {**load_memory, **profiler.report()}
+        profiler.stop()
+    
     summary = BenchmarkSummary(
         total_tests=len(results),
         successful_tests=len(successful),
@@ -166,7 +233,16 @@ def run_benchmark(
         mode_breakdown=mode_stats,
         timestamp=datetime.now().isoformat(),
         device=dara.device,
-        model_id=dara.model_id
+        # Stub runs never share baselines with the real model
+        model_id=dara.model_id if dara.backend == "florence2" else f"{dara.backend}:{dara.model_id}",
+        cascade=dara.cascade_stats,
+        stage_breakdown=stage_breakdown,
+        quantization=dara.config.inference.quantization,
+        machine=machine,
+        fingerprint=fingerprint(machine),
+        # Profiled timings include the profiler's own work
+        samples=samples if profiler is None else None,
+        memory=memory
     )
     
     # Print summary
@@ -185,10 +261,42 @@ def run_benchmark(
     print(f"\n📈 Mode Breakdown:")
     for mode, stats in mode_stats.items():
         print(f"   {mode}: {stats['avg_time_ms']:.1f}ms, conf={stats['avg_confidence']:.3f}")
+    if stage_breakdown:
+        print(f"\n🧩 Stage Breakdown (mean ms):")
+        for mode, stages in stage_breakdown.items():
+            parts = ", ".join(f"{name}={ms:.1f}" for name, ms in stages.items() if name != "total")
+            print(f"   {mode}: {parts}")
+    if memory:
+        print_memory(memory)
+    if summary.cascade:
+        cascade = summary.cascade
+        print(f"\n🪜 Cascade ({dara.cascade.model_id}):")
+        print(f"   Escalation rate: {cascade['escalation_rate']:.1%}")
+        print(f"   p50/p95/p99:     {cascade['p50_ms']:.1f} / {cascade['p95_ms']:.1f} / {cascade['p99_ms']:.1f} ms")
     
     return summary
 
 
+def print_memory(memory: dict) -> None:
+    """Print a MemoryProfiler report (see dara/utils/memory.py)."""
+    print(f"\n🧠 Memory (RSS now {format_bytes(memory['current']['rss'])}, "
+          f"after load {format_bytes(memory['rss_after_load'] or 0)})")
+    print(f"   {'Mode':<10} {'peak RSS':>10} {'peak py':>10} {'peak torch':>11} {'retained':>10} {'per req':>10}")
+    for mode, stats in memory["modes"].items():
+        print(f"   {mode:<10} {format_bytes(stats['peak_rss']):>10} {format_bytes(stats['peak_traced']):>10} "
+              f"{format_bytes(stats['peak_torch']):>11} {format_bytes(stats['retained_rss']):>10} "
+              f"{format_bytes(stats['retained_per_request_traced']):>10}")
+        stages = sorted(stats["stages"].items(), key=lambda item: item[1]["rss_peak"], reverse=True)[:3]
+        for name, stage in stages:
+            where = stage["top"][0]["where"] if stage["top"] else "-"
+            print(f"      {name:<22} peak RSS {format_bytes(stage['rss_peak']):>9}, "
+                  f"py {format_bytes(stage['traced_peak']):>9}  top: {where}")
+    if memory.get("top_growth"):
+        print(f"   Grew most since the first request:")
+        for entry in memory["top_growth"]:
+            print(f"      {format_bytes(entry['size_diff']):>9} in {entry['count_diff']} blocks  {entry['where']}")
+
+
 def save_results(summary: BenchmarkSummary, output_path: str):
     """Save benchmark results to JSON."""
     with open(output_path, "w") as f:
@@ -196,7 +304,36 @@ def save_results(summary: BenchmarkSummary, output_path: str):
     print(f"\n💾 Results saved to: {output_path}")
 
 
-if __name__ == "__main__":
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DARA")
+    parser.add_argument("--modes", default="scene,currency,text", help="Comma-separated modes")
+    parser.add_argument("--iterations", type=int, default=1, help="Runs per image and mode")
+    parser.add_argument("--warmup", type=int, default=1, help="Warmup runs")
+    parser.add_argument("--output", help="Results JSON (default: docs/benchmark_results.json)")
+    parser.add_argument("--save-baseline", metavar="NAME", help="Store this run as a named baseline")
+    parser.add_argument("--compare", metavar="NAME", help="Compare with a named baseline; exit 1 on a regression")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown that fails --compare")
+    parser.add_argument("--alpha", type=float, default=0.05, help="Significance level for --compare")
+    parser.add_argument("--backend", default="florence2", help="Model backend (stub: no weights needed)")
+    parser.add_argument("--stub-latency", default="generate=100,per_image=25",
+                        help="Stub delays in ms, e.g. generate=100,per_image=25")
+    parser.add_argument("--memory", action="store_true",
+                        help="Profile RSS, torch and Python memory per mode and stage (slows requests)")
+    parser.add_argument("--memory-top", type=int, default=5,
+                        help="Top allocating source lines per stage (0: skip tracemalloc snapshots)")
+    parser.add_argument("--cache", action="store_true", help="Keep the inference cache on")
+    parser.add_argument("--audio", action="store_true", help="Generate TTS audio for every request")
+    
+    args = parser.parse_args()
+    if args.memory and (args.save_baseline or args.compare):
+        parser.error("--memory slows requests down; don't combine it with --save-baseline or --compare")
+    
+    from dara import Config
+    from dara.config import parse_latency
+    config = Config()
+    config.model.backend = args.backend
+    config.model.stub_latency_ms = parse_latency(args.stub_latency)
+    
     # Find test images
     project_root = Path(__file__).parent.parent
     sample_dir = project_root / "sampleimages"
@@ -206,6 +343,14 @@ if __name__ == "__main__":
     for ext in ["*.jpg", "*.jpeg", "*.png"]:
         image_paths.extend(sample_dir.glob(ext))
     
+    if not image_paths and args.backend == "stub":
+        from benchmark_pipeline import synthetic_images
+        print("⚠️  No sample images found in sampleimages/, using synthetic ones")
+        image_dir = Path(tempfile.mkdtemp(prefix="dara_bench_"))
+        for index, data in enumerate(synthetic_images(5)):
+            (image_dir / f"synthetic_{index}.jpg").write_bytes(data)
+        image_paths = sorted(image_dir.glob("*.jpg"))
+    
     if not image_paths:
         print("⚠️  No sample images found in sampleimages/")
         print("   Creating a test with a placeholder...")
@@ -215,13 +360,27 @@ if __name__ == "__main__":
     if image_paths:
         summary = run_benchmark(
             image_paths=list(image_paths)[:5],  # Limit to 5 images
-            modes=["scene", "currency", "text"],
-            iterations=1,
-            warmup=1
+            modes=args.modes.split(","),
+            iterations=args.iterations,
+            warmup=args.warmup,
+            config=config,
+            profiler=MemoryProfiler(top_n=args.memory_top, snapshots=args.memory_top > 0) if args.memory else None,
+            cache=args.cache,
+            audio=args.audio
         )
         
         # Save results
-        output_path = project_root / "docs" / "benchmark_results.json"
+        output_path = args.output or project_root / "docs" / "benchmark_results.json"
         save_results(summary, str(output_path))
+        
+        run = asdict(summary)
+        if args.save_baseline:
+            print(f"💾 Baseline saved to: {save_baseline(args.save_baseline, run)}")
+        if args.compare:
+            sys.exit(gate(run, args.compare, args.threshold, args.alpha))
     else:
         print("\n📝 To run benchmarks, add images to sampleimages/ folder")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+DARA Cache Policy Benchmark
+Replays a synthetic request stream against InferenceCache under the same
+byte budget with each eviction policy, and reports hit rate, inference
+time saved and eviction reasons.
+
+The stream mixes small cheap results (emotion, scene) with large,
+expensive ones (OCR text); image popularity follows a Zipf distribution.
+
+Usage:
+    python scripts/benchmark_cache.py
+    python scripts/benchmark_cache.py --max-bytes 200000 --requests 50000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dara.services import InferenceCache
+from dara.services.cache import POLICIES
+
+# (mode, result text length range, inference milliseconds)
+PROFILES = [
+    ("emotion", (20, 60), 300),
+    ("scene", (60, 200), 450),
+    ("currency", (40, 120), 400),
+    ("text", (400, 4000), 1500),
+    ("medicine", (200, 1500), 1200),
+]
+
+
+def make_stream(requests: int, images: int, seed: int) -> list:
+    """(image id, mode, result, cost) per request, Zipf-popular images."""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(images)]
+    catalog = []
+    for image_id in range(images):
+        mode, (low, high), cost = rng.choice(PROFILES)
+        result = {
+            "mode": mode,
+            "result": "x" * rng.randint(low, high),
+            "confidence": rng.random(),
+            "metadata": {"count": rng.randint(0, 5)},
+            "suggestions": [],
+        }
+        catalog.append((str(image_id), mode, result, cost))
+    return rng.choices(catalog, weights=weights, k=requests)
+
+
+def replay(stream: list, policy: str, max_bytes: int, compact: bool) -> dict:
+    cache = InferenceCache(maxsize=len(stream), max_bytes=max_bytes, policy=policy, compact=compact)
+    saved_ms = 0.0
+    start = time.perf_counter()
+    for image_id, mode, result, cost in stream:
+        if cache.get(image_id, mode) is not None:
+            saved_ms += cost
+        else:
+            cache.set(image_id, mode, result, cost=cost)
+    overhead_us = (time.perf_counter() - start) * 1e6 / len(stream)
+    return {**cache.stats, "saved_s": saved_ms / 1000, "overhead_us": overhead_us}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare cache eviction policies")
+    parser.add_argument("--requests", type=int, default=20000, help="Requests to replay")
+    parser.add_argument("--images", type=int, default=5000, help="Distinct images")
+    parser.add_argument("--max-bytes", type=int, default=500_000, help="Cache byte budget")
+    parser.add_argument("--compact", action="store_true", help="Store compact payloads")
+    parser.add_argument("--seed", type=int, default=0, help="Stream seed")
+    
+    args = parser.parse_args()
+    stream = make_stream(args.requests, args.images, args.seed)
+    
+    print(f"🗄️  {args.requests} requests over {args.images} images, budget {args.max_bytes} bytes\n")
+    print(f"{'Policy':<8} {'hit rate':>9} {'saved s':>9} {'entries':>8} {'bytes':>9} {'us/op':>7}  evictions")
+    print("-" * 78)
+    for policy in POLICIES:
+        stats = replay(stream, policy, args.max_bytes, args.compact)
+        reasons = ", ".join(f"{k}={v}" for k, v in stats["eviction_reasons"].items() if v)
+        print(f"{policy:<8} {stats['hit_rate']:>9.1%} {stats['saved_s']:>9.0f} {stats['size']:>8} "
+              f"{stats['bytes']:>9} {stats['overhead_us']:>7.1f}  {reasons or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""
+DARA Cold-Start Benchmark
+Times a fresh process from spawn to its first detect result, step by
+step: interpreter start, imports (torch, transformers, dara), config,
+processor and weight loading (from_pretrained, .to(device)), mode setup,
+quantization, the first (warm-up) detect and a second, steady one.
+
+Each run is a new subprocess. Before a run the file-system cache is put
+in one of these states:
+    warm           files as the previous run left them (page cache hot)
+    cold-weights   model files evicted from the page cache
+    cold-all       model files and the torch/transformers/dara packages evicted
+
+Eviction uses posix_fadvise(DONTNEED), which needs no root but is
+advisory; --drop-caches additionally drops the whole page cache
+(root only) for the cold states.
+
+Usage:
+    python scripts/benchmark_coldstart.py
+    python scripts/benchmark_coldstart.py --runs 5 --states warm,cold-weights --quantization int8
+    python scripts/benchmark_coldstart.py --backend stub   # startup without weights
+"""
+
+import time
+_CHILD_START = time.time()
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+SRC = Path(__file__).parent.parent / "src"
+
+STATES = ("warm", "cold-weights", "cold-all")
+RESULT_MARKER = "COLDSTART_RESULT "
+
+# Steps in the order a process goes through them (ms, see child())
+STEPS = (
+    "interpreter", "import_torch", "import_transformers", "import_dara", "config",
+    "init/processor", "init/from_pretrained", "init/to_device", "init/modes", "init/tts",
+    "init/other", "quantization", "first_detect", "second_detect", "time_to_first_result"
+)
+
+
+def child(args) -> dict:
+    """One cold start, run inside the fresh process."""
+    steps = {"interpreter": (_CHILD_START - args.spawned_at) * 1000}
+    
+    def timed(name, fn):
+        start = time.perf_counter()
+        value = fn()
+        steps[name] = (time.perf_counter() - start) * 1000
+        return value
+    
+    torch = timed("import_torch", lambda: __import__("torch"))
+    timed("import_transformers", lambda: __import__("transformers"))
+    sys.path.insert(0, str(SRC))
+    timed("import_dara", lambda: __import__("dara"))
+    
+    from dara import DARA, Config
+    from dara.config import parse_latency
+    from dara.core.inference import quantize_model
+    from dara.utils.timing import StageTimer
+    
+    def make_config():
+        config = Config.from_env()
+        config.model.backend = args.backend
+        config.model.stub_latency_ms = parse_latency(args.stub_latency)
+        if args.model_id:
+            config.model.model_id = args.model_id
+        return config
+    config = timed("config", make_config)
+    
+    with StageTimer() as timer:
+        dara = DARA(config=config, enable_cache=False, enable_tts=args.tts, log_level="WARNING")
+    for name, ms in timer.to_dict().items():
+        if name != "total":
+            steps[f"init/{name}"] = ms
+    steps["init"] = timer.total_ms
+    
+    if args.quantization != "none" and isinstance(dara.model, torch.nn.Module):
+        dara.model = timed("quantization", lambda: quantize_model(dara.model, args.quantization, dara.device))
+    
+    image = load_image(args.image)
+    first = timed("first_detect", lambda: dara.detect(image, mode=args.mode, generate_audio=False, return_timings=True))
+    steps["time_to_first_result"] = (time.time() - args.spawned_at) * 1000
+    timed("second_detect", lambda: dara.detect(image, mode=args.mode, generate_audio=False))
+    
+    return {
+        "steps": {name: round(ms, 2) for name, ms in steps.items()},
+        "first_detect_stages": first.get("timings"),
+        "device": dara.device,
+        "model_id": dara.model_id,
+    }
+
+
+def load_image(path):
+    """The benchmark image, or a synthetic one."""
+    from PIL import Image
+    if path:
+        return Image.open(path).convert("RGB")
+    return Image.new("RGB", (768, 576), (90, 120, 160))
+
+
+def model_files(model_id: str) -> List[Path]:
+    """Files of a model's local Hugging Face snapshot (blobs behind the symlinks)."""
+    try:
+        from huggingface_hub import snapshot_download
+        snapshot = Path(snapshot_download(model_id, local_files_only=True))
+    except Exception as e:
+        print(f"   (no local snapshot of {model_id}: {type(e).__name__})")
+        return []
+    return [path.resolve() for path in snapshot.rglob("*") if path.is_file()]
+
+
+def package_files() -> List[Path]:
+    """Source and shared-library files of torch, transformers and dara."""
+    roots = [SRC / "dara"]
+    for name in ("torch", "transformers"):
+        try:
+            module = __import__(name)
+            roots.append(Path(module.__file__).parent)
+        except ImportError:
+            pass
+    return [path for root in roots for path in root.rglob("*") if path.suffix in (".py", ".pyc", ".so")]
+
+
+def evict(paths: List[Path]) -> int:
+    """Ask the kernel to drop files from the page cache; returns bytes advised."""
+    total = 0
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            total += os.fstat(fd).st_size
+        except (OSError, AttributeError):
+            pass
+        finally:
+            os.close(fd)
+    return total
+
+
+def drop_caches() -> bool:
+    """Drop the whole page cache (root only)."""
+    try:
+        os.sync()
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("3")
+        return True
+    except OSError:
+        return False
+
+
+def prepare(state: str, args, weights: List[Path], packages: List[Path]) -> None:
+    if state == "warm":
+        return
+    evicted = evict(weights)
+    if state == "cold-all":
+        evicted += evict(packages)
+    if args.drop_caches and not drop_caches():
+        print("   (--drop-caches needs root; using posix_fadvise only)")
+    print(f"   evicted ~{evicted / 1e6:.0f} MB from the page cache")
+
+
+def spawn(args) -> dict:
+    """Run one child process and return its result."""
+    command = [
+        sys.executable, str(Path(__file__).resolve()), "--child",
+        "--backend", args.backend, "--stub-latency", args.stub_latency,
+        "--mode", args.mode, "--quantization", args.quantization,
+    ]
+    for flag, value in (("--model-id", args.model_id), ("--image", args.image)):
+        if value:
+            command += [flag, value]
+    if args.tts:
+        command.append("--tts")
+    command += ["--spawned-at", repr(time.time())]
+    process = subprocess.run(command, capture_output=True, text=True, timeout=args.timeout)
+    for line in reversed(process.stdout.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    raise RuntimeError(f"Cold start failed (exit {process.returncode}):\n{process.stderr[-2000:]}")
+
+
+def summarize(runs: List[dict]) -> Dict[str, dict]:
+    """Median, min and max per step over runs."""
+    summary = {}
+    for step in sorted({name for run in runs for name in run["steps"]}, key=_step_order):
+        values = [run["steps"][step] for run in runs if step in run["steps"]]
+        summary[step] = {
+            "median_ms": round(statistics.median(values), 1),
+            "min_ms": round(min(values), 1),
+            "max_ms": round(max(values), 1),
+        }
+    return summary
+
+
+def _step_order(step: str) -> int:
+    return STEPS.index(step) if step in STEPS else STEPS.index("init/other") - 1
+
+
+def print_table(results: Dict[str, dict]) -> None:
+    states = list(results)
+    steps = sorted({step for state in states for step in results[state]}, key=_step_order)
+    print(f"\n{'Step (median ms)':<26}" + "".join(f"{state:>14}" for state in states))
+    print("-" * (26 + 14 * len(states)))
+    for step in steps:
+        if step == "init":
+            continue
+        row = "".join(
+            f"{results[state][step]['median_ms']:>14.1f}" if step in results[state] else f"{'-':>14}"
+            for state in states
+        )
+        print(f"{step:<26}{row}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DARA cold starts")
+    parser.add_argument("--states", default="warm,cold-weights,cold-all",
+                        help=f"Comma-separated file-system cache states ({', '.join(STATES)})")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh processes per state")
+    parser.add_argument("--mode", default="scene", help="Mode of the first detect")
+    parser.add_argument("--image", help="Image for the first detect (default: synthetic)")
+    parser.add_argument("--model-id", help="Model to load (default: config)")
+    parser.add_argument("--quantization", default="none", choices=("none", "fp16", "int8"),
+                        help="Quantize after loading, as InferenceEngine does")
+    parser.add_argument("--backend", default="florence2", help="Model backend (stub: no weights)")
+    parser.add_argument("--stub-latency", default="", help="Stub delays in ms, e.g. generate=100")
+    parser.add_argument("--tts", action="store_true", help="Initialize TTS as part of startup")
+    parser.add_argument("--drop-caches", action="store_true", help="Also drop the whole page cache (root)")
+    parser.add_argument("--timeout", type=float, default=900, help="Seconds per cold start")
+    parser.add_argument("--output", default="coldstart_results.json", help="JSON report path")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--spawned-at", type=float, help=argparse.SUPPRESS)
+    
+    args = parser.parse_args()
+    if args.child:
+        print(RESULT_MARKER + json.dumps(child(args)))
+        return
+    
+    states = [state.strip() for state in args.states.split(",") if state.strip()]
+    for state in states:
+        if state not in STATES:
+            parser.error(f"Invalid state '{state}'. Available: {', '.join(STATES)}")
+    
+    model_id = args.model_id
+    if model_id is None:
+        sys.path.insert(0, str(SRC))
+        from dara.config import Config
+        model_id = Config.from_env().model.model_id
+    weights = model_files(model_id) if args.backend == "florence2" else []
+    packages = package_files() if "cold-all" in states else []
+    
+    print("=" * 60)
+    print("DARA COLD-START BENCHMARK")
+    print("=" * 60)
+    print(f"Model: {model_id} ({args.backend}), {len(weights)} model files, quantization: {args.quantization}")
+    
+    results, raw = {}, {}
+    for state in states:
+        print(f"\n🧊 {state} ({args.runs} runs)")
+        runs = []
+        for index in range(args.runs):
+            prepare(state, args, weights, packages)
+            run = spawn(args)
+            runs.append(run)
+            steps = run["steps"]
+            print(f"   run {index + 1}: first result after {steps['time_to_first_result']:.0f} ms "
+                  f"(imports {steps['import_torch'] + steps['import_transformers'] + steps['import_dara']:.0f}, "
+                  f"init {steps['init']:.0f}, first detect {steps['first_detect']:.0f})")
+        raw[state] = runs
+        results[state] = summarize(runs)
+    
+    print_table(results)
+    
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "model_id": model_id,
+        "config": {k: v for k, v in vars(args).items() if k not in ("child", "spawned_at")},
+        "states": results,
+        "runs": raw,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+DARA Benchmark Gate
+Stores named latency baselines and fails when a new benchmark run is
+slower than its baseline.
+
+Baselines live in benchmarks/baselines/<name>/, one file per machine
+fingerprint, model and quantization, so a run is only ever compared with
+one from the same setup. Each mode's per-stage samples are compared with a
+one-sided Mann-Whitney U test and a bootstrap confidence interval on the
+ratio of medians; a stage regresses when it is significantly slower AND
+its median grew by more than --threshold (and --min-delta-ms).
+
+Usage:
+    python scripts/benchmark.py --save-baseline main
+    python scripts/benchmark.py --compare main --threshold 0.1
+    python scripts/benchmark_gate.py docs/benchmark_results.json --baseline main
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import platform
+import random
+import re
+import statistics
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from scipy.stats import mannwhitneyu
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+BASELINE_DIR = Path(__file__).parent.parent / "benchmarks" / "baselines"
+MIN_SAMPLES = 5
+
+# {mode: {stage: [milliseconds, ...]}}
+Samples = Dict[str, Dict[str, List[float]]]
+
+
+def machine_info(device: str = "cpu") -> dict:
+    """What makes timings from this box comparable with each other."""
+    cpu = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as f:
+            names = re.findall(r"^model name\s*:\s*(.+)$", f.read(), re.MULTILINE)
+        cpu = names[0].strip() if names else cpu
+    except OSError:
+        pass
+    info = {
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "cpu": cpu,
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "device": device,
+    }
+    try:
+        import torch
+        info["torch"] = torch.__version__
+        info["threads"] = torch.get_num_threads()
+        if device.startswith("cuda") and torch.cuda.is_available():
+            info["gpu"] = torch.cuda.get_device_name(0)
+    except ImportError:
+        pass
+    return info
+
+
+def fingerprint(info: dict) -> str:
+    """Short stable id of a machine_info() dict."""
+    return hashlib.sha1(json.dumps(info, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+
+def baseline_path(name: str, machine: str, model_id: str, quantization: str, root: Path = BASELINE_DIR) -> Path:
+    """File holding baseline 'name' for this machine, model and quantization."""
+    model = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_id)
+    return root / name / f"{machine}__{model}__{quantization}.json"
+
+
+def save_baseline(name: str, run: dict, root: Path = BASELINE_DIR) -> Path:
+    """
+    Store a benchmark run as baseline 'name'.
+    
+    Args:
+        name: Baseline name, e.g. "main"
+        run: Benchmark summary with fingerprint, model_id, quantization,
+            machine and samples
+        root: Baselines folder
+        
+    Returns:
+        Path written
+    """
+    path = baseline_path(name, run["fingerprint"], run["model_id"], run["quantization"], root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    baseline = {
+        "name": name,
+        "created": datetime.now().isoformat(),
+        "fingerprint": run["fingerprint"],
+        "model_id": run["model_id"],
+        "quantization": run["quantization"],
+        "machine": run.get("machine"),
+        "samples": run["samples"],
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=1)
+    return path
+
+
+def load_baseline(name: str, run: dict, root: Path = BASELINE_DIR) -> Optional[dict]:
+    """Baseline 'name' matching a run's machine, model and quantization, if stored."""
+    path = baseline_path(name, run["fingerprint"], run["model_id"], run["quantization"], root)
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def mann_whitney_greater(current: List[float], baseline: List[float]) -> float:
+    """
+    One-sided p-value that current tends to be larger than baseline.
+    
+    Uses scipy when installed, else the normal approximation with tie
+    and continuity correction (fine for the sample sizes benchmarks use).
+    """
+    if SCIPY_AVAILABLE:
+        return float(mannwhitneyu(current, baseline, alternative="greater").pvalue)
+    
+    n1, n2 = len(current), len(baseline)
+    pooled = sorted([(v, 0) for v in current] + [(v, 1) for v in baseline])
+    ranks = [0.0] * len(pooled)
+    tie_term = 0.0
+    i = 0
+    while i < len(pooled):
+        j = i
+        while j + 1 < len(pooled) and pooled[j + 1][0] == pooled[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        tied = j - i + 1
+        tie_term += tied ** 3 - tied
+        i = j + 1
+    
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, pooled) if group == 0)
+    u = rank_sum - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def bootstrap_median_ratio(
+    current: List[float],
+    baseline: List[float],
+    confidence: float = 0.95,
+    resamples: int = 2000,
+    seed: int = 0
+) -> Tuple[float, float]:
+    """Bootstrap confidence interval of median(current) / median(baseline)."""
+    rng = random.Random(seed)
+    ratios = []
+    for _ in range(resamples):
+        a = statistics.median(rng.choices(current, k=len(current)))
+        b = statistics.median(rng.choices(baseline, k=len(baseline)))
+        ratios.append(a / b if b > 0 else math.inf)
+    ratios.sort()
+    tail = (1 - confidence) / 2
+    return ratios[int(tail * (resamples - 1))], ratios[int((1 - tail) * (resamples - 1))]
+
+
+def compare(
+    baseline: Samples,
+    current: Samples,
+    threshold: float = 0.10,
+    alpha: float = 0.05,
+    min_delta_ms: float = 1.0
+) -> List[dict]:
+    """
+    Compare per-stage samples of two runs.
+    
+    Args:
+        baseline: Baseline samples per mode and stage
+        current: New run's samples per mode and stage
+        threshold: Relative median slowdown that counts as a regression
+        alpha: Significance level of the Mann-Whitney test
+        min_delta_ms: Ignore median changes smaller than this
+        
+    Returns:
+        One dict per mode and stage found in both runs, with medians,
+        change, p-value, confidence interval and a status of "regressed",
+        "improved", "unchanged" or "insufficient" (too few samples)
+    """
+    rows = []
+    for mode in sorted(set(baseline) & set(current)):
+        for stage in sorted(set(baseline[mode]) & set(current[mode])):
+            old, new = baseline[mode][stage], current[mode][stage]
+            row = {"mode": mode, "stage": stage, "baseline_n": len(old), "current_n": len(new)}
+            rows.append(row)
+            if len(old) < MIN_SAMPLES or len(new) < MIN_SAMPLES:
+                row["status"] = "insufficient"
+                continue
+            
+            old_median, new_median = statistics.median(old), statistics.median(new)
+            delta = new_median - old_median
+            change = delta / old_median if old_median > 0 else 0.0
+            p_slower = mann_whitney_greater(new, old)
+            p_faster = mann_whitney_greater(old, new)
+            ci_low, ci_high = bootstrap_median_ratio(new, old)
+            row.update(
+                baseline_median_ms=round(old_median, 3),
+                current_median_ms=round(new_median, 3),
+                change=round(change, 4),
+                p_value=round(p_slower, 5),
+                ratio_ci=[round(ci_low, 4), round(ci_high, 4)],
+            )
+            
+            material = abs(change) > threshold and abs(delta) > min_delta_ms
+            if material and delta > 0 and p_slower < alpha:
+                row["status"] = "regressed"
+            elif material and delta < 0 and p_faster < alpha:
+                row["status"] = "improved"
+            else:
+                row["status"] = "unchanged"
+    return rows
+
+
+def print_comparison(rows: List[dict], name: str) -> None:
+    print(f"\n⚖️  Against baseline '{name}'")
+    print(f"{'Mode':<10} {'Stage':<22} {'base ms':>9} {'now ms':>9} {'change':>8} {'p':>8} {'ratio 95% CI':>16}  Status")
+    print("-" * 98)
+    marks = {"regressed": "❌", "improved": "✅", "unchanged": "  ", "insufficient": "··"}
+    for row in rows:
+        if row["status"] == "insufficient":
+            print(f"{row['mode']:<10} {row['stage']:<22} {'':>9} {'':>9} {'':>8} {'':>8} {'':>16}  "
+                  f"{marks['insufficient']} too few samples ({row['baseline_n']}/{row['current_n']})")
+            continue
+        ci = f"[{row['ratio_ci'][0]:.2f}, {row['ratio_ci'][1]:.2f}]"
+        print(f"{row['mode']:<10} {row['stage']:<22} {row['baseline_median_ms']:>9.1f} {row['current_median_ms']:>9.1f} "
+              f"{row['change']:>+8.1%} {row['p_value']:>8.4f} {ci:>16}  {marks[row['status']]} {row['status']}")
+
+
+def gate(
+    run: dict,
+    name: str,
+    threshold: float = 0.10,
+    alpha: float = 0.05,
+    min_delta_ms: float = 1.0,
+    root: Path = BASELINE_DIR
+) -> int:
+    """
+    Compare a run with baseline 'name' and print the result.
+    
+    Returns:
+        Exit code: 0 when nothing regressed, 1 on a regression,
+        2 when no baseline matches this machine, model and quantization
+    """
+    baseline = load_baseline(name, run, root)
+    if baseline is None:
+        path = baseline_path(name, run["fingerprint"], run["model_id"], run["quantization"], root)
+        print(f"\n⚠️  No baseline '{name}' for this machine/model/quantization ({path})")
+        return 2
+    
+    rows = compare(baseline["samples"], run["samples"], threshold, alpha, min_delta_ms)
+    print_comparison(rows, name)
+    regressed = [row for row in rows if row["status"] == "regressed"]
+    if regressed:
+        print(f"\n❌ {len(regressed)} stage(s) regressed by more than {threshold:.0%}")
+        return 1
+    print(f"\n✅ No regression beyond {threshold:.0%}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a benchmark run with a stored baseline")
+    parser.add_argument("results", help="JSON written by scripts/benchmark.py")
+    parser.add_argument("--baseline", default="main", help="Baseline name")
+    parser.add_argument("--save", action="store_true", help="Store the results as the baseline instead")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative slowdown that fails the gate")
+    parser.add_argument("--alpha", type=float, default=0.05, help="Significance level")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore smaller median changes")
+    parser.add_argument("--dir", default=str(BASELINE_DIR), help="Baselines folder")
+    
+    args = parser.parse_args()
+    with open(args.results) as f:
+        run = json.load(f)
+    if not run.get("samples"):
+        parser.error(f"{args.results} has no samples; rerun scripts/benchmark.py")
+    
+    if args.save:
+        print(f"💾 Baseline saved to: {save_baseline(args.baseline, run, Path(args.dir))}")
+        return
+    sys.exit(gate(run, args.baseline, args.threshold, args.alpha, args.min_delta_ms, Path(args.dir)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+DARA Result Memory Benchmark
+Measures what results cost to hold and to ship: ModeResult objects as
+dataclasses with per-result copies of the denomination entries (before)
+against __slots__ with denomination keys into the static table (after),
+cached result dicts against compact cache payloads, and JSON against
+the binary encoding.
+
+Usage:
+    python scripts/benchmark_memory.py
+    python scripts/benchmark_memory.py --results 200000
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dara.modes import CurrencyMode, EmotionMode, SceneMode, TextMode
+from dara.services import InferenceCache, serialization
+
+OUTPUTS = [
+    (CurrencyMode, "BANK INDONESIA 50000 LIMA PULUH RIBU RUPIAH"),
+    (CurrencyMode, "Rp 10.000 sepuluh ribu dan Rp 20.000"),
+    (SceneMode, "A man walks down the stairs next to a wooden chair and a door on the left."),
+    (EmotionMode, "a woman smiling and laughing"),
+    (TextMode, "Call 0812-3456-7890\nOpen 24 hours"),
+]
+
+
+@dataclass
+class LegacyModeResult:
+    """ModeResult as it was before __slots__."""
+    text: str
+    confidence: float
+    raw_output: str
+    metadata: dict = field(default_factory=dict)
+    suggestions: list = field(default_factory=list)
+
+
+def legacy(result) -> LegacyModeResult:
+    """Rebuild a result the old way: dataclass, fresh copy of every table entry."""
+    metadata = dict(result.metadata)
+    if "idr_detected" in metadata:
+        metadata["idr_detected"] = [dict(CurrencyMode.denomination(denom)) for denom in metadata["idr_detected"]]
+    return LegacyModeResult(
+        result.text, result.confidence, result.raw_output, metadata, list(result.suggestions)
+    )
+
+
+def result_dict(mode, result) -> dict:
+    """The dict DARA.detect returns."""
+    return {
+        "mode": mode.name,
+        "result": result.text,
+        "confidence": result.confidence,
+        "audio": None,
+        "language": "en",
+        "metadata": result.metadata,
+        "suggestions": result.suggestions
+    }
+
+
+def allocated(build) -> tuple:
+    """Bytes still allocated after build() returns, and the built object."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, obj
+
+
+def time_us(fn, items: list, repeats: int = 3) -> float:
+    """Median microseconds per item."""
+    runs = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        runs.append((time.perf_counter() - start) * 1e6 / len(items))
+    return statistics.median(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark result memory and encoding")
+    parser.add_argument("--results", type=int, default=100000, help="Results to hold in memory")
+    parser.add_argument("--cache-entries", type=int, default=10000, help="Results to cache")
+    
+    args = parser.parse_args()
+    handlers = {mode_class: mode_class() for mode_class, _ in OUTPUTS}
+    inputs = [OUTPUTS[i % len(OUTPUTS)] for i in range(args.results)]
+    
+    print(f"🧠 Holding {args.results} ModeResults\n")
+    new_bytes, _ = allocated(lambda: [handlers[cls].process(raw) for cls, raw in inputs])
+    old_bytes, _ = allocated(lambda: [legacy(handlers[cls].process(raw)) for cls, raw in inputs])
+    print(f"{'Representation':<40} {'MB':>8} {'B/result':>9}")
+    print("-" * 59)
+    print(f"{'dataclass + copied table entries':<40} {old_bytes / 1e6:>8.1f} {old_bytes / args.results:>9.0f}")
+    print(f"{'__slots__ + denomination keys':<40} {new_bytes / 1e6:>8.1f} {new_bytes / args.results:>9.0f}")
+    print(f"\n💾 Saved: {1 - new_bytes / old_bytes:.0%}")
+    
+    dicts = [
+        result_dict(handlers[cls], handlers[cls].process(raw))
+        for cls, raw in inputs[:args.cache_entries]
+    ]
+    
+    def fill(compact: bool) -> InferenceCache:
+        cache = InferenceCache(maxsize=len(dicts), compact=compact)
+        for index, result in enumerate(dicts):
+            # Fresh copies, as each detect call builds its own result
+            cache.set(str(index), "prompt", json.loads(json.dumps(result)))
+        return cache
+    
+    print(f"\n🗄️  InferenceCache with {len(dicts)} entries")
+    plain_bytes, _ = allocated(lambda: fill(compact=False))
+    compact_bytes, cache = allocated(lambda: fill(compact=True))
+    print(f"{'Storage':<40} {'MB':>8} {'B/entry':>9}")
+    print("-" * 59)
+    print(f"{'result dicts':<40} {plain_bytes / 1e6:>8.1f} {plain_bytes / len(dicts):>9.0f}")
+    print(f"{f'compact ({serialization.default_backend()})':<40} {compact_bytes / 1e6:>8.1f} {compact_bytes / len(dicts):>9.0f}")
+    
+    get_us = time_us(lambda index: cache.get(str(index), "prompt"), list(range(len(dicts))))
+    print(f"   compact get (decode): {get_us:.1f} us")
+    
+    print(f"\n📦 Encoding one result dict (mean over {len(OUTPUTS)} kinds)")
+    samples = dicts[:len(OUTPUTS)]
+    print(f"{'Format':<24} {'bytes':>8} {'encode us':>10} {'decode us':>10}")
+    print("-" * 55)
+    
+    encoded = [json.dumps(d).encode("utf-8") for d in samples]
+    print(f"{'json':<24} {statistics.mean(map(len, encoded)):>8.0f} "
+          f"{time_us(json.dumps, samples * 200):>10.1f} {time_us(json.loads, encoded * 200):>10.1f}")
+    
+    backends = ["struct"] + (["msgpack"] if serialization.MSGPACK_AVAILABLE else [])
+    for backend in backends:
+        encoded = [serialization.dumps(d, backend=backend) for d in samples]
+        assert [serialization.loads(e) for e in encoded] == json.loads(json.dumps(samples))
+        encode_us = time_us(lambda d: serialization.dumps(d, backend=backend), samples * 200)
+        decode_us = time_us(serialization.loads, encoded * 200)
+        print(f"{backend:<24} {statistics.mean(map(len, encoded)):>8.0f} {encode_us:>10.1f} {decode_us:>10.1f}")
+    
+    if not serialization.MSGPACK_AVAILABLE:
+        print("\n(msgpack not installed; pip install msgpack to compare it)")
+
+
+if __name__ == "__main__":
+    main()
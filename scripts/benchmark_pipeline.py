@@ -0,0 +1,146 @@
+"""
+DARA Pipeline Benchmark (no weights)
+Times everything around the model with the stub backend (core/stub.py):
+image decode and hashing, the inference cache, per-mode post-processing,
+TTS on the request path, and batching. Runs in seconds without network,
+weights or sampleimages/.
+
+Usage:
+    python scripts/benchmark_pipeline.py
+    python scripts/benchmark_pipeline.py --latency generate=120,per_image=30,tts=40 --output pipeline.json
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dara import DARA, Config
+from dara.config import parse_latency
+
+
+def synthetic_images(count: int, width: int = 800, height: int = 600) -> list:
+    """Distinct JPEGs (distinct cache hashes) with some texture to decode."""
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 256, (height // 8, width // 8, 3), dtype=np.uint8)
+    images = []
+    for index in range(count):
+        array = np.kron(np.roll(base, index, axis=1), np.ones((8, 8, 1), dtype=np.uint8))
+        buffer = io.BytesIO()
+        Image.fromarray(array).save(buffer, format="JPEG", quality=85)
+        images.append(buffer.getvalue())
+    return images
+
+
+def make_dara(latency: dict, cache: bool = False, tts_dir: str = None) -> DARA:
+    config = Config()
+    config.model.backend = "stub"
+    config.model.stub_latency_ms = latency
+    config.tts.cache_audio = False
+    config.tts.cache_dir = tts_dir
+    return DARA(config=config, enable_cache=cache, enable_tts=tts_dir is not None, log_level="WARNING")
+
+
+def median_ms(fn, items: list) -> float:
+    """Median wall time of fn(item) over items, in milliseconds."""
+    samples = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DARA's pipeline with the stub model")
+    parser.add_argument("--latency", default="generate=100,per_image=25,decode=1,tts=40",
+                        help="Stub delays in ms (stage=ms, comma-separated)")
+    parser.add_argument("--images", type=int, default=16, help="Distinct synthetic images")
+    parser.add_argument("--batch-size", type=int, default=8, help="detect_batch chunk size")
+    parser.add_argument("--output", help="Write results as JSON")
+    
+    args = parser.parse_args()
+    latency = parse_latency(args.latency)
+    images = synthetic_images(args.images)
+    results = {"latency_ms": latency}
+    
+    print(f"🧪 Stub backend, delays {latency}, {len(images)} images\n")
+    
+    # Decode, resize and hash (what every request and cache lookup pays)
+    dara = make_dara({})
+    load_ms = median_ms(lambda image: dara.image_processor.load(image, 768), images)
+    results["load_hash_ms"] = load_ms
+    print(f"🖼️  Decode + resize + hash:  {load_ms:7.2f} ms/image")
+    
+    # Cache: miss (full pipeline, zero model time) against hit
+    cached = make_dara({}, cache=True)
+    miss_ms = median_ms(lambda image: cached.detect(image, mode="scene", generate_audio=False), images)
+    hit_ms = median_ms(lambda image: cached.detect(image, mode="scene", generate_audio=False), images)
+    results["cache"] = {"miss_ms": miss_ms, "hit_ms": hit_ms, "stats": cached.cache_stats}
+    print(f"🗄️  Cache miss / hit:        {miss_ms:7.2f} / {hit_ms:.2f} ms")
+    
+    # Pipeline overhead per mode, excluding the (zero) model time
+    print(f"\n🧩 Per-mode overhead (model time excluded), mean ms")
+    results["modes"] = {}
+    for mode in dara.get_available_modes():
+        stages = {}
+        for image in images:
+            timings = dara.detect(image, mode=mode, generate_audio=False, return_timings=True)["timings"]
+            for name, ms in timings.items():
+                stages.setdefault(name, []).append(ms)
+        means = {name: statistics.mean(values) for name, values in stages.items()}
+        results["modes"][mode] = means
+        top = sorted(((ms, name) for name, ms in means.items() if name not in ("total", "other")), reverse=True)[:3]
+        print(f"   {mode:<9} total {means['total']:6.2f}  ({', '.join(f'{name} {ms:.2f}' for ms, name in top)})")
+    
+    # TTS on the request path (uncached audio is written to the working directory)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tts_dir:
+        os.chdir(tts_dir)
+        try:
+            speaking = make_dara(latency, tts_dir=tts_dir)
+            silent_ms = median_ms(lambda image: speaking.detect(image, mode="scene", generate_audio=False), images)
+            audio_ms = median_ms(lambda image: speaking.detect(image, mode="scene", generate_audio=True), images)
+        finally:
+            os.chdir(cwd)
+        results["tts"] = {"without_ms": silent_ms, "with_ms": audio_ms, "stats": speaking.tts.stats}
+        print(f"\n🔊 detect without / with audio: {silent_ms:7.1f} / {audio_ms:.1f} ms")
+    
+    # Batching: one generate per chunk against one per image
+    batched = make_dara(latency)
+    start = time.perf_counter()
+    for image in images:
+        batched.detect(image, mode="scene", generate_audio=False)
+    loop_s = time.perf_counter() - start
+    loop_calls = batched.model.calls
+    start = time.perf_counter()
+    batched.detect_batch(images, mode="scene", batch_size=args.batch_size)
+    batch_s = time.perf_counter() - start
+    batch_calls = batched.model.calls - loop_calls
+    results["batching"] = {
+        "loop_s": loop_s, "loop_generate_calls": loop_calls,
+        "batch_s": batch_s, "batch_generate_calls": batch_calls,
+        "speedup": loop_s / batch_s
+    }
+    print(f"\n📦 {len(images)} images: detect loop {loop_s:.2f}s ({loop_calls} generate calls), "
+          f"detect_batch {batch_s:.2f}s ({batch_calls} calls), {loop_s / batch_s:.1f}x")
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, default=str)
+        print(f"\n💾 Results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
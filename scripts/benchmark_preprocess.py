@@ -0,0 +1,177 @@
+"""
+DARA Preprocessing Microbenchmark
+Times each image preprocessing stage for the legacy/HF path and the
+fused/native path.
+
+Usage:
+    python scripts/benchmark_preprocess.py
+    python scripts/benchmark_preprocess.py --image photo.jpg --batch-size 8
+"""
+
+import argparse
+import io
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import torch
+from PIL import Image
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dara.core.pixels import PixelPreprocessor
+from dara.utils.image import ImageUtils
+
+# Florence-2 preprocessor_config.json values
+FLORENCE2_IMAGE_CONFIG = {
+    "size": {"height": 768, "width": 768},
+    "crop_size": {"height": 768, "width": 768},
+    "do_center_crop": False,
+    "do_resize": True,
+    "do_rescale": True,
+    "do_normalize": True,
+    "resample": 3,
+    "rescale_factor": 1 / 255,
+    "image_mean": [0.485, 0.456, 0.406],
+    "image_std": [0.229, 0.224, 0.225],
+}
+
+
+class OfflineFlorenceProcessor:
+    """
+    Stand-in for the Florence-2 AutoProcessor when weights are unavailable.
+    
+    Uses CLIPImageProcessor with Florence-2's preprocessing config (the
+    same image processor class Florence-2 ships with) and a fixed token
+    sequence for prompts.
+    """
+    
+    def __init__(self):
+        from transformers import CLIPImageProcessor
+        self.image_processor = CLIPImageProcessor(**FLORENCE2_IMAGE_CONFIG)
+    
+    def __call__(self, text=None, images=None, return_tensors="pt", padding=False, **kwargs):
+        pixel_values = self.image_processor(images, return_tensors=return_tensors, **kwargs)["pixel_values"]
+        count = len(text) if isinstance(text, list) else 1
+        return {
+            "input_ids": torch.tensor([[0, 2264, 16, 5, 2788, 11, 5, 2274, 116, 2]] * count),
+            "pixel_values": pixel_values,
+        }
+
+
+def load_hf_processor(model_id: str):
+    """Load the real processor, falling back to the offline stand-in."""
+    try:
+        from transformers import AutoProcessor
+        return AutoProcessor.from_pretrained(model_id, trust_remote_code=True), model_id
+    except Exception as e:
+        print(f"⚠️  Could not load {model_id} processor ({type(e).__name__}); using offline stand-in")
+        return OfflineFlorenceProcessor(), "offline CLIPImageProcessor (Florence-2 config)"
+
+
+def synthetic_jpeg(width: int = 4032, height: int = 3024, seed: int = 0) -> bytes:
+    """Create a 12 MP phone-like JPEG with smooth gradients and texture."""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = np.stack([
+        127 + 100 * np.sin(x / 300 + seed),
+        127 + 100 * np.cos(y / 250),
+        127 + 100 * np.sin((x + y) / 400),
+    ], axis=-1)
+    noise = rng.normal(0, 12, size=base.shape)
+    array = np.clip(base + noise, 0, 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(array).save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def time_stage(fn, iterations: int) -> float:
+    """Median wall time of fn() in milliseconds."""
+    fn()  # warmup
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Run all stage timings and return {stage: ms}."""
+    hf_processor, source = load_hf_processor(args.model_id)
+    image_processor = hf_processor.image_processor
+    size = (768, 768)
+    dtype = getattr(torch, args.dtype)
+    
+    data = Path(args.image).read_bytes() if args.image else synthetic_jpeg()
+    full = ImageUtils.load(data)
+    print(f"Processor: {source}")
+    print(f"Image: {full.size[0]}x{full.size[1]}, batch={args.batch_size}, "
+          f"device={args.device}, dtype={args.dtype}\n")
+    
+    model_images = [ImageUtils.load_for_model(data, size)[0] for _ in range(args.batch_size)]
+    prompts = ["<OCR>"] * args.batch_size
+    native = PixelPreprocessor(hf_processor, size, device=args.device, dtype=dtype)
+    native.prompt_ids("<OCR>")
+    
+    def legacy_load():
+        image = ImageUtils.load(data)
+        ImageUtils.compute_hash(image)
+        return ImageUtils.resize_smart(image, 1024)
+    
+    legacy_image = legacy_load()
+    
+    def hf_pixels(images):
+        out = image_processor(images, return_tensors="pt")["pixel_values"]
+        return out.to(args.device, dtype)
+    
+    def hf_pixels_presized():
+        out = image_processor(model_images, return_tensors="pt", do_resize=False)["pixel_values"]
+        return out.to(args.device, dtype)
+    
+    stages = {
+        "decode (full)": lambda: ImageUtils.load(data).load(),
+        "decode (draft)": lambda: _draft_decode(data, size),
+        "hash (full image)": lambda: ImageUtils.compute_hash(full),
+        "hash (model image)": lambda: ImageUtils.compute_hash(model_images[0]),
+        "legacy load+hash+resize 1024": legacy_load,
+        "fused load_for_model": lambda: ImageUtils.load_for_model(data, size),
+        "HF pixels (resize 1024->768)": lambda: hf_pixels([legacy_image] * args.batch_size),
+        "HF pixels (presized)": hf_pixels_presized,
+        "native pixels": lambda: native.pixel_values(model_images),
+        "HF tokenize prompt": lambda: hf_processor(text=prompts, images=model_images, return_tensors="pt"),
+        "cached prompt ids": lambda: native.input_ids(prompts),
+    }
+    
+    results = {}
+    width = max(len(name) for name in stages)
+    for name, fn in stages.items():
+        results[name] = time_stage(fn, args.iterations)
+        print(f"  {name:<{width}}  {results[name]:9.2f} ms")
+    
+    legacy = results["legacy load+hash+resize 1024"] + results["HF pixels (resize 1024->768)"] / args.batch_size
+    fused = results["fused load_for_model"] + results["native pixels"] / args.batch_size
+    print(f"\nPer image, end to end: legacy {legacy:.1f} ms -> fused/native {fused:.1f} ms "
+          f"({legacy / fused:.1f}x)")
+    return results
+
+
+def _draft_decode(data: bytes, size: tuple) -> Image.Image:
+    image = Image.open(io.BytesIO(data))
+    image.draft(None, size)
+    image.load()
+    return image
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DARA preprocessing microbenchmark")
+    parser.add_argument("--model-id", default="microsoft/Florence-2-base")
+    parser.add_argument("--image", default=None, help="JPEG to benchmark (default: synthetic 12 MP)")
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float16", "bfloat16"])
+    run(parser.parse_args())
@@ -0,0 +1,131 @@
+"""
+DARA Currency Color Calibration
+Builds banknote color prototypes from sample photos and reports how often
+the color fast path would answer, how accurate it is, and how fast.
+
+Sample layout (one folder per denomination, named as in IDR_DENOMINATIONS,
+plus photos that are not banknotes: colored pages, paper, desks, hands):
+    samples/100000/*.jpg
+    samples/50000/*.jpg
+    ...
+    samples/background/*.jpg
+    
+Without background samples the calibration is not marked calibrated and
+the fast path stays off.
+    
+Usage:
+    python scripts/calibrate_currency.py samples/ --output currency_calibration.json
+    
+Load the result with DARA_CURRENCY_CALIBRATION=currency_calibration.json.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from PIL import Image
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+
+
+def load_samples(root: Path) -> dict:
+    """Load sample images per denomination folder."""
+    samples = {}
+    for folder in sorted(p for p in root.iterdir() if p.is_dir()):
+        images = [
+            Image.open(path).convert("RGB")
+            for path in sorted(folder.iterdir())
+            if path.suffix.lower() in IMAGE_EXTENSIONS
+        ]
+        if images:
+            samples[folder.name] = images
+    return samples
+
+
+def evaluate(samples: dict, threshold: float) -> dict:
+    """
+    Leave-one-out evaluation: each image is classified by prototypes
+    calibrated on all other images.
+    """
+    from dara.core.banknote import BanknoteColorClassifier
+    from dara.modes import CurrencyMode
+    
+    from dara.core.banknote import BACKGROUND
+    
+    total = answered = correct = negatives = false_positives = 0
+    latencies = []
+    for label, images in samples.items():
+        for held_out in range(len(images)):
+            rest = {k: [im for i, im in enumerate(v) if not (k == label and i == held_out)] for k, v in samples.items()}
+            classifier = BanknoteColorClassifier(CurrencyMode.color_references()).calibrate(rest)
+            
+            start = time.perf_counter()
+            prediction = classifier.classify(images[held_out])
+            latencies.append((time.perf_counter() - start) * 1000)
+            
+            confident = prediction.label is not None and prediction.confidence >= threshold
+            if label == BACKGROUND:
+                negatives += 1
+                false_positives += confident
+                continue
+            total += 1
+            if confident:
+                answered += 1
+                correct += prediction.label == label
+    
+    return {
+        "images": total,
+        "fast_path_rate": answered / total if total else 0.0,
+        "fast_path_accuracy": correct / answered if answered else 0.0,
+        "background_images": negatives,
+        "false_positive_rate": false_positives / negatives if negatives else None,
+        "classify_ms": statistics.mean(latencies) if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate the currency color fast path")
+    parser.add_argument("samples", type=Path, help="Folder with one subfolder per denomination")
+    parser.add_argument("--output", "-o", default="currency_calibration.json", help="Calibration JSON path")
+    parser.add_argument("--threshold", type=float, default=0.85, help="Fast path similarity threshold")
+    
+    args = parser.parse_args()
+    
+    from dara.core.banknote import BACKGROUND, BanknoteColorClassifier
+    from dara.modes import CurrencyMode
+    
+    samples = load_samples(args.samples)
+    if not samples:
+        print(f"❌ No sample folders found in {args.samples}")
+        return 1
+    
+    unknown = set(samples) - set(CurrencyMode.IDR_DENOMINATIONS) - {BACKGROUND}
+    if BACKGROUND not in samples:
+        print(f"⚠️  No {BACKGROUND}/ folder: the calibration will not enable the fast path")
+    if unknown:
+        print(f"⚠️  Folders not in IDR_DENOMINATIONS (fast path will ignore them): {sorted(unknown)}")
+    
+    print(f"📷 {sum(len(v) for v in samples.values())} images, {len(samples)} denominations")
+    
+    stats = evaluate(samples, args.threshold)
+    print(f"\n🎯 Leave-one-out at threshold {args.threshold}:")
+    print(f"   Fast path answers: {stats['fast_path_rate']:.0%} of images")
+    print(f"   Accuracy when answering: {stats['fast_path_accuracy']:.1%}")
+    if stats["false_positive_rate"] is not None:
+        print(f"   Non-banknotes answered as notes: {stats['false_positive_rate']:.1%} "
+              f"of {stats['background_images']}")
+    print(f"   Classify latency: {stats['classify_ms']:.2f} ms")
+    
+    classifier = BanknoteColorClassifier(CurrencyMode.color_references()).calibrate(samples)
+    classifier.save(args.output)
+    print(f"\n💾 Calibration saved to: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
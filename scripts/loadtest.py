@@ -0,0 +1,388 @@
+"""
+DARA Load Test
+Drives DARA.detect, DARA.detect_async or an HTTP endpoint at increasing
+load and reports latency percentiles, throughput, and queueing against
+service time at each level.
+
+Closed loop: N clients each send their next request as soon as the last
+one returns (--concurrency 1,2,4,8). Open loop: requests arrive at a
+fixed rate whether or not earlier ones finished (--rate 0.5,1,2); latency
+counts from the scheduled arrival, so a backed-up server can't hide its
+queue by slowing the clients down.
+
+Service time is the server's own "total" timing (detect(return_timings=True));
+queueing is everything else a request waited.
+
+The http target POSTs each image's bytes to --url with mode and language
+as query parameters and expects detect()'s JSON result back.
+
+Usage:
+    python scripts/loadtest.py --images sampleimages --concurrency 1,2,4
+    python scripts/loadtest.py --target async --loop open --rate 0.5,1,2 --duration 60
+    python scripts/loadtest.py --stub-latency generate=100 --concurrency 1,2,4   # no weights
+    python scripts/loadtest.py --target http --url http://localhost:8000/detect --concurrency 1,4,16
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+try:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    MATPLOTLIB_AVAILABLE = True
+except ImportError:
+    MATPLOTLIB_AVAILABLE = False
+
+TARGETS = ("detect", "async", "http")
+LOOPS = ("closed", "open")
+PERCENTILES = (50, 90, 95, 99)
+
+# Sends one image; returns the server's service time in ms when it reports one
+Send = Callable[[bytes], Awaitable[Optional[float]]]
+
+
+@dataclass
+class Sample:
+    """One request, times in seconds since the level started."""
+    scheduled: float
+    start: float
+    end: float
+    service_ms: Optional[float] = None
+    error: Optional[str] = None
+    
+    @property
+    def latency_ms(self) -> float:
+        return (self.end - self.scheduled) * 1000
+
+
+@dataclass
+class LevelReport:
+    """Statistics for one concurrency level or arrival rate."""
+    loop: str
+    level: float
+    completed: int
+    errors: int
+    dropped: int
+    elapsed_s: float
+    throughput_rps: float
+    latency_ms: dict
+    service_ms: dict
+    queue_ms: dict
+    within_slo: Optional[bool] = None
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linearly interpolated q-th percentile (0-100) of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def describe(values: List[float]) -> dict:
+    """Mean, max and percentiles in ms."""
+    summary = {f"p{q}": round(percentile(values, q), 2) for q in PERCENTILES}
+    summary["mean"] = round(statistics.mean(values), 2) if values else 0.0
+    summary["max"] = round(max(values), 2) if values else 0.0
+    return summary
+
+
+def load_images(paths: List[str]) -> List[bytes]:
+    """Encoded bytes of every image under paths; one synthetic image if none."""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            for ext in ["*.jpg", "*.jpeg", "*.png"]:
+                files.extend(sorted(path.glob(ext)))
+        elif path.exists():
+            files.append(path)
+    if files:
+        return [f.read_bytes() for f in files]
+    
+    from PIL import Image
+    import numpy as np
+    print("⚠️  No images found, using a synthetic 640x480 image")
+    pixels = np.random.default_rng(0).integers(0, 256, (480, 640, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG")
+    return [buffer.getvalue()]
+
+
+def make_target(args, max_outstanding: int) -> Send:
+    """Build the send coroutine for --target."""
+    pool = ThreadPoolExecutor(max_workers=max_outstanding, thread_name_prefix="loadtest")
+    
+    if args.target == "http":
+        query = urllib.parse.urlencode({"mode": args.mode, "language": args.language})
+        url = f"{args.url}{'&' if '?' in args.url else '?'}{query}"
+        
+        def post(image: bytes) -> Optional[float]:
+            request = urllib.request.Request(
+                url, data=image, headers={"Content-Type": "application/octet-stream"}
+            )
+            with urllib.request.urlopen(request, timeout=args.timeout) as response:
+                result = json.loads(response.read())
+            return (result.get("timings") or {}).get("total")
+        
+        async def send(image: bytes) -> Optional[float]:
+            return await asyncio.get_running_loop().run_in_executor(pool, post, image)
+        return send
+    
+    from dara import DARA, Config
+    from dara.config import parse_latency
+    config = Config()
+    if args.stub_latency is not None:
+        config.model.backend = "stub"
+        config.model.stub_latency_ms = parse_latency(args.stub_latency)
+    print("📦 Loading DARA model...")
+    dara = DARA(config=config, enable_cache=args.cache, enable_tts=False)
+    print(f"   Device: {dara.device}, model: {dara.model_id}")
+    options = dict(mode=args.mode, language=args.language, generate_audio=False, return_timings=True)
+    
+    if args.target == "async":
+        async def send(image: bytes) -> Optional[float]:
+            result = await dara.detect_async(image, **options)
+            return result["timings"]["total"]
+        return send
+    
+    # Plain detect from client threads, as a threaded server would call it
+    def call(image: bytes) -> Optional[float]:
+        return dara.detect(image, **options)["timings"]["total"]
+    
+    async def send(image: bytes) -> Optional[float]:
+        return await asyncio.get_running_loop().run_in_executor(pool, call, image)
+    return send
+
+
+async def timed(send: Send, image: bytes, scheduled: float, t0: float, samples: List[Sample]) -> None:
+    """Send one request and record it."""
+    start = time.perf_counter() - t0
+    sample = Sample(scheduled=scheduled, start=start, end=start)
+    try:
+        sample.service_ms = await send(image)
+    except Exception as e:
+        sample.error = f"{type(e).__name__}: {e}"
+    sample.end = time.perf_counter() - t0
+    samples.append(sample)
+
+
+async def run_closed(send: Send, images: List[bytes], clients: int, args) -> tuple:
+    """N clients, each sending back to back until the level's time or request budget runs out."""
+    samples: List[Sample] = []
+    t0 = time.perf_counter()
+    budget = [args.requests]
+    
+    async def client(offset: int) -> None:
+        index = offset
+        while time.perf_counter() - t0 < args.duration and budget[0] != 0:
+            budget[0] -= 1
+            now = time.perf_counter() - t0
+            await timed(send, images[index % len(images)], now, t0, samples)
+            index += clients
+    
+    await asyncio.gather(*(client(i) for i in range(clients)))
+    return samples, 0
+
+
+async def run_open(send: Send, images: List[bytes], rate: float, args) -> tuple:
+    """Arrivals at a fixed rate (Poisson with --poisson) for the level's duration."""
+    samples: List[Sample] = []
+    tasks = []
+    dropped = 0
+    rng = random.Random(args.seed)
+    t0 = time.perf_counter()
+    scheduled = 0.0
+    index = 0
+    
+    while scheduled < args.duration and index != args.requests:
+        delay = scheduled - (time.perf_counter() - t0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks = [task for task in tasks if not task.done()]
+        if len(tasks) >= args.max_outstanding:
+            dropped += 1
+        else:
+            image = images[index % len(images)]
+            tasks.append(asyncio.ensure_future(timed(send, image, scheduled, t0, samples)))
+        index += 1
+        scheduled += rng.expovariate(rate) if args.poisson else 1 / rate
+    
+    await asyncio.gather(*tasks)
+    return samples, dropped
+
+
+def summarize(loop: str, level: float, samples: List[Sample], dropped: int, slo_ms: Optional[float]) -> LevelReport:
+    """Reduce one level's samples to a report."""
+    ok = [s for s in samples if s.error is None]
+    latency = [s.latency_ms for s in ok]
+    service = [s.service_ms for s in ok if s.service_ms is not None]
+    queue = [max(0.0, s.latency_ms - s.service_ms) for s in ok if s.service_ms is not None]
+    elapsed = max((s.end for s in samples), default=0.0) - min((s.scheduled for s in samples), default=0.0)
+    
+    report = LevelReport(
+        loop=loop,
+        level=level,
+        completed=len(ok),
+        errors=len(samples) - len(ok),
+        dropped=dropped,
+        elapsed_s=round(elapsed, 3),
+        throughput_rps=round(len(ok) / elapsed, 3) if elapsed > 0 else 0.0,
+        latency_ms=describe(latency),
+        service_ms=describe(service),
+        queue_ms=describe(queue)
+    )
+    if slo_ms is not None:
+        report.within_slo = bool(ok) and report.latency_ms["p99"] <= slo_ms and not report.errors
+    return report
+
+
+def print_level(report: LevelReport) -> None:
+    unit = "clients" if report.loop == "closed" else "req/s"
+    lat, svc, que = report.latency_ms, report.service_ms, report.queue_ms
+    print(
+        f"   {report.level:>6g} {unit:<7} {report.throughput_rps:>7.2f} rps  "
+        f"p50 {lat['p50']:>8.1f}  p95 {lat['p95']:>8.1f}  p99 {lat['p99']:>8.1f} ms  "
+        f"service p50 {svc['p50']:>7.1f}  queue p50 {que['p50']:>7.1f} ms"
+        + (f"  errors {report.errors}" if report.errors else "")
+        + (f"  dropped {report.dropped}" if report.dropped else "")
+    )
+
+
+def write_curve(reports: List[LevelReport], csv_path: Path, plot: bool) -> None:
+    """Throughput against latency, one row per level, plus a PNG when matplotlib is installed."""
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["loop", "level", "throughput_rps", "p50_ms", "p95_ms", "p99_ms", "service_p50_ms", "queue_p50_ms"])
+        for r in reports:
+            writer.writerow([
+                r.loop, r.level, r.throughput_rps, r.latency_ms["p50"], r.latency_ms["p95"],
+                r.latency_ms["p99"], r.service_ms["p50"], r.queue_ms["p50"]
+            ])
+    print(f"📈 Curve saved to: {csv_path}")
+    
+    if not plot:
+        return
+    if not MATPLOTLIB_AVAILABLE:
+        print("   (matplotlib not installed; skipping the plot)")
+        return
+    fig, ax = plt.subplots(figsize=(7, 4.5))
+    throughput = [r.throughput_rps for r in reports]
+    for q in (50, 95, 99):
+        ax.plot(throughput, [r.latency_ms[f"p{q}"] for r in reports], marker="o", label=f"p{q}")
+    for r in reports:
+        ax.annotate(f"{r.level:g}", (r.throughput_rps, r.latency_ms["p50"]), fontsize=8)
+    ax.set_xlabel("Throughput (requests/s)")
+    ax.set_ylabel("Latency (ms)")
+    ax.set_title("DARA throughput vs latency")
+    ax.legend()
+    ax.grid(alpha=0.3)
+    png_path = csv_path.with_suffix(".png")
+    fig.savefig(png_path, dpi=120, bbox_inches="tight")
+    print(f"📈 Plot saved to: {png_path}")
+
+
+def parse_levels(text: str) -> List[float]:
+    return [float(part) for part in text.split(",") if part.strip()]
+
+
+async def run(args) -> List[LevelReport]:
+    levels = parse_levels(args.concurrency if args.loop == "closed" else args.rate)
+    if not levels or min(levels) <= 0:
+        raise ValueError("Levels must be positive numbers")
+    max_outstanding = int(max(levels)) if args.loop == "closed" else args.max_outstanding
+    
+    images = load_images(args.images)
+    send = make_target(args, max(1, max_outstanding))
+    
+    print(f"\n🎯 Target: {args.target}, mode: {args.mode}, {len(images)} image(s)")
+    if args.warmup:
+        print(f"🔥 Warmup ({args.warmup} requests)...")
+        for i in range(args.warmup):
+            await send(images[i % len(images)])
+    
+    print(f"\n🏃 {args.loop.title()} loop, {args.duration:g}s per level")
+    reports = []
+    for level in levels:
+        if args.loop == "closed":
+            samples, dropped = await run_closed(send, images, int(level), args)
+        else:
+            samples, dropped = await run_open(send, images, level, args)
+        report = summarize(args.loop, level, samples, dropped, args.slo_ms)
+        reports.append(report)
+        print_level(report)
+        if args.slo_ms is not None and args.stop_on_slo and not report.within_slo:
+            print(f"   p99 above {args.slo_ms:g} ms SLO, stopping the sweep")
+            break
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test DARA")
+    parser.add_argument("--target", default="detect", choices=TARGETS, help="What to drive")
+    parser.add_argument("--url", help="Endpoint for --target http")
+    parser.add_argument("--images", nargs="*", default=["sampleimages"], help="Image files or folders")
+    parser.add_argument("--mode", default="scene", help="Detection mode")
+    parser.add_argument("--language", default="en", help="Output language")
+    parser.add_argument("--loop", default="closed", choices=LOOPS, help="Closed (clients) or open (arrival rate) loop")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="Closed loop: comma-separated client counts")
+    parser.add_argument("--rate", default="0.5,1,2", help="Open loop: comma-separated arrival rates (req/s)")
+    parser.add_argument("--poisson", action="store_true", help="Open loop: exponential inter-arrival times")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per level")
+    parser.add_argument("--requests", type=int, default=-1, help="Requests per level (default: until --duration)")
+    parser.add_argument("--max-outstanding", type=int, default=64, help="Open loop: drop arrivals beyond this many in flight")
+    parser.add_argument("--warmup", type=int, default=2, help="Requests before the first level")
+    parser.add_argument("--timeout", type=float, default=120.0, help="HTTP request timeout (seconds)")
+    parser.add_argument("--slo-ms", type=float, help="p99 latency objective to check each level against")
+    parser.add_argument("--stop-on-slo", action="store_true", help="Stop the sweep at the first level over --slo-ms")
+    parser.add_argument("--cache", action="store_true", help="Keep the inference cache on (off by default)")
+    parser.add_argument("--stub-latency", help="Use the stub model with these delays (ms), e.g. generate=100,per_image=25")
+    parser.add_argument("--seed", type=int, default=0, help="Poisson arrival seed")
+    parser.add_argument("--output", default="loadtest_report.json", help="JSON report path")
+    parser.add_argument("--curve", help="Throughput/latency CSV path (default: next to --output)")
+    parser.add_argument("--plot", action="store_true", help="Also save the curve as a PNG (needs matplotlib)")
+    
+    args = parser.parse_args()
+    if args.target == "http" and not args.url:
+        parser.error("--target http needs --url")
+    
+    reports = asyncio.run(run(args))
+    
+    within = [r for r in reports if r.within_slo]
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "machine": {"platform": platform.platform(), "python": platform.python_version()},
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "curve", "plot")},
+        "levels": [asdict(r) for r in reports],
+        "max_throughput_within_slo": max((r.throughput_rps for r in within), default=None)
+    }
+    output = Path(args.output)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Report saved to: {output}")
+    write_curve(reports, Path(args.curve) if args.curve else output.with_suffix(".csv"), args.plot)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+DARA Resolution Sweep
+Measures accuracy and latency per mode across input sizes and picks the
+smallest size that keeps accuracy within tolerance of the 768 baseline.
+
+Usage:
+    python scripts/sweep_resolution.py
+    python scripts/sweep_resolution.py --sizes 384,512,640,768,1024 --output profile.json
+    
+The written profile can be loaded with DARA_RESOLUTION_PROFILE=profile.json.
+"""
+
+import argparse
+import difflib
+import json
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+PROJECT_ROOT = Path(__file__).parent.parent
+BASELINE_SIZE = 768
+
+
+def load_eval_set(path: Path) -> list:
+    """Load data/eval items, resolving image paths relative to the JSON file."""
+    with open(path, "r", encoding="utf-8") as f:
+        items = json.load(f)
+    
+    resolved = []
+    for item in items:
+        image = (path.parent / item["image"]).resolve()
+        if not image.exists():
+            print(f"⚠️  Missing image, skipped: {image}")
+            continue
+        resolved.append({**item, "image": str(image)})
+    return resolved
+
+
+def score(output: str, expected: str) -> float:
+    """Similarity in [0, 1]; 1.0 when the expected text appears verbatim."""
+    output, expected = output.lower(), expected.lower()
+    if expected in output:
+        return 1.0
+    return difflib.SequenceMatcher(None, output, expected).ratio()
+
+
+def sweep_mode(dara, mode: str, items: list, sizes: list, iterations: int) -> dict:
+    """Run every item at every size for one mode. Returns {size: stats}."""
+    results = {}
+    for size in sizes:
+        dara.set_mode_image_size(mode, size)
+        dara.detect(items[0]["image"], mode=mode, generate_audio=False)  # warmup
+        
+        scores, times = [], []
+        for item in items:
+            for _ in range(iterations):
+                start = time.perf_counter()
+                result = dara.detect(item["image"], mode=mode, generate_audio=False)
+                times.append((time.perf_counter() - start) * 1000)
+            scores.append(score(result["result"], item["text"]))
+        
+        results[size] = {
+            "accuracy": statistics.mean(scores),
+            "median_ms": statistics.median(times),
+        }
+        print(f"   {mode:<10} {size:>5}px  acc={results[size]['accuracy']:.3f}  "
+              f"{results[size]['median_ms']:8.1f} ms")
+    return results
+
+
+def pick_size(results: dict, tolerance: float) -> int:
+    """Smallest size whose accuracy is within tolerance of the 768 baseline."""
+    reference = results.get(BASELINE_SIZE, max(results.values(), key=lambda r: r["accuracy"]))
+    for size in sorted(results):
+        if results[size]["accuracy"] >= reference["accuracy"] - tolerance:
+            return size
+    return BASELINE_SIZE
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="DARA per-mode resolution sweep")
+    parser.add_argument("--dataset", default=str(PROJECT_ROOT / "data" / "eval" / "dataset.json"))
+    parser.add_argument("--sizes", default="384,512,640,768,896,1024",
+                        help="Comma-separated input sizes (multiples of 32)")
+    parser.add_argument("--modes", default=None, help="Comma-separated modes (default: modes in dataset)")
+    parser.add_argument("--tolerance", type=float, default=0.02,
+                        help="Allowed accuracy drop versus the 768 baseline")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--model-id", default=None)
+    parser.add_argument("--position-interpolation", default="extend", choices=["extend", "interpolate"])
+    parser.add_argument("--output", default=str(PROJECT_ROOT / "docs" / "resolution_profile.json"))
+    args = parser.parse_args()
+    
+    from dara import DARA, Config
+    
+    items = load_eval_set(Path(args.dataset))
+    if not items:
+        print("⚠️  No evaluation images found")
+        return 1
+    
+    sizes = sorted({int(s) for s in args.sizes.split(",")} | {BASELINE_SIZE})
+    modes = args.modes.split(",") if args.modes else sorted({item["mode"] for item in items})
+    
+    config = Config()
+    config.inference.position_interpolation = args.position_interpolation
+    dara = DARA(model_id=args.model_id, config=config, enable_tts=False,
+                enable_cache=False, log_level="WARNING")
+    
+    print("=" * 60)
+    print(f"DARA RESOLUTION SWEEP ({len(items)} items, sizes {sizes})")
+    print("=" * 60)
+    
+    profile = {}
+    details = {}
+    for mode in modes:
+        mode_items = [item for item in items if item["mode"] == mode]
+        if not mode_items:
+            print(f"⚠️  No items for mode '{mode}', skipped")
+            continue
+        details[mode] = sweep_mode(dara, mode, mode_items, sizes, args.iterations)
+        profile[mode] = pick_size(details[mode], args.tolerance)
+        baseline = details[mode][BASELINE_SIZE]["median_ms"]
+        chosen = details[mode][profile[mode]]["median_ms"]
+        print(f"   → {mode}: {profile[mode]}px ({baseline / chosen:.2f}x vs {BASELINE_SIZE}px)\n")
+    
+    output = {
+        "mode_image_sizes": profile,
+        "sweep": {mode: {str(size): stats for size, stats in results.items()}
+                  for mode, results in details.items()},
+        "tolerance": args.tolerance,
+        "position_interpolation": args.position_interpolation,
+        "model_id": dara.model_id,
+        "device": dara.device,
+        "timestamp": datetime.now().isoformat(),
+    }
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2)
+    print(f"💾 Profile saved to: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+DARA Trace Report
+Reads traces written by JSONLExporter (DARA_TRACE_FILE) and shows which
+stage the slowest requests spend their extra time in, or one request's
+span tree.
+
+Usage:
+    python scripts/trace_report.py traces.jsonl
+    python scripts/trace_report.py traces.jsonl --quantile 0.95 --mode text
+    python scripts/trace_report.py traces.jsonl --request-id 3a902a63e02a45a28c7c08c94d37436f
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dara.services.tracing import load_traces, tail_breakdown
+
+
+def print_tree(trace: dict) -> None:
+    """One trace's spans, indented under their parents."""
+    children = {}
+    for span in trace["spans"]:
+        children.setdefault(span["parent_span_id"], []).append(span)
+    
+    def walk(parent_id, depth):
+        for span in children.get(parent_id, []):
+            attributes = " ".join(f"{k}={v}" for k, v in span["attributes"].items())
+            status = "" if span["status"]["code"] == "OK" else f"  [{span['status'].get('message')}]"
+            line = f"{'  ' * depth}{span['name']:<{32 - 2 * depth}} {span['duration_ms']:9.2f} ms  {attributes}{status}"
+            print(line.rstrip())
+            walk(span["span_id"], depth + 1)
+    
+    print(f"\nTrace {trace['trace_id']} (request {trace['request_id']}), {trace['duration_ms']:.1f} ms")
+    walk(None, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize DARA request traces")
+    parser.add_argument("path", help="JSONL file written by JSONLExporter")
+    parser.add_argument("--quantile", type=float, default=0.99, help="Tail threshold quantile")
+    parser.add_argument("--mode", help="Only requests of this mode")
+    parser.add_argument("--request-id", help="Print the span tree of one request")
+    
+    args = parser.parse_args()
+    traces = load_traces(args.path)
+    
+    if args.request_id:
+        matches = [trace for trace in traces if trace["request_id"] == args.request_id]
+        if not matches:
+            parser.error(f"No trace for request '{args.request_id}'")
+        for trace in matches:
+            print_tree(trace)
+        return
+    
+    if args.mode:
+        traces = [
+            trace for trace in traces
+            if trace["spans"] and trace["spans"][0]["attributes"].get("mode") == args.mode
+        ]
+    report = tail_breakdown(traces, args.quantile)
+    if not report["requests"]:
+        print("No traces")
+        return
+    
+    errors = sum(1 for trace in traces if trace.get("error"))
+    print(f"{report['requests']} requests ({errors} failed), "
+          f"p{args.quantile * 100:g} = {report['threshold_ms']:.1f} ms, {report['tail_requests']} in the tail")
+    print(f"\n{'Stage (exclusive ms)':<28}{'mean':>10}{'tail mean':>12}{'tail extra':>12}")
+    print("-" * 62)
+    for name, stats in report["spans"].items():
+        print(f"{name:<28}{stats['mean_ms']:>10.2f}{stats['tail_mean_ms']:>12.2f}{stats['tail_extra_ms']:>12.2f}")
+    
+    slowest = max(traces, key=lambda trace: trace["duration_ms"])
+    print_tree(slowest)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Verify numerical parity between DARA's native pixel preprocessing and
+the Hugging Face image processor.
+
+Usage:
+    python scripts/verify_preprocess.py [--model-id microsoft/Florence-2-base]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import torch
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark_preprocess import load_hf_processor, synthetic_jpeg
+from dara.core.pixels import PixelPreprocessor
+from dara.utils.image import ImageUtils
+
+# Max abs difference allowed per dtype (normalized values span ~[-2.2, 2.7])
+TOLERANCE = {
+    torch.float32: 1e-5,
+    torch.bfloat16: 2e-2,
+    torch.float16: 2e-3,
+}
+
+
+def verify(model_id: str) -> bool:
+    hf_processor, source = load_hf_processor(model_id)
+    print(f"Processor: {source}\n")
+    size = (768, 768)
+    ok = True
+    
+    images = [
+        ImageUtils.load_for_model(synthetic_jpeg(1600 + 97 * i, 1200 + 53 * i, seed=i), size)[0]
+        for i in range(3)
+    ]
+    prompts = ["<MORE_DETAILED_CAPTION>", "<CAPTION>", "<OCR>"]
+    
+    for dtype, tolerance in TOLERANCE.items():
+        native = PixelPreprocessor(hf_processor, size, dtype=dtype)
+        reference = hf_processor(
+            text=prompts, images=images, return_tensors="pt", padding=True, do_resize=False
+        )
+        expected = reference["pixel_values"].to(dtype)
+        actual = native.pixel_values(images)
+        
+        shape_ok = tuple(actual.shape) == tuple(expected.shape)
+        diff = (actual.float() - expected.float()).abs().max().item() if shape_ok else float("inf")
+        passed = shape_ok and diff <= tolerance
+        ok &= passed
+        print(f"{'✓' if passed else '✗'} pixel_values {str(dtype):15s} max|Δ|={diff:.2e} (tol {tolerance:.0e})")
+    
+    native = PixelPreprocessor(hf_processor, size)
+    for prompt in prompts:
+        expected = hf_processor(text=[prompt], images=images[:1], return_tensors="pt")["input_ids"][0]
+        passed = torch.equal(native.prompt_ids(prompt).cpu(), expected)
+        ok &= passed
+        print(f"{'✓' if passed else '✗'} input_ids {prompt}")
+    
+    print("\n✅ Parity verified" if ok else "\n❌ Parity check failed")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-id", default="microsoft/Florence-2-base")
+    args = parser.parse_args()
+    sys.exit(0 if verify(args.model_id) else 1)
@@ -0,0 +1,70 @@
+"""
+Verify that result payloads round-trip through every available
+serialization backend.
+
+Usage:
+    python scripts/verify_serialization.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dara.services.serialization import BACKENDS, MSGPACK_AVAILABLE, dumps, loads
+
+# (name, value, expected after decoding)
+CASES = [
+    ("scalars", [None, True, False, 0, -1, 127, 128, -(1 << 63), (1 << 63) - 1, 0.5, -1e300],
+     [None, True, False, 0, -1, 127, 128, -(1 << 63), (1 << 63) - 1, 0.5, -1e300]),
+    ("repeated strings", ["a", "b", "a", "b", "a"], ["a", "b", "a", "b", "a"]),
+    ("repeated big ints", [2 ** 70, 2 ** 70, "a", "a"], [2 ** 70, 2 ** 70, "a", "a"]),
+    ("big int then its digits", [-(2 ** 80), str(-(2 ** 80)), "x", str(-(2 ** 80))],
+     [-(2 ** 80), str(-(2 ** 80)), "x", str(-(2 ** 80))]),
+    ("unicode and bytes", {"teks": "Rp 50.000 — biru", "raw": b"\x00\xff"},
+     {"teks": "Rp 50.000 — biru", "raw": b"\x00\xff"}),
+    ("tuples and numpy", {"box": (1, 2), "score": np.float32(0.25), "n": np.int64(3)},
+     {"box": [1, 2], "score": 0.25, "n": 3}),
+    ("result", {
+        "mode": "currency",
+        "metadata": {
+            "idr_detected": ["50000", "50000"],
+            "total_idr": 100000,
+        },
+        "timings": {"generate": 812.5, "total": 830.25},
+    }, None),
+]
+
+# msgpack has no integers beyond 64 bits
+STRUCT_ONLY = {"repeated big ints", "big int then its digits"}
+
+
+def verify() -> bool:
+    backends = [backend for backend in BACKENDS if backend != "msgpack" or MSGPACK_AVAILABLE]
+    ok = True
+    for backend in backends:
+        for name, value, expected in CASES:
+            if backend != "struct" and name in STRUCT_ONLY:
+                continue
+            expected = value if expected is None else expected
+            decoded = loads(dumps(value, backend))
+            passed = decoded == expected
+            ok &= passed
+            print(f"{'✓' if passed else '✗'} {backend:8s} {name}")
+            if not passed:
+                print(f"    expected {expected!r}\n    got      {decoded!r}")
+    if not MSGPACK_AVAILABLE:
+        print("- msgpack   not installed, skipped")
+    return ok
+
+
+def main():
+    ok = verify()
+    print("\nAll round-trips passed" if ok else "\nRound-trip FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
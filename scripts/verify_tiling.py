@@ -0,0 +1,90 @@
+"""
+Verify that tiled OCR stitching reads every line once, in reading order.
+
+A synthetic page of word boxes is split with plan_tiles; each tile
+"reads" the words that lie fully inside it (lines clipped by a tile's
+top or bottom edge come back garbled, as they do from the model).
+stitch_regions must rebuild the page text exactly: lines inside an
+overlap strip once, lines spanning several tiles joined.
+
+Usage:
+    python scripts/verify_tiling.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from dara.core.regions import TextRegion
+from dara.core.tiling import plan_tiles, stitch_regions
+
+PAGE = (2000, 1400)
+TILE_SIZE = 768
+WORD_WIDTH, WORD_PITCH = 80, 100
+LINE_HEIGHT, LINE_PITCH = 30, 50
+
+
+def synthetic_page():
+    """Lines of (word, box) pairs; line starts shift so seams fall between and inside words."""
+    lines = []
+    for number, top in enumerate(range(20, PAGE[1] - LINE_HEIGHT, LINE_PITCH)):
+        offset = 10 + (37 * number) % WORD_PITCH
+        words = []
+        for position, left in enumerate(range(offset, PAGE[0] - WORD_WIDTH, WORD_PITCH)):
+            words.append((f"w{number}.{position}", (left, top, left + WORD_WIDTH, top + LINE_HEIGHT)))
+        lines.append(words)
+    return lines
+
+
+def read_tile(tile, lines):
+    """What an OCR-with-regions pass over one tile returns, in tile pixels."""
+    left, top, right, bottom = tile.box
+    regions = []
+    for words in lines:
+        line_top, line_bottom = words[0][1][1], words[0][1][3]
+        if line_bottom <= top or line_top >= bottom:
+            continue
+        inside = [(word, box) for word, box in words if box[0] >= left and box[2] <= right]
+        if not inside:
+            continue
+        box = (inside[0][1][0], max(line_top, top), inside[-1][1][2], min(line_bottom, bottom))
+        clipped = line_top < top or line_bottom > bottom
+        label = "#garbled#" if clipped else " ".join(word for word, _ in inside)
+        regions.append(TextRegion(box=(box[0] - left, box[1] - top, box[2] - left, box[3] - top), label=label))
+    return regions
+
+
+def verify() -> bool:
+    lines = synthetic_page()
+    tiles = plan_tiles(PAGE, TILE_SIZE)
+    text, stats = stitch_regions(tiles, [read_tile(tile, lines) for tile in tiles], PAGE)
+    expected = "\n".join(" ".join(word for word, _ in words) for words in lines)
+    
+    ok = True
+    checks = [
+        ("tiles overlap in both directions", len({t.row for t in tiles}) > 1 and len({t.column for t in tiles}) > 1),
+        ("no garbled edge copies", "#garbled#" not in text),
+        ("every word exactly once", sorted(text.split()) == sorted(expected.split())),
+        ("reading order", text == expected),
+    ]
+    for name, passed in checks:
+        ok &= passed
+        print(f"{'✓' if passed else '✗'} {name}")
+    print(f"  {len(tiles)} tiles, {stats['lines']} lines, {stats['duplicates']} duplicate copies dropped")
+    if text != expected:
+        for got, want in zip(text.split("\n"), expected.split("\n")):
+            if got != want:
+                print(f"  first difference:\n    expected {want}\n    got      {got}")
+                break
+    return ok
+
+
+def main():
+    ok = verify()
+    print("\nStitching passed" if ok else "\nStitching FAILED")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,7 @@ Modes:
     - medicine: Reads medicine labels and dosages
     - currency: Identifies currency (Indonesian Rupiah focus)
     - text: OCR for any text
+    - auto: Picks one of the above from a quick caption
 
 For more information, see: https://github.com/ardelyo/dara
 """
@@ -38,6 +39,7 @@ from .modes import (
     MedicineMode,
     CurrencyMode,
     TextMode,
+    ModeRouter,
 )
 
 # Service exports
@@ -64,6 +66,7 @@ __all__ = [
     "MedicineMode",
     "CurrencyMode",
     "TextMode",
+    "ModeRouter",
     # Services
     "TTSService",
     "TranslationService",
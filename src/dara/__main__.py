@@ -0,0 +1,7 @@
+"""Allow `python -m dara` to run the DARA CLI."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,412 @@
+"""
+DARA Command-Line Interface
+Batch processing of image archives with resumable JSONL output.
+
+Usage:
+    dara batch photos/ --modes scene,text --output results.jsonl
+    dara batch "archive/**/*.jpg" --modes currency --workers 8
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Optional, Set, Tuple
+
+from .utils.image import ImageUtils
+from .utils.logging import get_logger
+
+logger = get_logger("cli")
+
+# Result keys not worth persisting in batch output
+_SKIPPED_RESULT_KEYS = {"audio"}
+
+
+def collect_images(inputs: List[str], recursive: bool = False) -> List[Path]:
+    """
+    Expand directories, globs and file paths into a sorted image list.
+    
+    Args:
+        inputs: Directory paths, glob patterns or image paths
+        recursive: Descend into subdirectories of directory inputs
+        
+    Returns:
+        Sorted, de-duplicated list of supported image paths
+    """
+    found: Set[Path] = set()
+    
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            candidates = path.rglob("*") if recursive else path.glob("*")
+        elif path.is_file():
+            candidates = [path]
+        else:
+            candidates = (Path(p) for p in glob.glob(item, recursive=True))
+        
+        for candidate in candidates:
+            if candidate.is_file() and candidate.suffix.lower() in ImageUtils.SUPPORTED_FORMATS:
+                found.add(candidate)
+    
+    return sorted(found)
+
+
+def _file_key(path: Path) -> str:
+    """Cheap identity for a file that changes when the file is rewritten."""
+    stat = path.stat()
+    return f"{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _decode_image(
+    path: str,
+    input_size: Optional[int]
+) -> Tuple[str, Optional[str], Optional[object], Optional[str]]:
+    """
+    Decode and hash one image (runs in a worker process).
+    
+    The hash is taken from the file's bytes, so it names the same image
+    whatever modes or input size a run uses, and resuming works across
+    different --modes selections.
+    
+    Args:
+        path: Image path
+        input_size: Model input size to resize to, or None to keep full
+            resolution (for tiled and region OCR)
+        
+    Returns:
+        Tuple of (path, image_hash, image, error)
+    """
+    try:
+        data = Path(path).read_bytes()
+        image_hash = hashlib.md5(data).hexdigest()
+        if input_size is None:
+            image = ImageUtils.load(data, convert_rgb=True)
+        else:
+            image, _, _ = ImageUtils.load_for_model(data, (input_size, input_size))
+        return path, image_hash, image, None
+    except Exception as e:
+        return path, None, None, str(e)
+
+
+class DecodePool:
+    """
+    Ordered, bounded-window image decoding over a process pool.
+    
+    Only `window` decoded images are in flight at once, so memory
+    stays flat regardless of archive size. An input_size of None
+    decodes at full resolution.
+    """
+    
+    def __init__(self, paths: List[Path], input_size: Optional[int], workers: int, window: int):
+        self.paths = [str(p) for p in paths]
+        self.input_size = input_size
+        self.workers = workers
+        self.window = max(window, 1)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: deque = deque()
+        self._next_index = 0
+    
+    def start(self) -> "DecodePool":
+        """Start workers and submit the first window of images."""
+        if self.workers > 1:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            while self._next_index < len(self.paths) and len(self._pending) < self.window:
+                self._submit_next()
+        return self
+    
+    def _submit_next(self) -> None:
+        path = self.paths[self._next_index]
+        self._next_index += 1
+        self._pending.append(self._executor.submit(_decode_image, path, self.input_size))
+    
+    def __iter__(self) -> Iterator[tuple]:
+        if self._executor is None:
+            for path in self.paths:
+                yield _decode_image(path, self.input_size)
+            return
+        
+        while self._pending:
+            future = self._pending.popleft()
+            if self._next_index < len(self.paths):
+                self._submit_next()
+            yield future.result()
+    
+    def close(self) -> None:
+        """Shut down the worker pool."""
+        if self._executor is not None:
+            for future in self._pending:
+                future.cancel()
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+class ProgressReporter:
+    """Prints throughput and ETA to stderr as a batch runs."""
+    
+    def __init__(self, total: int, interval: float = 2.0, stream=None):
+        self.total = total
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self.processed = 0
+        self.skipped = 0
+        self.failed = 0
+        self._start = time.perf_counter()
+        self._last_report = 0.0
+    
+    def update(self, processed: int = 0, skipped: int = 0, failed: int = 0) -> None:
+        """Record progress and report if the interval has elapsed."""
+        self.processed += processed
+        self.skipped += skipped
+        self.failed += failed
+        now = time.perf_counter()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.report()
+    
+    @property
+    def rate(self) -> float:
+        """Processed images per second (skipped images excluded)."""
+        elapsed = time.perf_counter() - self._start
+        return self.processed / elapsed if elapsed > 0 else 0.0
+    
+    def report(self, final: bool = False) -> None:
+        """Write a single progress line."""
+        done = self.processed + self.skipped + self.failed
+        remaining = max(self.total - done, 0)
+        rate = self.rate
+        eta = _format_duration(remaining / rate) if rate > 0 else "--:--:--"
+        line = (
+            f"[{done}/{self.total}] {rate:.2f} img/s | "
+            f"processed={self.processed} skipped={self.skipped} failed={self.failed} | "
+            f"ETA {eta}"
+        )
+        end = "\n" if final else "\r"
+        self.stream.write(line + end)
+        self.stream.flush()
+
+
+def _format_duration(seconds: float) -> str:
+    """Format seconds as HH:MM:SS."""
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def load_progress(output_path: Path) -> Tuple[Set[tuple], dict]:
+    """
+    Read an existing JSONL output to find completed work.
+    
+    Args:
+        output_path: JSONL file written by a previous run
+        
+    Returns:
+        Tuple of (done keys as (image_hash, mode, language), file_key -> image_hash)
+    """
+    done: Set[tuple] = set()
+    file_hashes: dict = {}
+    
+    if not output_path.exists():
+        return done, file_hashes
+    
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Partial line from an interrupted run
+                continue
+            if record.get("error") or not record.get("image_hash"):
+                continue
+            done.add((record["image_hash"], record["mode"], record["language"]))
+            if record.get("file_key"):
+                file_hashes[record["file_key"]] = record["image_hash"]
+    
+    return done, file_hashes
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    """Execute the `batch` subcommand. Returns process exit code."""
+    from .config import get_config
+    from .core.model import DARA
+    from .core.resolution import resolve_mode_size
+    
+    modes = [m.strip() for m in ",".join(args.modes).split(",") if m.strip()]
+    output_path = Path(args.output)
+    paths = collect_images(args.inputs, recursive=args.recursive)
+    
+    if not paths:
+        print("No images found.", file=sys.stderr)
+        return 1
+    
+    if args.overwrite and output_path.exists():
+        output_path.unlink()
+    done, file_hashes = load_progress(output_path)
+    
+    # Skip files already fully processed without decoding them again
+    file_keys = {str(p): _file_key(p) for p in paths}
+    
+    def is_complete(image_hash: Optional[str]) -> bool:
+        return image_hash is not None and all(
+            (image_hash, mode, args.language) in done for mode in modes
+        )
+    
+    todo = [p for p in paths if not is_complete(file_hashes.get(file_keys[str(p)]))]
+    progress = ProgressReporter(total=len(paths), interval=args.progress_interval)
+    progress.update(skipped=len(paths) - len(todo))
+    
+    config = get_config()
+    handlers = DARA.create_modes(config)
+    for mode in modes:
+        if mode == config.MODE_AUTO:
+            print(
+                f"Mode '{mode}' is not supported by batch runs; list the modes to run instead "
+                f"(available: {', '.join(handlers)})",
+                file=sys.stderr
+            )
+            return 2
+        if mode not in handlers:
+            print(f"Invalid mode '{mode}'. Available: {', '.join(handlers)}", file=sys.stderr)
+            return 2
+    
+    # Decode once at the largest input any selected mode needs. Tiled and
+    # region OCR cut their tiles from the full image, so a mode using
+    # either keeps full resolution and DARA resizes per mode.
+    strategy = config.inference.ocr_strategy
+    full_resolution = any(
+        (strategy == "tiled" and handlers[mode].supports_tiling)
+        or (strategy == "regions" and handlers[mode].supports_regions)
+        for mode in modes
+    )
+    input_size = None if full_resolution else max(resolve_mode_size(handlers[mode], config) for mode in modes)
+    batch_size = args.batch_size or config.inference.batch_size
+    workers = args.workers if args.workers is not None else max((os.cpu_count() or 2) - 1, 1)
+    
+    # Start decoding before the model loads so the two overlap; full-size
+    # images get a smaller window
+    pool = DecodePool(
+        todo,
+        input_size=input_size,
+        workers=workers,
+        window=(1 if full_resolution else batch_size) * max(workers, 1) * 2
+    ).start()
+    
+    try:
+        dara = DARA(
+            model_id=args.model_id,
+            config=config,
+            enable_tts=False,
+            enable_cache=True,
+            log_level=args.log_level
+        )
+        
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "a+", encoding="utf-8") as out:
+            # Terminate a line left partial by an interrupted run
+            if out.tell() > 0:
+                out.seek(out.tell() - 1)
+                if out.read(1) != "\n":
+                    out.write("\n")
+            batch: List[tuple] = []
+            for path, image_hash, image, error in pool:
+                if error:
+                    out.write(json.dumps({"path": path, "error": error}, ensure_ascii=False) + "\n")
+                    progress.update(failed=1)
+                    continue
+                if is_complete(image_hash):
+                    progress.update(skipped=1)
+                    continue
+                batch.append((path, image_hash, image))
+                if len(batch) >= batch_size:
+                    _process_batch(dara, batch, modes, args.language, done, file_keys, out, progress)
+                    batch = []
+            if batch:
+                _process_batch(dara, batch, modes, args.language, done, file_keys, out, progress)
+    finally:
+        pool.close()
+    
+    progress.report(final=True)
+    return 0
+
+
+def _process_batch(dara, batch, modes, language, done, file_keys, out, progress) -> None:
+    """Run every pending mode over a decoded batch and append JSONL records."""
+    for mode in modes:
+        items = [item for item in batch if (item[1], mode, language) not in done]
+        if not items:
+            continue
+        results = dara.detect_batch(
+            [image for _, _, image in items],
+            mode=mode,
+            language=language,
+            generate_audio=False,
+            batch_size=len(items),
+            image_hashes=[image_hash for _, image_hash, _ in items]
+        )
+        for (path, image_hash, _), result in zip(items, results):
+            record = {
+                "path": path,
+                "file_key": file_keys[path],
+                "image_hash": image_hash,
+                **{k: v for k, v in result.items() if k not in _SKIPPED_RESULT_KEYS},
+            }
+            out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            done.add((image_hash, mode, language))
+    out.flush()
+    progress.update(processed=len(batch))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the top-level argument parser."""
+    parser = argparse.ArgumentParser(
+        prog="dara",
+        description="DARA - Detect & Assist Recognition AI"
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    
+    batch = subparsers.add_parser(
+        "batch",
+        help="Process a directory or glob of images into JSONL results"
+    )
+    batch.add_argument("inputs", nargs="+", help="Directories, glob patterns or image files")
+    batch.add_argument(
+        "-m", "--modes", action="append", default=None,
+        help="Comma-separated modes to run (repeatable, default: scene; not auto)"
+    )
+    batch.add_argument("-o", "--output", default="dara_results.jsonl", help="JSONL output path")
+    batch.add_argument("-l", "--language", default="en", help="Output language code")
+    batch.add_argument("-b", "--batch-size", type=int, default=None, help="Images per generate call")
+    batch.add_argument(
+        "-w", "--workers", type=int, default=None,
+        help="Decode worker processes (default: CPU count - 1, 1 disables the pool)"
+    )
+    batch.add_argument("-r", "--recursive", action="store_true", help="Recurse into directories")
+    batch.add_argument("--overwrite", action="store_true", help="Discard existing output instead of resuming")
+    batch.add_argument("--model-id", default=None, help="Hugging Face model ID")
+    batch.add_argument("--progress-interval", type=float, default=2.0, help="Seconds between progress lines")
+    batch.add_argument("--log-level", default="WARNING", help="Logging level")
+    batch.set_defaults(func=run_batch)
+    
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """CLI entry point."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    
+    if not getattr(args, "func", None):
+        parser.print_help()
+        return 1
+    if args.command == "batch" and not args.modes:
+        args.modes = ["scene"]
+    
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,9 +4,10 @@ Centralized configuration management with dataclasses.
 """
 
 import os
+import json
 import torch
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Any, Dict, Optional
 
 
 @dataclass
@@ -16,6 +17,13 @@ class ModelConfig:
     use_flash_attention: bool = False
     trust_remote_code: bool = True
     attn_implementation: str = "eager"
+    # Cascade: re-run low-confidence results on a larger checkpoint
+    escalation_model_id: Optional[str] = None  # e.g. "microsoft/Florence-2-large"
+    escalation_idle_timeout: float = 300.0  # seconds before the larger model is released
+    escalation_thresholds: Dict[str, float] = field(default_factory=dict)  # per-mode overrides
+    # "florence2", or "stub": canned outputs and synthetic delays, no weights (core/stub.py)
+    backend: str = "florence2"
+    stub_latency_ms: Dict[str, float] = field(default_factory=dict)  # e.g. {"generate": 120, "per_image": 30}
 
 
 @dataclass
@@ -23,9 +31,43 @@ class InferenceConfig:
     """Inference optimization settings."""
     enable_cache: bool = True
     cache_size: int = 100
+    cache_compact: bool = True  # hold cached results as binary payloads (services/serialization.py)
+    cache_max_bytes: Optional[int] = None  # estimated bytes bound on top of cache_size
+    cache_policy: str = "lru"  # "lru", "gdsf" (size- and cost-aware)
+    cache_ttl_seconds: Optional[float] = None
     max_new_tokens: int = 256
     quantization: str = "none"  # "none", "fp16", "int8"
     max_image_size: int = 1024
+    input_size: int = 768  # Florence-2 vision input (pixels per side)
+    preprocess_backend: str = "native"  # "native", "hf"
+    batch_size: int = 8
+    async_workers: int = 1  # detect_async threads running the model at once
+    # Request profiling (utils/profiling.py): off unless a trigger is set
+    profile_every_n: int = 0  # profile every Nth detect call
+    profile_slower_than_ms: Optional[float] = None  # profile the next call after a slower one
+    profile_tools: str = "cprofile"  # comma-separated: "cprofile", "torch"
+    profile_dir: str = ".cache/profiles"
+    # Request tracing (services/tracing.py)
+    tracing: bool = False  # keep traces in memory (DARA.tracer.traces)
+    trace_file: Optional[str] = None  # also append them to this JSONL file (implies tracing)
+    trace_sample_rate: float = 1.0
+    trace_buffer_size: int = 1000
+    # Per-mode input size overrides, e.g. {"emotion": 384}; DARA_RESOLUTION_PROFILE loads
+    # them from a scripts/sweep_resolution.py profile (docs/resolution_profile.example.json)
+    mode_image_sizes: Dict[str, int] = field(default_factory=dict)
+    position_interpolation: str = "extend"  # "extend", "interpolate"
+    ocr_strategy: str = "full"  # "full", "tiled" (modes that support tiling)
+    tile_overlap: float = 0.15
+    max_tiles: int = 16
+    skip_blank_tiles: bool = True
+    max_text_regions: int = 24  # more regions than this: use the region pass text as-is
+    region_margin: float = 0.2  # crop padding, fraction of line height
+    router_image_size: int = 512  # input size for the auto mode's caption pass
+    # Currency: answer from banknote color when confident, else cross-check OCR.
+    # Needs a calibration with background samples; off until one is validated
+    currency_fast_path: bool = False
+    currency_color_threshold: float = 0.85
+    currency_calibration: Optional[str] = None  # see scripts/calibrate_currency.py
 
 
 @dataclass
@@ -66,6 +108,7 @@ class Config:
     MODE_MEDICINE: str = "medicine"
     MODE_CURRENCY: str = "currency"
     MODE_TEXT: str = "text"
+    MODE_AUTO: str = "auto"
     
     # Legacy prompts mapping (for backward compatibility)
     PROMPTS: dict = field(default_factory=lambda: {
@@ -79,14 +122,35 @@ class Config:
     @classmethod
     def from_env(cls) -> "Config":
         """Load configuration from environment variables."""
+        resolution = load_resolution_profile(os.getenv("DARA_RESOLUTION_PROFILE"))
         return cls(
             model=ModelConfig(
                 model_id=os.getenv("DARA_MODEL_ID", "microsoft/Florence-2-base"),
+                escalation_model_id=os.getenv("DARA_ESCALATION_MODEL_ID") or None,
+                escalation_idle_timeout=float(os.getenv("DARA_ESCALATION_IDLE_TIMEOUT", "300")),
+                backend=os.getenv("DARA_BACKEND", "florence2"),
+                stub_latency_ms=parse_latency(os.getenv("DARA_STUB_LATENCY")),
             ),
             inference=InferenceConfig(
                 enable_cache=os.getenv("DARA_ENABLE_CACHE", "true").lower() == "true",
                 cache_size=int(os.getenv("DARA_CACHE_SIZE", "100")),
+                cache_compact=os.getenv("DARA_CACHE_COMPACT", "true").lower() == "true",
+                cache_max_bytes=int(os.getenv("DARA_CACHE_MAX_BYTES", "0")) or None,
+                cache_policy=os.getenv("DARA_CACHE_POLICY", "lru"),
+                cache_ttl_seconds=float(os.getenv("DARA_CACHE_TTL", "0")) or None,
+                async_workers=int(os.getenv("DARA_ASYNC_WORKERS", "1")),
+                profile_every_n=int(os.getenv("DARA_PROFILE_EVERY_N", "0")),
+                profile_slower_than_ms=float(os.getenv("DARA_PROFILE_SLOWER_THAN_MS", "0")) or None,
+                profile_tools=os.getenv("DARA_PROFILE_TOOLS", "cprofile"),
+                profile_dir=os.getenv("DARA_PROFILE_DIR", ".cache/profiles"),
+                tracing=os.getenv("DARA_TRACING", "false").lower() == "true",
+                trace_file=os.getenv("DARA_TRACE_FILE") or None,
+                trace_sample_rate=float(os.getenv("DARA_TRACE_SAMPLE_RATE", "1.0")),
                 quantization=os.getenv("DARA_QUANTIZATION", "none"),
+                mode_image_sizes=resolution["mode_image_sizes"],
+                position_interpolation=resolution["position_interpolation"],
+                currency_fast_path=os.getenv("DARA_CURRENCY_FAST_PATH", "false").lower() == "true",
+                currency_calibration=os.getenv("DARA_CURRENCY_CALIBRATION") or None,
             ),
             tts=TTSConfig(
                 engine=os.getenv("DARA_TTS_ENGINE", "pyttsx3"),
@@ -105,6 +169,50 @@ class Config:
         return self.device
 
 
+def parse_latency(spec: Optional[str]) -> Dict[str, float]:
+    """
+    Parse stub delays from "generate=120,per_image=30" (milliseconds).
+    
+    Args:
+        spec: Comma-separated stage=ms pairs (None returns no delays)
+        
+    Returns:
+        Stage name to milliseconds mapping
+    """
+    if not spec:
+        return {}
+    latency = {}
+    for part in spec.split(","):
+        name, _, value = part.partition("=")
+        latency[name.strip()] = float(value)
+    return latency
+
+
+def load_resolution_profile(path: Optional[str]) -> Dict[str, Any]:
+    """
+    Load per-mode input sizes from a sweep_resolution.py profile.
+    
+    The profile's position interpolation comes along, since the sizes
+    were measured with it.
+    
+    Args:
+        path: Profile JSON path (None keeps every mode at input_size)
+        
+    Returns:
+        Dictionary with:
+            - mode_image_sizes: Mode name to input size mapping
+            - position_interpolation: "extend" or "interpolate"
+    """
+    if not path:
+        return {"mode_image_sizes": {}, "position_interpolation": "extend"}
+    with open(path, "r", encoding="utf-8") as f:
+        profile = json.load(f)
+    return {
+        "mode_image_sizes": {mode: int(size) for mode, size in profile.get("mode_image_sizes", {}).items()},
+        "position_interpolation": profile.get("position_interpolation", "extend"),
+    }
+
+
 # Global default config instance
 _default_config: Optional[Config] = None
 
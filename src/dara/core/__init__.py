@@ -2,5 +2,6 @@
 from .model import DARA
 from .processor import ImageProcessor
 from .inference import InferenceEngine
+from .stub import StubModel, StubProcessor, StubSpeechEngine
 
-__all__ = ["DARA", "ImageProcessor", "InferenceEngine"]
+__all__ = ["DARA", "ImageProcessor", "InferenceEngine", "StubModel", "StubProcessor", "StubSpeechEngine"]
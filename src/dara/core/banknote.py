@@ -0,0 +1,258 @@
+"""
+DARA Core - Banknote Color Classifier
+HSV histogram matching for recognizing banknotes without running the model.
+"""
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from .tiling import is_blank
+
+# Side of the thumbnail histograms are computed on
+THUMBNAIL_SIZE = 64
+
+# Fraction of each side kept by the center crop (drops hands and background)
+CENTER_CROP = 0.8
+
+# Histogram bins for hue, saturation and value
+HUE_BINS = 18
+SATURATION_BINS = 4
+VALUE_BINS = 3
+
+# Spread of synthetic reference colors: hue in degrees, saturation and value in [0, 1]
+REFERENCE_SPREAD = (15.0, 0.12, 0.12)
+
+# Negative class: photos that are not banknotes (paper, walls, colored pages)
+BACKGROUND = "background"
+
+
+@dataclass
+class ColorPrediction:
+    """
+    Classifier output for one image.
+    
+    Attributes:
+        label: Best matching class (e.g. a denomination), None if nothing
+            matched or the background class matched best
+        confidence: Bhattacharyya coefficient of the best class (0.0 - 1.0)
+        margin: Lead of the best class over the runner-up (including background)
+        calibrated: Whether the prototypes came from real photos, negatives included
+        similarities: Bhattacharyya coefficient per class
+    """
+    label: Optional[str]
+    confidence: float
+    margin: float = 0.0
+    calibrated: bool = False
+    similarities: Dict[str, float] = field(default_factory=dict)
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary."""
+        return {
+            "label": self.label,
+            "confidence": self.confidence,
+            "margin": self.margin,
+            "calibrated": self.calibrated,
+            "similarities": self.similarities
+        }
+
+
+def hsv_histogram(image: Image.Image) -> np.ndarray:
+    """
+    Normalized joint hue/saturation/value histogram of an image's center.
+    
+    Args:
+        image: RGB image of any size
+        
+    Returns:
+        Flat histogram of HUE_BINS * SATURATION_BINS * VALUE_BINS bins summing to 1
+    """
+    width, height = image.size
+    dx, dy = int(width * (1 - CENTER_CROP) / 2), int(height * (1 - CENTER_CROP) / 2)
+    thumb = image.crop((dx, dy, width - dx, height - dy)).convert("RGB")
+    thumb = thumb.resize((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.Resampling.BILINEAR)
+    hsv = np.asarray(thumb.convert("HSV"), dtype=np.uint16).reshape(-1, 3)
+    return _histogram(hsv[:, 0], hsv[:, 1], hsv[:, 2])
+
+
+def _histogram(hue: np.ndarray, saturation: np.ndarray, value: np.ndarray) -> np.ndarray:
+    """Bin 0-255 HSV channels into one normalized flat histogram."""
+    h = hue.astype(np.int64) * HUE_BINS // 256
+    s = saturation.astype(np.int64) * SATURATION_BINS // 256
+    v = value.astype(np.int64) * VALUE_BINS // 256
+    index = (h * SATURATION_BINS + s) * VALUE_BINS + v
+    counts = np.bincount(index, minlength=HUE_BINS * SATURATION_BINS * VALUE_BINS)
+    return counts.astype(np.float32) / max(counts.sum(), 1)
+
+
+def reference_histogram(hsv: Tuple[float, float, float], samples: int = 4096) -> np.ndarray:
+    """
+    Histogram of a nominal color, spread to tolerate lighting and wear.
+    
+    Args:
+        hsv: (hue in degrees, saturation, value), saturation and value in [0, 1]
+        samples: Synthetic pixels drawn around the color
+        
+    Returns:
+        Flat normalized histogram
+    """
+    rng = np.random.default_rng(0)
+    hue_sd, sat_sd, val_sd = REFERENCE_SPREAD
+    hue = (rng.normal(hsv[0], hue_sd, samples) % 360) * 256 / 360
+    sat = np.clip(rng.normal(hsv[1], sat_sd, samples), 0, 1) * 255
+    val = np.clip(rng.normal(hsv[2], val_sd, samples), 0, 1) * 255
+    return _histogram(hue.astype(np.uint16) % 256, sat.astype(np.uint16), val.astype(np.uint16))
+
+
+class BanknoteColorClassifier:
+    """
+    Nearest-prototype classifier over HSV histograms.
+    
+    Each class has a prototype histogram, synthesized from a nominal
+    color until ``calibrate`` replaces it with the mean histogram of
+    real sample photos. An image is compared with every prototype by
+    Bhattacharyya coefficient; the best coefficient is the confidence
+    and its lead over the runner-up the margin, so a weak best match
+    stays a weak match. A BACKGROUND class, calibrated from photos that
+    are not banknotes, absorbs colored pages and paper. Flat,
+    texture-less images (walls, paper) never match, since banknotes are
+    covered in fine print.
+    
+    Synthetic prototypes are guesses: ``calibrated`` is only set once
+    real samples, background included, have replaced them, and callers
+    should not act on predictions before that.
+    
+    Example:
+        >>> classifier = BanknoteColorClassifier({"50000": (210, 0.5, 0.7)})
+        >>> classifier.calibrate({"50000": [Image.open("50k.jpg")], "background": [Image.open("desk.jpg")]})
+        >>> classifier.classify(Image.open("note.jpg")).label
+        '50000'
+    """
+    
+    def __init__(
+        self,
+        references: Dict[str, Tuple[float, float, float]],
+        min_similarity: float = 0.35,
+        min_margin: float = 0.1
+    ):
+        """
+        Initialize the classifier.
+        
+        Args:
+            references: Nominal (hue degrees, saturation, value) per class
+            min_similarity: Best similarity below this means no match
+            min_margin: Lead over the runner-up below this means no match
+        """
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self.labels: List[str] = list(references)
+        self.prototypes = np.stack([reference_histogram(references[label]) for label in self.labels])
+        self.calibrated = False
+    
+    def classify(self, image: Image.Image) -> ColorPrediction:
+        """
+        Classify an image.
+        
+        Args:
+            image: RGB image, ideally one note filling the frame
+            
+        Returns:
+            ColorPrediction (label None and confidence 0 when nothing
+            matches, the match is ambiguous or the background wins)
+        """
+        if is_blank(image):
+            return ColorPrediction(label=None, confidence=0.0, calibrated=self.calibrated)
+        
+        histogram = hsv_histogram(image)
+        similarities = np.sqrt(self.prototypes * histogram).sum(axis=1)
+        scores = {label: float(sim) for label, sim in zip(self.labels, similarities)}
+        
+        order = np.argsort(similarities)[::-1]
+        best = int(order[0])
+        margin = float(similarities[best] - similarities[order[1]]) if len(order) > 1 else float(similarities[best])
+        if (
+            similarities[best] < self.min_similarity
+            or margin < self.min_margin
+            or self.labels[best] == BACKGROUND
+        ):
+            return ColorPrediction(
+                label=None, confidence=0.0, margin=margin, calibrated=self.calibrated, similarities=scores
+            )
+        
+        return ColorPrediction(
+            label=self.labels[best],
+            confidence=float(similarities[best]),
+            margin=margin,
+            calibrated=self.calibrated,
+            similarities=scores
+        )
+    
+    def calibrate(self, samples: Dict[str, Iterable[Image.Image]]) -> "BanknoteColorClassifier":
+        """
+        Replace prototypes with the mean histogram of sample photos.
+        
+        Classes without samples keep their current prototype. The
+        classifier counts as calibrated only when BACKGROUND samples
+        (photos that are not banknotes) are among them.
+        
+        Args:
+            samples: Sample images per class label
+            
+        Returns:
+            self
+        """
+        for label, images in samples.items():
+            histograms = [hsv_histogram(image.convert("RGB")) for image in images]
+            if not histograms:
+                continue
+            if label not in self.labels:
+                self.labels.append(label)
+                self.prototypes = np.vstack([self.prototypes, np.zeros_like(self.prototypes[:1])])
+            self.prototypes[self.labels.index(label)] = np.mean(histograms, axis=0)
+        self.calibrated = BACKGROUND in self.labels
+        return self
+    
+    def save(self, path: str) -> None:
+        """Write prototypes and settings to a JSON file."""
+        data = {
+            "min_similarity": self.min_similarity,
+            "min_margin": self.min_margin,
+            "bins": [HUE_BINS, SATURATION_BINS, VALUE_BINS],
+            "prototypes": {
+                label: prototype.tolist() for label, prototype in zip(self.labels, self.prototypes)
+            },
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+    
+    def load_calibration(self, path: str) -> "BanknoteColorClassifier":
+        """
+        Load prototypes written by ``save``.
+        
+        Args:
+            path: Calibration JSON path
+            
+        Returns:
+            self
+        """
+        with open(Path(path), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        
+        if data.get("bins") != [HUE_BINS, SATURATION_BINS, VALUE_BINS]:
+            raise ValueError(f"Calibration {path} uses bins {data.get('bins')}, expected "
+                             f"{[HUE_BINS, SATURATION_BINS, VALUE_BINS]}")
+        
+        self.min_similarity = data.get("min_similarity", self.min_similarity)
+        self.min_margin = data.get("min_margin", self.min_margin)
+        self.labels = list(data["prototypes"])
+        self.prototypes = np.array([data["prototypes"][label] for label in self.labels], dtype=np.float32)
+        # Files written without background samples leave the fast path off
+        self.calibrated = BACKGROUND in self.labels
+        return self
+    
+    def __repr__(self) -> str:
+        return f"<BanknoteColorClassifier(classes={len(self.labels)}, calibrated={self.calibrated})>"
@@ -0,0 +1,192 @@
+"""
+DARA Core - Model Cascade
+Lazily loaded escalation model with idle release and cascade statistics.
+"""
+
+import gc
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+import torch
+
+from ..utils.logging import get_logger
+
+logger = get_logger("cascade")
+
+
+class CascadeStats:
+    """
+    Escalation counts and end-to-end latency per mode.
+    
+    Latency samples are kept in a bounded window per mode, so
+    percentiles reflect recent traffic.
+    """
+    
+    def __init__(self, window: int = 1000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._requests: Dict[str, int] = {}
+        self._escalations: Dict[str, int] = {}
+        self._latencies: Dict[str, deque] = {}
+        self.loads = 0
+        self.releases = 0
+        self.load_seconds = 0.0
+    
+    def record(self, mode: str, latency_ms: float, escalated: bool) -> None:
+        """Record one served request."""
+        with self._lock:
+            self._requests[mode] = self._requests.get(mode, 0) + 1
+            if escalated:
+                self._escalations[mode] = self._escalations.get(mode, 0) + 1
+            self._latencies.setdefault(mode, deque(maxlen=self.window)).append(latency_ms)
+    
+    @staticmethod
+    def _percentile(samples: list, q: float) -> float:
+        """Nearest-rank percentile of sorted samples."""
+        if not samples:
+            return 0.0
+        rank = math.ceil(q / 100 * len(samples))
+        return samples[min(max(rank, 1), len(samples)) - 1]
+    
+    def _summary(self, requests: int, escalations: int, latencies: list) -> dict:
+        latencies = sorted(latencies)
+        return {
+            "requests": requests,
+            "escalations": escalations,
+            "escalation_rate": escalations / requests if requests else 0.0,
+            "mean_ms": sum(latencies) / len(latencies) if latencies else 0.0,
+            "p50_ms": self._percentile(latencies, 50),
+            "p95_ms": self._percentile(latencies, 95),
+            "p99_ms": self._percentile(latencies, 99),
+        }
+    
+    @property
+    def summary(self) -> dict:
+        """Overall and per-mode escalation rate and latency percentiles."""
+        with self._lock:
+            modes = {
+                mode: self._summary(
+                    self._requests[mode],
+                    self._escalations.get(mode, 0),
+                    list(self._latencies.get(mode, ()))
+                )
+                for mode in self._requests
+            }
+            overall = self._summary(
+                sum(self._requests.values()),
+                sum(self._escalations.values()),
+                [ms for samples in self._latencies.values() for ms in samples]
+            )
+        return {
+            **overall,
+            "modes": modes,
+            "escalation_model_loads": self.loads,
+            "escalation_model_releases": self.releases,
+            "escalation_model_load_seconds": self.load_seconds,
+        }
+
+
+class ModelCascade:
+    """
+    Holds the larger escalation model, loading it on first use.
+    
+    The model is released after ``idle_timeout`` seconds without use,
+    but never while a generation is running on it.
+    
+    Example:
+        >>> cascade = ModelCascade(load_large, "microsoft/Florence-2-large", idle_timeout=300)
+        >>> with cascade.acquire() as model:
+        ...     model.generate(...)
+    """
+    
+    def __init__(
+        self,
+        loader: Callable[[], Any],
+        model_id: str,
+        idle_timeout: float = 300.0
+    ):
+        """
+        Initialize the cascade.
+        
+        Args:
+            loader: Callable returning the loaded escalation model
+            model_id: Escalation model ID (for logs and metadata)
+            idle_timeout: Seconds of inactivity before release (0 keeps it loaded)
+        """
+        self.loader = loader
+        self.model_id = model_id
+        self.idle_timeout = idle_timeout
+        self.stats = CascadeStats()
+        
+        self._model: Optional[Any] = None
+        self._active = 0
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+    
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+    
+    @contextmanager
+    def acquire(self):
+        """Yield the escalation model, loading it if needed."""
+        with self._lock:
+            self._cancel_timer()
+            if self._model is None:
+                logger.info("Loading escalation model %s...", self.model_id)
+                start = time.perf_counter()
+                self._model = self.loader()
+                elapsed = time.perf_counter() - start
+                self.stats.loads += 1
+                self.stats.load_seconds += elapsed
+                logger.info("Escalation model loaded in %.1fs", elapsed)
+            self._active += 1
+            model = self._model
+        
+        try:
+            yield model
+        finally:
+            with self._lock:
+                self._active -= 1
+                if self._active == 0:
+                    self._schedule_release()
+    
+    def release(self) -> bool:
+        """
+        Free the escalation model now if it is idle.
+        
+        Returns:
+            True if a model was released
+        """
+        with self._lock:
+            self._cancel_timer()
+            if self._model is None or self._active:
+                return False
+            self._model = None
+            self.stats.releases += 1
+        
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        logger.info("Released idle escalation model %s", self.model_id)
+        return True
+    
+    def _schedule_release(self) -> None:
+        """Start the idle timer (caller holds the lock)."""
+        if self.idle_timeout and self.idle_timeout > 0:
+            self._timer = threading.Timer(self.idle_timeout, self.release)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def _cancel_timer(self) -> None:
+        """Stop a pending idle release (caller holds the lock)."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+    
+    def __repr__(self) -> str:
+        return f"<ModelCascade(model={self.model_id}, loaded={self.is_loaded})>"
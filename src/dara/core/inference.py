@@ -13,6 +13,35 @@ from ..services.cache import InferenceCache
 logger = get_logger("inference")
 
 
+def quantize_model(model, quantization: str, device: str = "cpu"):
+    """
+    Quantize a loaded model.
+    
+    Args:
+        model: Loaded model
+        quantization: "none", "fp16" (accelerators only) or "int8"
+            (dynamic quantization of Linear layers)
+        device: Device the model is on
+        
+    Returns:
+        The quantized model (the same model if nothing was applied)
+    """
+    if quantization == "fp16" and device != "cpu":
+        model = model.half()
+        logger.info("Applied FP16 quantization")
+    elif quantization == "int8":
+        try:
+            model = torch.quantization.quantize_dynamic(
+                model,
+                {torch.nn.Linear},
+                dtype=torch.qint8
+            )
+            logger.info("Applied INT8 dynamic quantization")
+        except Exception as e:
+            logger.warning("INT8 quantization failed, using default: %s", e)
+    return model
+
+
 class InferenceEngine:
     """
     Optimized inference engine for DARA model.
@@ -67,25 +96,13 @@ class InferenceEngine:
         self._apply_quantization()
         
         logger.info(
-            f"InferenceEngine initialized "
-            f"(device={device}, quantization={quantization}, cache={enable_cache})"
+            "InferenceEngine initialized (device=%s, quantization=%s, cache=%s)",
+            device, quantization, enable_cache
         )
     
     def _apply_quantization(self) -> None:
         """Apply quantization based on configuration."""
-        if self.quantization == "fp16" and self.device != "cpu":
-            self.model = self.model.half()
-            logger.info("Applied FP16 quantization")
-        elif self.quantization == "int8":
-            try:
-                self.model = torch.quantization.quantize_dynamic(
-                    self.model,
-                    {torch.nn.Linear},
-                    dtype=torch.qint8
-                )
-                logger.info("Applied INT8 dynamic quantization")
-            except Exception as e:
-                logger.warning(f"INT8 quantization failed, using default: {e}")
+        self.model = quantize_model(self.model, self.quantization, self.device)
     
     @torch.inference_mode()
     def generate(
@@ -98,32 +115,25 @@ class InferenceEngine:
         Generate text from image with caching.
         
         Args:
-            image_input: Image path or PIL Image
+            image_input: Image path, PIL Image, pixel array or bytes
             prompt: Task prompt
             **gen_kwargs: Additional generation parameters
             
         Returns:
             Generated text
         """
+        # Decode, resize and hash in one pass
+        image, image_hash, image_size = self.processor.load(image_input)
+        
         # Check cache first
         if self.cache_enabled:
-            image_hash = self.processor.get_image_hash(image_input)
             cached = self.cache.get(image_hash, prompt)
             if cached:
                 logger.debug("Using cached inference result")
                 return cached
         
-        # Get image size for post-processing
-        image = self.processor.hf_processor.image_processor
-        if isinstance(image_input, Image.Image):
-            image_size = image_input.size
-        else:
-            from PIL import Image as PILImage
-            with PILImage.open(image_input) as img:
-                image_size = img.size
-        
         # Prepare inputs
-        inputs = self.processor.prepare(image_input, prompt)
+        inputs = self.processor.to_model_inputs([image], [prompt])
         
         # Merge generation config
         gen_config = {**self.DEFAULT_GEN_CONFIG, **gen_kwargs}
@@ -3,9 +3,16 @@ DARA Core - Main Model Class
 Refactored DARA model with modular architecture.
 """
 
+import asyncio
+import contextvars
+import functools
+import logging
+import time
 import torch
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from PIL import Image
-from typing import Union, Optional, Dict, Any
+from typing import Union, Optional, Dict, Any, List, Tuple, Callable, Iterator, Sequence
 from pathlib import Path
 
 from transformers import AutoProcessor, AutoModelForCausalLM
@@ -13,14 +20,36 @@ from transformers import AutoProcessor, AutoModelForCausalLM
 from ..config import Config, get_config
 from ..modes import (
     BaseMode, ModeResult,
-    SceneMode, EmotionMode, MedicineMode, CurrencyMode, TextMode
+    SceneMode, EmotionMode, MedicineMode, CurrencyMode, TextMode,
+    ModeRouter
 )
 from ..services.tts import TTSService
 from ..services.cache import InferenceCache
-from ..utils.image import ImageUtils
-from ..utils.logging import get_logger, setup_logging
+from ..services.metrics import DARAMetrics, MetricsRegistry
+from ..services.tracing import JSONLExporter, Tracer, annotate
+from ..utils.image import ImageUtils, ImageInput
+from .processor import ImageProcessor
+from .resolution import (
+    install_position_interpolation,
+    resolve_mode_size,
+    validate_input_size,
+    warn_untrained_positions,
+)
+from .tiling import Tile, plan_tiles, is_blank, stitch_regions
+from .regions import REGION_PROMPT, parse_regions, reading_order, expand_box, letterbox
+from .cascade import ModelCascade
+from .banknote import BanknoteColorClassifier
+from .stub import StubModel, StubProcessor, StubSpeechEngine
+from ..utils.logging import ensure_logging, get_logger, request_scope
+from ..utils.timing import StageTimer, current_timer, stage
+from ..utils.profiling import RequestProfiler
 
 logger = get_logger("model")
+# One DEBUG record per request with its stage timings
+request_logger = get_logger("requests")
+
+# Receives (mode, milliseconds per stage) after every timed detect call
+TimingObserver = Callable[[str, Dict[str, float]], None]
 
 
 class DARA:
@@ -31,8 +60,15 @@ class DARA:
     
     Features:
     - 5 intelligent detection modes (scene, emotion, medicine, currency, text)
+    - Automatic mode selection from one cheap caption pass
     - Integrated text-to-speech
     - Inference caching for performance
+    - Tiled and region-of-interest OCR for small text
+    - Optional cascade to a larger model for low-confidence results
+    - Per-stage latency breakdown (return_timings, timing observers)
+    - Prometheus metrics (enable_metrics)
+    - Request traces with a span per stage (enable_tracing)
+    - cProfile / torch.profiler traces of sampled or slow requests (profile)
     - Bilingual support (English/Indonesian)
     
     Example:
@@ -41,13 +77,20 @@ class DARA:
         >>> print(result["result"])
     """
     
+    # OCR strategies for modes that read text
+    OCR_STRATEGIES = ("full", "tiled", "regions")
+    
+    # Model backends: the real checkpoint, or canned outputs (see core/stub.py)
+    BACKENDS = ("florence2", "stub")
+    
     def __init__(
         self,
         model_id: Optional[str] = None,
         config: Optional[Config] = None,
         enable_tts: bool = True,
         enable_cache: bool = True,
-        log_level: str = "INFO"
+        log_level: str = "INFO",
+        profile: Optional[RequestProfiler] = None
     ):
         """
         Initialize DARA model.
@@ -58,9 +101,11 @@ class DARA:
             enable_tts: Enable text-to-speech output
             enable_cache: Enable inference caching
             log_level: Logging level
+            profile: Profile selected detect calls (defaults to the
+                config.inference.profile_* triggers, off unless set)
         """
         # Setup logging
-        setup_logging(level=log_level)
+        ensure_logging(level=log_level)
         
         # Get configuration
         self.config = config or get_config()
@@ -68,75 +113,208 @@ class DARA:
         self.device = self.config.device
         self.torch_dtype = self.config.torch_dtype
         
-        logger.info(f"Initializing DARA ({self.model_id})...")
-        logger.info(f"Device: {self.device}, Dtype: {self.torch_dtype}")
+        self.backend = self.config.model.backend
+        if self.backend not in self.BACKENDS:
+            raise ValueError(f"Invalid backend '{self.backend}'. Available: {', '.join(self.BACKENDS)}")
+        
+        logger.info("Initializing DARA (%s)...", self.model_id)
+        logger.info("Device: %s, Dtype: %s", self.device, self.torch_dtype)
         
         # Load model and processor
         self._load_model()
         
         # Initialize mode handlers
-        self._init_modes()
+        with stage("modes"):
+            self._init_modes()
+            self.image_processor.cache_prompts(
+                [m.prompt for m in self.modes.values()],
+                [self.mode_sizes[name] for name in self.modes]
+            )
+            
+            # Auto mode: caption at a small size, then run one routed mode
+            self.router = ModeRouter()
+            self.router_size = validate_input_size(self.config.inference.router_image_size)
+            self.image_processor.cache_prompts([self.router.prompt], [self.router_size])
         
         # Initialize services
-        self.tts = TTSService(
-            cache_dir=self.config.tts.cache_dir,
-            rate=self.config.tts.rate,
-            enable_cache=self.config.tts.cache_audio
-        ) if enable_tts else None
+        with stage("tts"):
+            self.tts = TTSService(
+                cache_dir=self.config.tts.cache_dir,
+                rate=self.config.tts.rate,
+                enable_cache=self.config.tts.cache_audio,
+                engine=StubSpeechEngine(self.config.model.stub_latency_ms) if self.backend == "stub" else None
+            ) if enable_tts else None
         
         # Initialize inference cache
         self.cache_enabled = enable_cache
         self.cache = InferenceCache(
-            maxsize=self.config.inference.cache_size
+            maxsize=self.config.inference.cache_size,
+            ttl_seconds=self.config.inference.cache_ttl_seconds,
+            compact=self.config.inference.cache_compact,
+            max_bytes=self.config.inference.cache_max_bytes,
+            policy=self.config.inference.cache_policy
         ) if enable_cache else None
         
+        # Larger model for low-confidence results, loaded on first use
+        escalation_model_id = self.config.model.escalation_model_id
+        self.cascade = ModelCascade(
+            lambda: self._load_weights(escalation_model_id),
+            escalation_model_id,
+            idle_timeout=self.config.model.escalation_idle_timeout
+        ) if escalation_model_id else None
+        
+        # Metrics sinks for per-stage timings (see add_timing_observer)
+        self.timing_observers: List[TimingObserver] = []
+        self.metrics: Optional[DARAMetrics] = None
+        
+        # detect_async worker pool, started on first use
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        
+        # Request traces (see enable_tracing)
+        self.tracer: Optional[Tracer] = self._config_tracer()
+        
+        # Request profiling; None keeps detect's fast path to one check
+        self.profiler = profile if profile is not None else self._config_profiler()
+        
         logger.info("DARA initialized successfully!")
     
     def _load_model(self) -> None:
         """Load the model and processor."""
         logger.info("Loading model...")
         
-        self.model = AutoModelForCausalLM.from_pretrained(
-            self.model_id,
-            torch_dtype=self.torch_dtype,
-            trust_remote_code=self.config.model.trust_remote_code,
-            attn_implementation=self.config.model.attn_implementation
-        ).to(self.device)
+        with stage("processor"):
+            if self.backend == "stub":
+                self.processor = StubProcessor(latency_ms=self.config.model.stub_latency_ms)
+            else:
+                self.processor = AutoProcessor.from_pretrained(
+                    self.model_id,
+                    trust_remote_code=self.config.model.trust_remote_code
+                )
+            
+            self.image_processor = ImageProcessor(
+                self.processor,
+                max_size=self.config.inference.max_image_size,
+                device=self.device,
+                dtype=self.torch_dtype,
+                input_size=self.config.inference.input_size,
+                backend=self.config.inference.preprocess_backend
+            )
         
-        self.processor = AutoProcessor.from_pretrained(
-            self.model_id,
-            trust_remote_code=self.config.model.trust_remote_code
-        )
+        self.model = self._load_weights(self.model_id)
         
         logger.info("Model loaded successfully")
     
+    def _load_weights(self, model_id: str):
+        """
+        Load a Florence-2 checkpoint onto the configured device.
+        
+        Used for the main model and the escalation model; Florence-2
+        base and large share one processor, so only weights are loaded.
+        """
+        if self.backend == "stub":
+            return StubModel(self.processor)
+        
+        with stage("from_pretrained"):
+            model = AutoModelForCausalLM.from_pretrained(
+                model_id,
+                torch_dtype=self.torch_dtype,
+                trust_remote_code=self.config.model.trust_remote_code,
+                attn_implementation=self.config.model.attn_implementation
+            )
+        with stage("to_device"):
+            model = model.to(self.device)
+        
+        install_position_interpolation(
+            model,
+            trained_size=self.image_processor.trained_size[0],
+            mode=self.config.inference.position_interpolation
+        )
+        return model
+    
+    @staticmethod
+    def create_modes(config: Config) -> Dict[str, BaseMode]:
+        """Create all mode handlers, keyed by mode name."""
+        return {
+            config.MODE_SCENE: SceneMode(),
+            config.MODE_EMOTION: EmotionMode(),
+            config.MODE_MEDICINE: MedicineMode(),
+            config.MODE_CURRENCY: CurrencyMode(
+                color_classifier=DARA._currency_classifier(config),
+                color_threshold=config.inference.currency_color_threshold,
+                fast_path=config.inference.currency_fast_path
+            ),
+            config.MODE_TEXT: TextMode(),
+        }
+    
+    @staticmethod
+    def _currency_classifier(config: Config) -> BanknoteColorClassifier:
+        """Banknote color classifier, calibrated if a calibration file is configured."""
+        classifier = BanknoteColorClassifier(CurrencyMode.color_references())
+        if config.inference.currency_calibration:
+            classifier.load_calibration(config.inference.currency_calibration)
+        return classifier
+    
     def _init_modes(self) -> None:
-        """Initialize all mode handlers."""
-        self.modes: Dict[str, BaseMode] = {
-            self.config.MODE_SCENE: SceneMode(),
-            self.config.MODE_EMOTION: EmotionMode(),
-            self.config.MODE_MEDICINE: MedicineMode(),
-            self.config.MODE_CURRENCY: CurrencyMode(),
-            self.config.MODE_TEXT: TextMode(),
+        """Initialize all mode handlers and their input sizes."""
+        self.modes: Dict[str, BaseMode] = self.create_modes(self.config)
+        self.mode_sizes: Dict[str, int] = {
+            name: resolve_mode_size(handler, self.config)
+            for name, handler in self.modes.items()
+        }
+        warn_untrained_positions(
+            self.mode_sizes,
+            self.image_processor.trained_size[0],
+            self.config.inference.position_interpolation
+        )
+        self.escalation_thresholds: Dict[str, Optional[float]] = {
+            name: self.config.model.escalation_thresholds.get(name, handler.escalation_threshold)
+            for name, handler in self.modes.items()
         }
-        logger.debug(f"Initialized {len(self.modes)} mode handlers")
+        logger.debug("Initialized %s mode handlers (input sizes: %s)", len(self.modes), self.mode_sizes)
+    
+    def set_mode_image_size(self, mode: str, size: int) -> None:
+        """
+        Change a mode's input size at runtime.
+        
+        Cached results are keyed by image and mode, not size; clear the
+        cache when comparing sizes.
+        
+        Args:
+            mode: Detection mode
+            size: Input size in pixels per side (multiple of 32)
+        """
+        if mode not in self.modes:
+            available = ", ".join(self.modes.keys())
+            raise ValueError(f"Invalid mode '{mode}'. Available: {available}")
+        self.mode_sizes[mode] = validate_input_size(size)
+        warn_untrained_positions(
+            {mode: size}, self.image_processor.trained_size[0], self.config.inference.position_interpolation
+        )
+        self.image_processor.cache_prompts([self.modes[mode].prompt], [size])
     
-    @torch.inference_mode()
     def detect(
         self,
-        image_input: Union[str, Path, Image.Image],
+        image_input: ImageInput,
         mode: str = "scene",
         language: str = "en",
-        generate_audio: bool = True
+        generate_audio: bool = True,
+        ocr_strategy: Optional[str] = None,
+        return_timings: bool = False
     ) -> Dict[str, Any]:
         """
         Detect and assist based on the selected mode.
         
         Args:
-            image_input: Path to image or PIL Image object
+            image_input: Image path, PIL Image, uint8 pixel array,
+                encoded bytes or binary file-like object
             mode: Detection mode (scene, emotion, medicine, currency, text)
+                or "auto" to let a caption pass pick one
             language: Output language code ('en' or 'id')
             generate_audio: Whether to generate TTS audio
+            ocr_strategy: "full", "tiled" (text, medicine) or "regions"
+                (text); defaults to config, ignored by other modes
+            return_timings: Add a per-stage latency breakdown to the result
             
         Returns:
             Dictionary with:
@@ -146,107 +324,925 @@ class DARA:
                 - audio: Path to audio file (if generated)
                 - language: Output language
                 - metadata: Additional mode-specific data
+                  ("router" holds the auto mode's decision)
+                - timings: Milliseconds per stage, "other" and "total"
+                  (only with return_timings)
+                - profile: request_id, trigger and trace files (only
+                  on profiled requests)
         """
+        # Log records (and profiles) of this call share a request ID
+        with request_scope():
+            profiler = self.profiler
+            if profiler is not None:
+                return profiler.run(
+                    mode, self._detect_request,
+                    image_input, mode, language, generate_audio, ocr_strategy, return_timings
+                )
+            return self._detect_request(image_input, mode, language, generate_audio, ocr_strategy, return_timings)
+    
+    def _detect_request(
+        self,
+        image_input: ImageInput,
+        mode: str,
+        language: str,
+        generate_audio: bool,
+        ocr_strategy: Optional[str],
+        return_timings: bool
+    ) -> Dict[str, Any]:
+        """detect() with stage timing for whoever asked for it (caller, observers, metrics, tracer, DEBUG log)."""
+        # Stages are only timed when someone asked for them
+        metrics = self.metrics
+        log_timings = request_logger.isEnabledFor(logging.DEBUG)
+        traced = self.tracer is not None and self.tracer.sampled()
+        if (
+            not (return_timings or self.timing_observers or metrics or log_timings or traced)
+            or current_timer() is not None
+        ):
+            return self._detect(image_input, mode, language, generate_audio, ocr_strategy)
+        
+        if metrics:
+            metrics.in_flight.inc()
+        try:
+            timer = self.tracer.timer("detect", mode=mode, language=language) if traced else StageTimer()
+            with timer:
+                result = self._detect(image_input, mode, language, generate_audio, ocr_strategy)
+        except Exception:
+            if metrics:
+                metrics.record_error(mode, language)
+            raise
+        finally:
+            if metrics:
+                metrics.in_flight.dec()
+        
+        timings = timer.to_dict()
+        if metrics:
+            metrics.record_request(mode, language, timings)
+        for observer in self.timing_observers:
+            try:
+                observer(mode, timings)
+            except Exception as e:
+                logger.warning("Timing observer failed: %s", e)
+        if log_timings:
+            request_logger.debug(
+                "%s request served in %.1f ms", mode, timings["total"],
+                extra={"mode": mode, "language": language, "timings": timings}
+            )
+        
+        # Copy so a cached result never carries one request's timings
+        return {**result, "timings": timings} if return_timings else result
+    
+    async def detect_async(
+        self,
+        image_input: ImageInput,
+        mode: str = "scene",
+        language: str = "en",
+        generate_audio: bool = True,
+        ocr_strategy: Optional[str] = None,
+        return_timings: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Awaitable detect for asyncio servers.
+        
+        Requests run on DARA's worker threads (config.inference.async_workers,
+        one by default so generate calls never contend) and wait their turn
+        there without blocking the event loop.
+        
+        Args:
+            Same as detect()
+            
+        Returns:
+            Same as detect()
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.config.inference.async_workers,
+                thread_name_prefix="dara-detect"
+            )
+        # Run in a copy of the caller's context so its request_scope carries over
+        call = functools.partial(
+            contextvars.copy_context().run,
+            self.detect, image_input, mode, language, generate_audio, ocr_strategy, return_timings
+        )
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+        finally:
+            self._pending -= 1
+    
+    @property
+    def pending_requests(self) -> int:
+        """detect_async calls queued or running."""
+        return self._pending
+    
+    def _config_profiler(self) -> Optional[RequestProfiler]:
+        """RequestProfiler from config.inference.profile_*, or None if no trigger is set."""
+        inference = self.config.inference
+        if not (inference.profile_every_n or inference.profile_slower_than_ms):
+            return None
+        return RequestProfiler(
+            output_dir=inference.profile_dir,
+            tools=[tool.strip() for tool in inference.profile_tools.split(",") if tool.strip()],
+            every_n=inference.profile_every_n,
+            slower_than_ms=inference.profile_slower_than_ms
+        )
+    
+    @contextmanager
+    def profiling(
+        self,
+        tools: Sequence[str] = ("cprofile",),
+        output_dir: Optional[str] = None,
+        **options
+    ) -> Iterator[RequestProfiler]:
+        """
+        Profile every detect call inside a with block.
+        
+        Args:
+            tools: "cprofile" and/or "torch"
+            output_dir: Trace folder (default: config.inference.profile_dir)
+            **options: Other RequestProfiler options (record_shapes, with_stack)
+            
+        Returns:
+            The block's RequestProfiler; .profiles lists the traces written
+            
+        Example:
+            >>> with dara.profiling(tools=("cprofile", "torch")) as profiler:
+            ...     dara.detect("slow.jpg", mode="text")
+            >>> profiler.profiles[0]["files"]
+        """
+        previous = self.profiler
+        self.profiler = RequestProfiler(
+            output_dir or self.config.inference.profile_dir, tools, always=True, **options
+        )
+        try:
+            yield self.profiler
+        finally:
+            self.profiler = previous
+    
+    def add_timing_observer(self, observer: TimingObserver) -> None:
+        """
+        Receive per-stage timings of every detect call.
+        
+        Args:
+            observer: Called with (mode, milliseconds per stage) after
+                each request; exceptions are logged and ignored
+        """
+        self.timing_observers.append(observer)
+    
+    def remove_timing_observer(self, observer: TimingObserver) -> None:
+        """Stop sending timings to an observer."""
+        self.timing_observers.remove(observer)
+    
+    def enable_metrics(self, registry: Optional[MetricsRegistry] = None) -> DARAMetrics:
+        """
+        Record Prometheus metrics for every detect call.
+        
+        Args:
+            registry: Registry to add DARA's metrics to (a new one by default)
+            
+        Returns:
+            DARAMetrics; export with render() or serve()
+        """
+        if self.metrics is None:
+            self.metrics = DARAMetrics(self, registry)
+        return self.metrics
+    
+    def enable_tracing(self, tracer: Optional[Tracer] = None, **options) -> Tracer:
+        """
+        Trace detect calls: a span per request and per stage (cache,
+        generate, translate, audio, ...), tagged with the request ID.
+        
+        Args:
+            tracer: Tracer to use (a new one by default)
+            **options: Tracer options for a new one (exporters,
+                buffer_size, sample_rate)
+            
+        Returns:
+            The Tracer; recent traces are in .traces
+        """
+        self.tracer = tracer or Tracer(**options)
+        return self.tracer
+    
+    def disable_tracing(self) -> None:
+        """Stop tracing detect calls."""
+        self.tracer = None
+    
+    def _config_tracer(self) -> Optional[Tracer]:
+        """Tracer from config.inference.trace_*, or None if tracing is off."""
+        inference = self.config.inference
+        if not (inference.tracing or inference.trace_file):
+            return None
+        return Tracer(
+            exporters=[JSONLExporter(inference.trace_file)] if inference.trace_file else [],
+            buffer_size=inference.trace_buffer_size,
+            sample_rate=inference.trace_sample_rate
+        )
+    
+    @torch.inference_mode()
+    def _detect(
+        self,
+        image_input: ImageInput,
+        mode: str,
+        language: str,
+        generate_audio: bool,
+        ocr_strategy: Optional[str]
+    ) -> Dict[str, Any]:
+        """detect without the timing wrapper."""
+        if mode == Config.MODE_AUTO:
+            return self._detect_auto(image_input, language, generate_audio, ocr_strategy)
+        
         # Validate mode
         if mode not in self.modes:
-            available = ", ".join(self.modes.keys())
+            available = ", ".join(self.get_available_modes())
             raise ValueError(f"Invalid mode '{mode}'. Available: {available}")
         
+        start = time.perf_counter()
         mode_handler = self.modes[mode]
+        input_size = self.mode_sizes[mode]
+        strategy = self._resolve_ocr_strategy(mode_handler, ocr_strategy)
         
-        # Load image
-        image = ImageUtils.load(image_input, convert_rgb=True)
+        image, image_hash, image_size = self._load(image_input, input_size, strategy)
         
         # Check cache
         if self.cache_enabled:
-            image_hash = ImageUtils.compute_hash(image)
-            cache_key = f"{mode}:{language}"
-            cached = self.cache.get(image_hash, cache_key)
+            cache_key = self._cache_key(mode, language, strategy)
+            with stage("cache"):
+                cached = self.cache.get(image_hash, cache_key)
+                annotate(cache_hit=cached is not None)
             if cached:
-                logger.debug(f"Cache hit for {mode}")
+                logger.debug("Cache hit for %s", mode)
                 return cached
         
-        # Get prompt for this mode
-        prompt = mode_handler.prompt
+        # Pixel-level fast path (e.g. banknote color) skips generation
+        with stage("hints"):
+            hints = mode_handler.image_hints(image)
+            fast_result = mode_handler.fast_path(hints, language)
+        if fast_result is not None:
+            results = [self._result_dict(mode_handler, fast_result, language)]
+            escalated = []
+        else:
+            # Generate and post-process
+            raw_output, ocr_info = self._run(
+                mode_handler, strategy, [image], [image_size], input_size
+            )[0]
+            results = [self._build_result(mode_handler, raw_output, language, ocr_info, hints)]
+            
+            # Re-run on the larger model if confidence is low
+            escalated = self._escalate(
+                mode_handler, strategy, [image], [image_size], input_size, results, language,
+                hints=[hints]
+            )
+        result = results[0]
+        self._attach_audio(result, generate_audio)
         
-        # Prepare inputs
-        inputs = self.processor(
-            text=prompt,
-            images=image,
-            return_tensors="pt"
-        ).to(self.device, self.torch_dtype)
-        
-        # Generate
-        generated_ids = self.model.generate(
-            input_ids=inputs["input_ids"],
-            pixel_values=inputs["pixel_values"],
-            max_new_tokens=self.config.inference.max_new_tokens,
-            do_sample=False,
-            num_beams=1,
-            use_cache=False  # Disable to prevent errors
+        if self.cascade:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.cascade.stats.record(mode, elapsed, bool(escalated))
+        
+        # Cache result, weighted by what it cost to compute
+        if self.cache_enabled:
+            cost_ms = (time.perf_counter() - start) * 1000
+            with stage("cache"):
+                self.cache.set(image_hash, cache_key, result, cost=cost_ms)
+        
+        return result
+    
+    def _detect_auto(
+        self,
+        image_input: ImageInput,
+        language: str,
+        generate_audio: bool,
+        ocr_strategy: Optional[str]
+    ) -> Dict[str, Any]:
+        """
+        Caption the image at the router size, pick a mode, run only that mode.
+        
+        When the routed mode would repeat the routing pass (same prompt
+        and input size, i.e. emotion), the caption is post-processed
+        directly instead of generated twice.
+        
+        Both passes load from the encoded input, so each JPEG decode is
+        drafted down to the size that pass needs; a full-resolution
+        decode only happens for tiled or region OCR.
+        """
+        start = time.perf_counter()
+        
+        with stage("load"):
+            # A stream can only be read once; keep its bytes for the routed mode
+            if hasattr(image_input, "read"):
+                image_input = image_input.read()
+            image, image_hash, image_size = self.image_processor.load(image_input, self.router_size)
+        
+        cache_key = f"{Config.MODE_AUTO}:{language}"
+        if self.cache_enabled:
+            with stage("cache"):
+                cached = self.cache.get(image_hash, cache_key)
+                annotate(cache_hit=cached is not None)
+            if cached:
+                logger.debug("Cache hit for auto")
+                return cached
+        
+        with stage("route"):
+            caption = self._generate([image], [self.router.prompt], [image_size], self.router_size)[0]
+            decision = self.router.route(caption)
+        router_ms = (time.perf_counter() - start) * 1000
+        
+        mode_handler = self.modes[decision.mode]
+        reuse = (
+            mode_handler.prompt == self.router.prompt
+            and self.mode_sizes[decision.mode] == self.router_size
+        )
+        if reuse:
+            results = [self._build_result(mode_handler, caption, language)]
+            self._escalate(
+                mode_handler, "full", [image], [image_size], self.router_size, results, language
+            )
+            result = results[0]
+            self._attach_audio(result, generate_audio)
+        else:
+            routed = self._detect(
+                image_input, decision.mode, language, generate_audio, ocr_strategy
+            )
+            # Copy so the routed mode's cache entry is left untouched
+            result = {**routed, "metadata": dict(routed["metadata"])}
+        
+        result["metadata"]["router"] = {
+            **decision.to_dict(),
+            "latency_ms": router_ms,
+            "reused_caption": reuse,
+        }
+        logger.debug("Auto mode routed to %s in %.0f ms", decision.mode, router_ms)
+        
+        if self.cache_enabled:
+            cost_ms = (time.perf_counter() - start) * 1000
+            with stage("cache"):
+                self.cache.set(image_hash, cache_key, result, cost=cost_ms)
+        
+        return result
+    
+    @torch.inference_mode()
+    def detect_batch(
+        self,
+        images: List[ImageInput],
+        mode: str = "scene",
+        language: str = "en",
+        generate_audio: bool = False,
+        batch_size: Optional[int] = None,
+        image_hashes: Optional[List[str]] = None,
+        ocr_strategy: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Run one detection mode over many images with batched generation.
+        
+        Args:
+            images: Image inputs (any type accepted by detect)
+            mode: Detection mode (scene, emotion, medicine, currency, text)
+            language: Output language code ('en' or 'id')
+            generate_audio: Whether to generate TTS audio
+            batch_size: Images per generate call (defaults to config)
+            image_hashes: Precomputed cache hashes, one per image
+            ocr_strategy: "full", "tiled" or "regions" (see detect).
+                Tiles or crops from all images in a chunk share
+                generate batches.
+            
+        Returns:
+            List of result dictionaries (same format as detect), in input order
+        """
+        if mode not in self.modes:
+            available = ", ".join(self.modes.keys())
+            raise ValueError(f"Invalid mode '{mode}'. Available: {available}")
+        if image_hashes is not None and len(image_hashes) != len(images):
+            raise ValueError("images and image_hashes must have same length")
+        
+        mode_handler = self.modes[mode]
+        input_size = self.mode_sizes[mode]
+        strategy = self._resolve_ocr_strategy(mode_handler, ocr_strategy)
+        batch_size = batch_size or self.config.inference.batch_size
+        cache_key = self._cache_key(mode, language, strategy)
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(images)
+        pending = []
+        
+        for index, image_input in enumerate(images):
+            item_start = time.perf_counter()
+            image, image_hash, image_size = self._load(image_input, input_size, strategy)
+            if image_hashes is not None:
+                image_hash = image_hashes[index]
+            if self.cache_enabled:
+                cached = self.cache.get(image_hash, cache_key)
+                if cached:
+                    results[index] = cached
+                    continue
+            
+            hints = mode_handler.image_hints(image)
+            fast_result = mode_handler.fast_path(hints, language)
+            if fast_result is not None:
+                result = self._result_dict(mode_handler, fast_result, language)
+                self._attach_audio(result, generate_audio)
+                if self.cache_enabled:
+                    cost_ms = (time.perf_counter() - item_start) * 1000
+                    self.cache.set(image_hash, cache_key, result, cost=cost_ms)
+                results[index] = result
+                continue
+            pending.append((index, image, image_hash, image_size, hints))
+        
+        for start in range(0, len(pending), batch_size):
+            chunk_start = time.perf_counter()
+            chunk = pending[start:start + batch_size]
+            chunk_images = [item[1] for item in chunk]
+            chunk_sizes = [item[3] for item in chunk]
+            chunk_hints = [item[4] for item in chunk]
+            outputs = self._run(
+                mode_handler, strategy, chunk_images, chunk_sizes, input_size, batch_size
+            )
+            chunk_results = [
+                self._build_result(mode_handler, raw_output, language, ocr_info, hints)
+                for (raw_output, ocr_info), hints in zip(outputs, chunk_hints)
+            ]
+            escalated = self._escalate(
+                mode_handler, strategy, chunk_images, chunk_sizes, input_size,
+                chunk_results, language, batch_size, chunk_hints
+            )
+            
+            # Latency per image is amortized over the chunk
+            per_image_ms = (time.perf_counter() - chunk_start) * 1000 / len(chunk)
+            for position, ((index, _, image_hash, _, _), result) in enumerate(zip(chunk, chunk_results)):
+                self._attach_audio(result, generate_audio)
+                if self.cascade:
+                    self.cascade.stats.record(mode, per_image_ms, position in escalated)
+                if self.cache_enabled:
+                    self.cache.set(image_hash, cache_key, result, cost=per_image_ms)
+                results[index] = result
+        
+        logger.debug("Batch %s: %s images, %s generated", mode, len(images), len(pending))
+        return results
+    
+    def _run(
+        self,
+        mode_handler: BaseMode,
+        strategy: str,
+        images: List[Image.Image],
+        image_sizes: List[tuple],
+        input_size: int,
+        batch_size: Optional[int] = None,
+        model=None
+    ) -> List[Tuple[Any, Optional[dict]]]:
+        """
+        Generate raw outputs for a batch with the given OCR strategy.
+        
+        Returns:
+            (raw output, OCR metadata or None) per image
+        """
+        if strategy != "full":
+            return self._ocr(
+                strategy, images, mode_handler.prompt, input_size, batch_size, model
+            )
+        
+        raw_outputs = self._generate(
+            images,
+            [mode_handler.prompt] * len(images),
+            image_sizes,
+            input_size,
+            model
         )
+        return [(raw_output, None) for raw_output in raw_outputs]
+    
+    def _escalate(
+        self,
+        mode_handler: BaseMode,
+        strategy: str,
+        images: List[Image.Image],
+        image_sizes: List[tuple],
+        input_size: int,
+        results: List[Dict[str, Any]],
+        language: str,
+        batch_size: Optional[int] = None,
+        hints: Optional[List[Optional[dict]]] = None
+    ) -> List[int]:
+        """
+        Re-run low-confidence results on the escalation model, in place.
         
-        # Decode
-        generated_text = self.processor.batch_decode(
-            generated_ids, 
-            skip_special_tokens=False
-        )[0]
+        The escalated answer replaces the base one unless its confidence
+        is lower. Either way the result gets a "cascade" metadata entry.
         
-        # Post-process through HF processor
-        try:
-            parsed_answer = self.processor.post_process_generation(
-                generated_text,
-                task=prompt,
-                image_size=(image.width, image.height)
+        Returns:
+            Indices of escalated results
+        """
+        threshold = self.escalation_thresholds.get(mode_handler.name)
+        if self.cascade is None or threshold is None:
+            return []
+        
+        low = [i for i, result in enumerate(results) if result["confidence"] < threshold]
+        if not low:
+            return []
+        
+        with stage("escalate"):
+            with self.cascade.acquire() as model:
+                outputs = self._run(
+                    mode_handler,
+                    strategy,
+                    [images[i] for i in low],
+                    [image_sizes[i] for i in low],
+                    input_size,
+                    batch_size,
+                    model
+                )
+            
+            for i, (raw_output, ocr_info) in zip(low, outputs):
+                base = results[i]
+                candidate = self._build_result(
+                    mode_handler, raw_output, language, ocr_info, hints[i] if hints else None
+                )
+                chosen = candidate if candidate["confidence"] >= base["confidence"] else base
+                chosen["metadata"]["cascade"] = {
+                    "escalated": True,
+                    "model": self.cascade.model_id,
+                    "threshold": threshold,
+                    "base_confidence": base["confidence"],
+                    "escalated_confidence": candidate["confidence"],
+                    "used": "escalation" if chosen is candidate else "base",
+                }
+                results[i] = chosen
+        
+        logger.debug("Escalated %s/%s %s results", len(low), len(results), mode_handler.name)
+        return low
+    
+    def _resolve_ocr_strategy(self, mode_handler: BaseMode, ocr_strategy: Optional[str]) -> str:
+        """Pick the OCR strategy for a request; unsupported strategies fall back to "full"."""
+        strategy = ocr_strategy or self.config.inference.ocr_strategy
+        if strategy not in self.OCR_STRATEGIES:
+            available = ", ".join(self.OCR_STRATEGIES)
+            raise ValueError(f"Invalid OCR strategy '{strategy}'. Available: {available}")
+        supported = {
+            "full": True,
+            "tiled": mode_handler.supports_tiling,
+            "regions": mode_handler.supports_regions,
+        }
+        return strategy if supported[strategy] else "full"
+    
+    @staticmethod
+    def _cache_key(mode: str, language: str, strategy: str) -> str:
+        """Cache key for a mode, language and OCR strategy."""
+        if strategy == "full":
+            return f"{mode}:{language}"
+        return f"{mode}:{language}:{strategy}"
+    
+    def _load(
+        self,
+        image_input: ImageInput,
+        input_size: int,
+        strategy: str
+    ) -> Tuple[Image.Image, str, Tuple[int, int]]:
+        """
+        Load an image for a strategy.
+        
+        "full" decodes, resizes and hashes at model size in one pass;
+        "tiled" and "regions" keep full resolution so tiles or crops
+        can be cut from it.
+        """
+        with stage("load"):
+            if strategy == "full":
+                return self.image_processor.load(image_input, input_size)
+            
+            image = ImageUtils.load(image_input, convert_rgb=True)
+            return image, ImageUtils.compute_hash(image), image.size
+    
+    def _ocr(
+        self,
+        strategy: str,
+        images: List[Image.Image],
+        prompt: str,
+        input_size: int,
+        batch_size: Optional[int] = None,
+        model=None
+    ) -> List[Tuple[str, dict]]:
+        """Run a multi-pass OCR strategy over full-resolution images."""
+        if strategy == "tiled":
+            return self._ocr_tiled(images, prompt, input_size, batch_size, model)
+        return self._ocr_regions(images, prompt, input_size, batch_size, model)
+    
+    def _ocr_tiled(
+        self,
+        images: List[Image.Image],
+        prompt: str,
+        input_size: int,
+        batch_size: Optional[int] = None,
+        model=None
+    ) -> List[Tuple[str, dict]]:
+        """
+        OCR full-resolution images as overlapping tiles.
+        
+        Tiles from every image are pooled and read with
+        ``<OCR_WITH_REGION>`` in batched generate calls, so each line
+        comes back with its box. Boxes are moved to page coordinates,
+        lines read twice in an overlap strip are kept once, and the rest
+        are put in reading order (see stitch_regions).
+        
+        Args:
+            images: Full-resolution RGB images
+            prompt: OCR task prompt (tiles need line boxes, so they are
+                read with REGION_PROMPT instead)
+            input_size: Model input size (tile side in source pixels)
+            batch_size: Tiles per generate call (defaults to config)
+            model: Model to generate with (defaults to the main model)
+            
+        Returns:
+            (stitched text, tiling metadata) per image
+        """
+        inference = self.config.inference
+        batch_size = batch_size or inference.batch_size
+        size = (input_size, input_size)
+        
+        plans = []
+        jobs = []  # (image index, tile index, model-sized tile, tile size)
+        for image_index, image in enumerate(images):
+            tiles = plan_tiles(image.size, input_size, inference.tile_overlap, inference.max_tiles)
+            kept = []
+            for tile_index, tile in enumerate(tiles):
+                crop = image.crop(tile.box)
+                if len(tiles) > 1 and inference.skip_blank_tiles and is_blank(crop):
+                    continue
+                kept.append((tile_index, crop))
+            
+            # Nothing looked like text: read the whole image once instead
+            if not kept:
+                tiles = [Tile(box=(0, 0, *image.size), row=0, column=0)]
+                kept = [(0, image)]
+            
+            plans.append(tiles)
+            for tile_index, crop in kept:
+                crop_size = crop.size
+                if crop.size != size:
+                    crop = crop.resize(size, self.image_processor.resample)
+                jobs.append((image_index, tile_index, crop, crop_size))
+        
+        regions = [[None] * len(tiles) for tiles in plans]
+        for start in range(0, len(jobs), batch_size):
+            chunk = jobs[start:start + batch_size]
+            # Boxes come back in tile pixels (scaled to each tile's size)
+            answers = self._generate_parsed(
+                [job[2] for job in chunk],
+                [REGION_PROMPT] * len(chunk),
+                [job[3] for job in chunk],
+                input_size,
+                model
             )
-            raw_output = parsed_answer.get(prompt, generated_text)
-        except Exception as e:
-            logger.warning(f"Post-processing failed: {e}")
-            raw_output = generated_text
+            for (image_index, tile_index, _, _), answer in zip(chunk, answers):
+                regions[image_index][tile_index] = parse_regions(answer)
         
-        # Process through mode handler
-        if isinstance(raw_output, dict):
-            raw_output = str(raw_output)
+        results = []
+        for image, tiles, tile_regions in zip(images, plans, regions):
+            skipped = sum(found is None for found in tile_regions)
+            text, stitched = stitch_regions(tiles, tile_regions, image.size)
+            results.append((text, {
+                "strategy": "tiled",
+                "tiles": len(tiles),
+                "skipped_tiles": skipped,
+                "lines": stitched["lines"],
+                "duplicate_lines": stitched["duplicates"],
+            }))
         
-        mode_result: ModeResult = mode_handler.process(raw_output, language)
+        logger.debug("Tiled OCR: %s images, %s tiles generated", len(images), len(jobs))
+        return results
+    
+    def _ocr_regions(
+        self,
+        images: List[Image.Image],
+        prompt: str,
+        input_size: int,
+        batch_size: Optional[int] = None,
+        model=None
+    ) -> List[Tuple[str, dict]]:
+        """
+        Two-stage OCR: find text regions, then read only their crops.
         
-        # Generate audio
-        audio_path = None
-        if generate_audio and self.tts and self.tts.is_available:
-            audio_path = self.tts.generate(mode_result.text, language)
+        A ``<OCR_WITH_REGION>`` pass on the downscaled frame returns text
+        boxes in source coordinates. Each box is cut from the
+        full-resolution image, letterboxed to the model input and read
+        with ``prompt``; all crops share batched generate calls. Lines
+        are assembled in reading order, one per output line.
+        
+        Args:
+            images: Full-resolution RGB images
+            prompt: OCR task prompt for the crops
+            input_size: Model input size in pixels per side
+            batch_size: Images or crops per generate call (defaults to config)
+            model: Model to generate with (defaults to the main model)
+            
+        Returns:
+            (text in reading order, region metadata) per image
+        """
+        inference = self.config.inference
+        batch_size = batch_size or inference.batch_size
+        size = (input_size, input_size)
+        resample = self.image_processor.resample
+        
+        # Stage 1: text regions on the whole frame
+        parsed = []
+        for start in range(0, len(images), batch_size):
+            chunk = images[start:start + batch_size]
+            parsed.extend(self._generate_parsed(
+                [image.resize(size, resample) for image in chunk],
+                [REGION_PROMPT] * len(chunk),
+                [image.size for image in chunk],
+                input_size,
+                model
+            ))
+        
+        # Stage 2: read each region crop at high effective resolution
+        layouts = []
+        jobs = []  # (image index, line index, position in line, letterboxed crop)
+        for image_index, (image, answer) in enumerate(zip(images, parsed)):
+            lines = reading_order(parse_regions(answer))
+            count = sum(len(line) for line in lines)
+            layouts.append([[region.label for region in line] for line in lines])
+            if count > inference.max_text_regions:
+                # Dense page: the region pass already read every line
+                continue
+            for line_index, line in enumerate(lines):
+                for position, region in enumerate(line):
+                    box = expand_box(region.box, image.size, inference.region_margin)
+                    crop = letterbox(image.crop(box), input_size, resample=resample)
+                    jobs.append((image_index, line_index, position, crop))
+        
+        for start in range(0, len(jobs), batch_size):
+            chunk = jobs[start:start + batch_size]
+            raw_outputs = self._generate(
+                [job[3] for job in chunk],
+                [prompt] * len(chunk),
+                [size] * len(chunk),
+                input_size,
+                model
+            )
+            for (image_index, line_index, position, _), raw_output in zip(chunk, raw_outputs):
+                text = raw_output.strip()
+                if text:
+                    layouts[image_index][line_index][position] = text
+        
+        results = []
+        for lines in layouts:
+            count = sum(len(line) for line in lines)
+            text = "\n".join(" ".join(t for t in line if t) for line in lines)
+            results.append((text.strip(), {
+                "strategy": "regions",
+                "regions": count,
+                "lines": len(lines),
+                "crops_read": 0 if count > inference.max_text_regions else count,
+            }))
+        
+        logger.debug("Region OCR: %s images, %s crops generated", len(images), len(jobs))
+        return results
+    
+    def _generate(
+        self,
+        images: List[Image.Image],
+        prompts: List[str],
+        image_sizes: List[tuple],
+        input_size: Optional[int] = None,
+        model=None
+    ) -> List[str]:
+        """
+        Run batched generation and HF post-processing.
         
-        # Build result
-        result = {
-            "mode": mode,
+        Args:
+            images: Model-sized RGB images from ImageProcessor.load
+            prompts: Task prompt per image
+            image_sizes: Original (width, height) per image
+            input_size: Model input size for this batch
+            model: Model to generate with (defaults to the main model)
+            
+        Returns:
+            Raw output string per image
+        """
+        return [
+            str(answer) if isinstance(answer, dict) else answer
+            for answer in self._generate_parsed(images, prompts, image_sizes, input_size, model)
+        ]
+    
+    def _generate_parsed(
+        self,
+        images: List[Image.Image],
+        prompts: List[str],
+        image_sizes: List[tuple],
+        input_size: Optional[int] = None,
+        model=None
+    ) -> List[Any]:
+        """
+        Like _generate, but keep structured answers (e.g. region boxes,
+        scaled to image_sizes) as returned by the HF processor.
+        """
+        # Prepare inputs
+        with stage("preprocess"):
+            inputs = self.image_processor.to_model_inputs(images, prompts, input_size)
+        
+        # Generate (vision encoder and text decoder)
+        with stage("generate"):
+            generated_ids = (model or self.model).generate(
+                input_ids=inputs["input_ids"],
+                pixel_values=inputs["pixel_values"],
+                max_new_tokens=self.config.inference.max_new_tokens,
+                do_sample=False,
+                num_beams=1,
+                use_cache=False  # Disable to prevent errors
+            )
+        
+        # Decode
+        with stage("decode"):
+            generated_texts = self.processor.batch_decode(
+                generated_ids,
+                skip_special_tokens=False
+            )
+        
+        if self.metrics:
+            self._count_tokens(prompts, generated_ids)
+        
+        raw_outputs = []
+        with stage("postprocess"):
+            for generated_text, prompt, image_size in zip(generated_texts, prompts, image_sizes):
+                # Post-process through HF processor
+                try:
+                    parsed_answer = self.processor.post_process_generation(
+                        generated_text,
+                        task=prompt,
+                        image_size=image_size
+                    )
+                    raw_output = parsed_answer.get(prompt, generated_text)
+                except Exception as e:
+                    logger.warning("Post-processing failed: %s", e)
+                    raw_output = generated_text
+                
+                raw_outputs.append(raw_output)
+        
+        return raw_outputs
+    
+    def _count_tokens(self, prompts: List[str], generated_ids: torch.Tensor) -> None:
+        """Add generated (non-padding) tokens per task to the metrics."""
+        tokenizer = getattr(self.processor, "tokenizer", None)
+        pad_token_id = getattr(tokenizer, "pad_token_id", None)
+        if pad_token_id is None:
+            counts = [generated_ids.shape[-1]] * len(prompts)
+        else:
+            counts = (generated_ids != pad_token_id).sum(dim=-1).tolist()
+        for prompt, count in zip(prompts, counts):
+            self.metrics.record_tokens(prompt, count)
+    
+    def _build_result(
+        self,
+        mode_handler: BaseMode,
+        raw_output: str,
+        language: str,
+        ocr_info: Optional[dict] = None,
+        hints: Optional[dict] = None
+    ) -> Dict[str, Any]:
+        """Run the mode handler and assemble the result dict (audio added later)."""
+        with stage("mode"):
+            mode_result: ModeResult = mode_handler.process(raw_output, language)
+            if hints:
+                mode_result = mode_handler.cross_check(mode_result, hints)
+        if ocr_info:
+            mode_result.metadata["ocr"] = ocr_info
+        return self._result_dict(mode_handler, mode_result, language)
+    
+    @staticmethod
+    def _result_dict(
+        mode_handler: BaseMode,
+        mode_result: ModeResult,
+        language: str
+    ) -> Dict[str, Any]:
+        """Result dict for a ModeResult (audio added later)."""
+        return {
+            "mode": mode_handler.name,
             "result": mode_result.text,
             "confidence": mode_result.confidence,
-            "audio": audio_path,
+            "audio": None,
             "language": language,
             "metadata": mode_result.metadata,
             "suggestions": mode_result.suggestions
         }
-        
-        # Cache result
-        if self.cache_enabled:
-            self.cache.set(image_hash, cache_key, result)
-        
-        return result
+    
+    def _attach_audio(self, result: Dict[str, Any], generate_audio: bool) -> None:
+        """Generate TTS audio for a final result, in place."""
+        if generate_audio and self.tts and self.tts.is_available:
+            with stage("audio"):
+                result["audio"] = self.tts.generate(result["result"], result["language"])
     
     def detect_all(
         self,
-        image_input: Union[str, Path, Image.Image],
+        image_input: ImageInput,
         language: str = "en"
     ) -> Dict[str, Dict[str, Any]]:
         """
         Run all detection modes on an image.
         
         Args:
-            image_input: Path to image or PIL Image
+            image_input: Image input (any type accepted by detect)
             language: Output language
             
         Returns:
             Dictionary with results for each mode
         """
+        # Decode once; streams and buffers can only be read a single time
+        image_input = ImageUtils.load(image_input, convert_rgb=True)
+        
         results = {}
         for mode in self.modes:
             try:
@@ -257,14 +1253,14 @@ class DARA:
                     generate_audio=False  # Skip audio for batch
                 )
             except Exception as e:
-                logger.error(f"Error in {mode} mode: {e}")
+                logger.error("Error in %s mode: %s", mode, e)
                 results[mode] = {"error": str(e)}
         
         return results
     
     def get_available_modes(self) -> list:
-        """Get list of available detection modes."""
-        return list(self.modes.keys())
+        """Get list of available detection modes (including "auto")."""
+        return list(self.modes.keys()) + [Config.MODE_AUTO]
     
     def clear_cache(self) -> int:
         """Clear inference cache. Returns count of cleared entries."""
@@ -279,5 +1275,12 @@ class DARA:
             return self.cache.stats
         return None
     
+    @property
+    def cascade_stats(self) -> Optional[dict]:
+        """Escalation rate and latency percentiles (None without a cascade)."""
+        if self.cascade:
+            return self.cascade.stats.summary
+        return None
+    
     def __repr__(self) -> str:
         return f"<DARA(model={self.model_id}, device={self.device})>"
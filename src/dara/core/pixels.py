@@ -0,0 +1,205 @@
+"""
+DARA Core - Native Pixel Preprocessing
+Vectorized normalization into reusable tensors, bypassing the HF image processor.
+"""
+
+import threading
+import warnings
+import numpy as np
+import torch
+from PIL import Image
+from typing import Dict, List, Optional, Tuple
+
+from ..utils.logging import get_logger
+from .resolution import image_token_budget
+
+logger = get_logger("pixels")
+
+# Florence-2 / ImageNet normalization defaults
+IMAGENET_MEAN = (0.485, 0.456, 0.406)
+IMAGENET_STD = (0.229, 0.224, 0.225)
+
+
+class PixelPreprocessor:
+    """
+    Native replacement for the HF image processor's tensor path.
+    
+    The HF path converts every image PIL -> numpy, rescales and
+    normalizes in float64, stacks, converts to a tensor and then copies
+    again in ``.to(device, dtype)``. Here each model-sized image is
+    copied once (uint8 -> float32, HWC -> CHW) into a reusable per-thread
+    NCHW buffer, and the whole batch is normalized in place with a single
+    fused ``x * scale + bias``. On GPU the uint8 batch is uploaded first,
+    so 4x less data crosses the bus.
+    
+    Tokenized prompts are cached per (prompt, input size), since DARA's
+    task prompts are constant. Batches may use any input size, as long
+    as every image in a batch shares it.
+    
+    Returned tensors are views of reused buffers: they stay valid until
+    the next call on the same thread.
+    """
+    
+    def __init__(
+        self,
+        hf_processor,
+        input_size: Tuple[int, int],
+        device: str = "cpu",
+        dtype: torch.dtype = torch.float32
+    ):
+        """
+        Initialize pixel preprocessor.
+        
+        Args:
+            hf_processor: Hugging Face processor (used for its config and,
+                once per prompt, for tokenization)
+            input_size: Default model input (width, height)
+            device: Target device for tensors
+            dtype: Target dtype for pixel values
+        """
+        self.hf_processor = hf_processor
+        self.input_size = tuple(input_size)
+        self.device = device
+        self.dtype = dtype
+        
+        image_processor = getattr(hf_processor, "image_processor", None)
+        mean = getattr(image_processor, "image_mean", None) or IMAGENET_MEAN
+        std = getattr(image_processor, "image_std", None) or IMAGENET_STD
+        rescale = 1.0
+        if getattr(image_processor, "do_rescale", True):
+            rescale = getattr(image_processor, "rescale_factor", None) or 1 / 255
+        if not getattr(image_processor, "do_normalize", True):
+            mean, std = (0.0, 0.0, 0.0), (1.0, 1.0, 1.0)
+        
+        # (x * rescale - mean) / std == x * scale + bias
+        std_t = torch.tensor(std, dtype=torch.float32)
+        mean_t = torch.tensor(mean, dtype=torch.float32)
+        self._scale = (rescale / std_t).view(1, 3, 1, 1).to(device)
+        self._bias = (-mean_t / std_t).view(1, 3, 1, 1).to(device)
+        
+        tokenizer = getattr(hf_processor, "tokenizer", None)
+        self.pad_token_id = getattr(tokenizer, "pad_token_id", None) or 0
+        
+        self._prompt_ids: Dict[Tuple[str, Tuple[int, int]], torch.Tensor] = {}
+        self._local = threading.local()
+    
+    def __call__(self, images: List[Image.Image], prompts: List[str]) -> dict:
+        """
+        Build model inputs for a batch.
+        
+        Args:
+            images: RGB images, all of the same model input size
+            prompts: Task prompt per image
+            
+        Returns:
+            Dictionary with input_ids and pixel_values on device
+        """
+        size = images[0].size if images else self.input_size
+        return {
+            "input_ids": self.input_ids(prompts, size),
+            "pixel_values": self.pixel_values(images),
+        }
+    
+    def prompt_ids(self, prompt: str, size: Optional[Tuple[int, int]] = None) -> torch.Tensor:
+        """
+        Get cached token IDs (1-D, on device) for a task prompt.
+        
+        The HF processor is called once per prompt and input size with a
+        blank image so that any prompt expansion or image-token insertion
+        it performs is reproduced exactly, with the image-token count
+        matching that input size.
+        """
+        size = tuple(size or self.input_size)
+        key = (prompt, size)
+        cached = self._prompt_ids.get(key)
+        if cached is None:
+            blank = Image.new("RGB", size)
+            with image_token_budget(self.hf_processor, size):
+                encoded = self.hf_processor(text=[prompt], images=[blank], return_tensors="pt")
+            cached = encoded["input_ids"][0].to(self.device)
+            self._prompt_ids[key] = cached
+            logger.debug("Cached prompt ids for %s at %s (%s tokens)", prompt, size, cached.numel())
+        return cached
+    
+    def input_ids(self, prompts: List[str], size: Optional[Tuple[int, int]] = None) -> torch.Tensor:
+        """Batch cached prompt IDs, right-padding if lengths differ."""
+        ids = [self.prompt_ids(prompt, size) for prompt in prompts]
+        
+        if all(t is ids[0] for t in ids):
+            return ids[0].unsqueeze(0).expand(len(ids), -1)
+        
+        length = max(t.numel() for t in ids)
+        batch = torch.full(
+            (len(ids), length), self.pad_token_id,
+            dtype=ids[0].dtype, device=self.device
+        )
+        for row, t in zip(batch, ids):
+            row[:t.numel()] = t
+        return batch
+    
+    def pixel_values(self, images: List[Image.Image]) -> torch.Tensor:
+        """
+        Normalize a batch of model-sized RGB images into an NCHW tensor.
+        
+        Args:
+            images: RGB images, all of the same size
+            
+        Returns:
+            (N, 3, H, W) tensor of dtype on device
+        """
+        width, height = images[0].size if images else self.input_size
+        if any(image.size != (width, height) for image in images):
+            raise ValueError("All images in a batch must have the same size")
+        n = len(images)
+        out = self._buffer("pixels", (n, 3, height, width), torch.float32, self.device)
+        
+        # PIL arrays are read-only; they are only read from here
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)
+            if self.device == "cpu":
+                for i, image in enumerate(images):
+                    out[i].copy_(torch.from_numpy(np.asarray(image)).permute(2, 0, 1))
+            else:
+                pinned = torch.cuda.is_available()
+                staging = self._buffer(
+                    "staging", (n, height, width, 3), torch.uint8, "cpu", pin=pinned
+                )
+                # The last non-blocking upload may still be reading this buffer
+                uploads = self._local.__dict__.setdefault("uploads", {})
+                pending = uploads.pop(staging.shape[1:], None)
+                if pending is not None:
+                    pending.synchronize()
+                for i, image in enumerate(images):
+                    staging[i].copy_(torch.from_numpy(np.asarray(image)))
+                out.copy_(staging.to(self.device, non_blocking=True).permute(0, 3, 1, 2))
+                if pinned:
+                    event = torch.cuda.Event()
+                    event.record()
+                    uploads[staging.shape[1:]] = event
+        
+        out.mul_(self._scale).add_(self._bias)
+        
+        if self.dtype == torch.float32:
+            return out
+        
+        cast = self._buffer("cast", tuple(out.shape), self.dtype, self.device)
+        cast.copy_(out)
+        return cast
+    
+    def _buffer(
+        self,
+        name: str,
+        shape: tuple,
+        dtype: torch.dtype,
+        device: str,
+        pin: bool = False
+    ) -> torch.Tensor:
+        """Get a per-thread reusable buffer with at least shape[0] rows."""
+        buffers = self._local.__dict__.setdefault("buffers", {})
+        # One buffer per input size, so alternating modes do not reallocate
+        key = (name, tuple(shape[1:]))
+        buf = buffers.get(key)
+        if buf is None or buf.shape[0] < shape[0]:
+            buf = torch.empty(shape, dtype=dtype, device=device, pin_memory=pin)
+            buffers[key] = buf
+        return buf[:shape[0]]
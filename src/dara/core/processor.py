@@ -5,11 +5,13 @@ Optimized image preprocessing pipeline for model inference.
 
 import torch
 from PIL import Image
-from typing import Union, Optional
+from typing import List, Optional, Tuple, Union
 from pathlib import Path
 
-from ..utils.image import ImageUtils
+from ..utils.image import ImageUtils, ImageInput
 from ..utils.logging import get_logger
+from .pixels import PixelPreprocessor
+from .resolution import image_token_budget, validate_input_size
 
 logger = get_logger("processor")
 
@@ -18,72 +20,114 @@ class ImageProcessor:
     """
     Optimized image preprocessing for DARA inference.
     
-    Handles image loading, resizing, and tensor conversion
-    with caching of preprocessed inputs.
+    Handles image loading, resizing, and tensor conversion. Images are
+    decoded near the model input size and resized exactly once. Tensor
+    conversion uses the native PixelPreprocessor by default, or the HF
+    processor with ``backend="hf"``. Callers may request a different
+    input size per call (see BaseMode.image_size).
     """
     
+    # Florence-2 vision input when the HF processor does not report one
+    DEFAULT_INPUT_SIZE = 768
+    
     def __init__(
         self,
         hf_processor,
         max_size: int = 1024,
         device: str = "cpu",
-        dtype: torch.dtype = torch.float32
+        dtype: torch.dtype = torch.float32,
+        input_size: Optional[int] = None,
+        backend: str = "native"
     ):
         """
         Initialize image processor.
         
         Args:
             hf_processor: Hugging Face processor (AutoProcessor)
-            max_size: Maximum image dimension
+            max_size: Maximum image dimension (unused by the fused path,
+                kept for backward compatibility)
             device: Target device for tensors
             dtype: Target dtype for tensors
+            input_size: Model input size in pixels per side (defaults to
+                the HF image processor's configured size)
+            backend: Tensor conversion backend ("native" or "hf")
         """
         self.hf_processor = hf_processor
         self.max_size = max_size
         self.device = device
         self.dtype = dtype
         
-        logger.info(f"ImageProcessor initialized (device={device}, dtype={dtype})")
+        image_processor = getattr(hf_processor, "image_processor", None)
+        self.input_size = self._resolve_input_size(image_processor, input_size)
+        # Resolution the HF processor is configured for (the trained one)
+        self.trained_size = self._resolve_input_size(image_processor, None)
+        self.resample = getattr(image_processor, "resample", None) or Image.Resampling.BICUBIC
+        
+        if backend not in ("native", "hf"):
+            raise ValueError(f"Unknown preprocessing backend '{backend}'. Available: native, hf")
+        self.backend = backend
+        self.native = PixelPreprocessor(
+            hf_processor, self.input_size, device=device, dtype=dtype
+        ) if backend == "native" else None
+        
+        logger.info(
+            "ImageProcessor initialized (device=%s, dtype=%s, input_size=%s, backend=%s)",
+            device, dtype, self.input_size, backend
+        )
+    
+    @classmethod
+    def _resolve_input_size(cls, image_processor, input_size: Optional[int]) -> Tuple[int, int]:
+        """Resolve model input (width, height)."""
+        if input_size:
+            return (input_size, input_size)
+        
+        size = getattr(image_processor, "size", None)
+        if isinstance(size, dict) and "height" in size and "width" in size:
+            return (int(size["width"]), int(size["height"]))
+        
+        return (cls.DEFAULT_INPUT_SIZE, cls.DEFAULT_INPUT_SIZE)
+    
+    def _size(self, input_size: Optional[int]) -> Tuple[int, int]:
+        """Resolve a per-call input size to (width, height)."""
+        if not input_size:
+            return self.input_size
+        input_size = validate_input_size(input_size)
+        return (input_size, input_size)
+    
+    def load(
+        self,
+        image_input: ImageInput,
+        input_size: Optional[int] = None
+    ) -> Tuple[Image.Image, str, Tuple[int, int]]:
+        """
+        Decode, resize and hash an image for inference in one pass.
+        
+        Args:
+            image_input: Image path, PIL Image, pixel array or bytes
+            input_size: Input size for this call (defaults to input_size)
+            
+        Returns:
+            Tuple of (model-sized image, cache hash, original (width, height))
+        """
+        return ImageUtils.load_for_model(image_input, self._size(input_size), self.resample)
     
     def prepare(
         self,
-        image_input: Union[str, Path, Image.Image],
+        image_input: ImageInput,
         prompt: str
     ) -> dict:
         """
         Prepare image and prompt for model inference.
         
         Args:
-            image_input: Image path or PIL Image
+            image_input: Image path, PIL Image, pixel array or bytes
             prompt: Task prompt for the model
             
         Returns:
             Dictionary with input_ids, pixel_values, etc.
         """
-        # Load and preprocess image
-        image = ImageUtils.load(image_input, convert_rgb=True)
-        
-        # Resize if needed
-        if max(image.size) > self.max_size:
-            image = ImageUtils.resize_smart(image, self.max_size)
-            logger.debug(f"Resized image to {image.size}")
-        
-        # Process through HF processor
-        inputs = self.hf_processor(
-            text=prompt,
-            images=image,
-            return_tensors="pt"
-        )
-        
-        # Move to device
-        inputs = {
-            key: value.to(self.device, self.dtype) 
-            if value.dtype in [torch.float16, torch.float32, torch.float64]
-            else value.to(self.device)
-            for key, value in inputs.items()
-        }
-        
-        return inputs
+        image, _, _ = self.load(image_input)
+        return self.to_model_inputs([image], [prompt])
     
     def prepare_batch(
         self,
@@ -103,21 +147,47 @@ class ImageProcessor:
         if len(images) != len(prompts):
             raise ValueError("Images and prompts must have same length")
         
-        # Process all images
-        processed_images = []
-        for img in images:
-            image = ImageUtils.load(img, convert_rgb=True)
-            if max(image.size) > self.max_size:
-                image = ImageUtils.resize_smart(image, self.max_size)
-            processed_images.append(image)
-        
-        # Batch process
-        inputs = self.hf_processor(
-            text=prompts,
-            images=processed_images,
-            return_tensors="pt",
-            padding=True
-        )
+        processed_images = [self.load(img)[0] for img in images]
+        return self.to_model_inputs(processed_images, prompts)
+    
+    def to_model_inputs(
+        self,
+        images: List[Image.Image],
+        prompts: List[str],
+        input_size: Optional[int] = None
+    ) -> dict:
+        """
+        Convert loaded images and prompts to model tensors on device.
+        
+        Images already at the model input size skip the resize step.
+        With the native backend, returned tensors are reused buffers
+        valid until the next call on the same thread.
+        
+        Args:
+            images: RGB images (ideally from load())
+            prompts: Task prompt per image
+            input_size: Input size for this batch (defaults to input_size)
+            
+        Returns:
+            Batched inputs dictionary
+        """
+        size = self._size(input_size)
+        images = [
+            img if img.size == size else img.resize(size, self.resample)
+            for img in images
+        ]
+        
+        if self.native is not None:
+            return self.native(images, prompts)
+        
+        with image_token_budget(self.hf_processor, size):
+            inputs = self.hf_processor(
+                text=prompts,
+                images=images,
+                return_tensors="pt",
+                padding=True,
+                do_resize=False
+            )
         
         # Move to device
         inputs = {
@@ -129,7 +199,25 @@ class ImageProcessor:
         
         return inputs
     
-    def get_image_hash(self, image_input: Union[str, Path, Image.Image]) -> str:
+    def cache_prompts(
+        self,
+        prompts: List[str],
+        input_sizes: Optional[List[Optional[int]]] = None
+    ) -> None:
+        """
+        Tokenize task prompts ahead of the first request (native backend).
+        
+        Args:
+            prompts: Task prompts
+            input_sizes: Input size per prompt (defaults to input_size)
+        """
+        if self.native is None:
+            return
+        input_sizes = input_sizes or [None] * len(prompts)
+        for prompt, input_size in set(zip(prompts, input_sizes)):
+            self.native.prompt_ids(prompt, self._size(input_size))
+    
+    def get_image_hash(self, image_input: ImageInput) -> str:
         """
         Compute hash for image (for caching).
         
@@ -139,8 +227,7 @@ class ImageProcessor:
         Returns:
             Hash string
         """
-        image = ImageUtils.load(image_input, convert_rgb=True)
-        return ImageUtils.compute_hash(image)
+        return self.load(image_input)[1]
     
     def decode(self, generated_ids: torch.Tensor) -> list:
         """
@@ -181,5 +268,5 @@ class ImageProcessor:
                 image_size=image_size
             )
         except Exception as e:
-            logger.warning(f"Post-processing failed: {e}")
+            logger.warning("Post-processing failed: %s", e)
             return {task_prompt: generated_text}
@@ -0,0 +1,136 @@
+"""
+DARA Core - Region-of-Interest OCR
+Text-region parsing, reading order and crop preparation for two-stage OCR.
+"""
+
+from dataclasses import dataclass
+from typing import Any, List, Tuple
+
+import numpy as np
+from PIL import Image
+
+from ..utils.text import TextUtils
+
+# Florence-2 task that returns text with quadrilateral boxes
+REGION_PROMPT = "<OCR_WITH_REGION>"
+
+
+@dataclass
+class TextRegion:
+    """
+    One text region found by the region pass.
+    
+    Attributes:
+        box: Axis-aligned (left, top, right, bottom) in source pixels
+        label: Text the region pass read for this box
+    """
+    box: Tuple[float, float, float, float]
+    label: str = ""
+    
+    @property
+    def height(self) -> float:
+        return self.box[3] - self.box[1]
+    
+    @property
+    def center_y(self) -> float:
+        return (self.box[1] + self.box[3]) / 2
+
+
+def parse_regions(parsed: Any, min_size: float = 4.0) -> List[TextRegion]:
+    """
+    Convert a post-processed ``<OCR_WITH_REGION>`` answer into regions.
+    
+    Args:
+        parsed: {"quad_boxes": [[x1, y1, ..., x4, y4], ...], "labels": [...]}
+        min_size: Drop boxes narrower or shorter than this (pixels)
+        
+    Returns:
+        Regions with axis-aligned boxes
+    """
+    if not isinstance(parsed, dict):
+        return []
+    
+    regions = []
+    for quad, label in zip(parsed.get("quad_boxes", []), parsed.get("labels", [])):
+        xs, ys = quad[0::2], quad[1::2]
+        box = (min(xs), min(ys), max(xs), max(ys))
+        if box[2] - box[0] < min_size or box[3] - box[1] < min_size:
+            continue
+        regions.append(TextRegion(box=box, label=TextUtils.clean(label)))
+    return regions
+
+
+def reading_order(regions: List[TextRegion]) -> List[List[TextRegion]]:
+    """
+    Group regions into lines, top to bottom and left to right.
+    
+    A region joins the current line when its vertical center lies
+    within half a line height of the line's center.
+    
+    Args:
+        regions: Regions in any order
+        
+    Returns:
+        Lines of regions
+    """
+    lines: List[List[TextRegion]] = []
+    for region in sorted(regions, key=lambda r: r.center_y):
+        if lines:
+            line = lines[-1]
+            center = sum(r.center_y for r in line) / len(line)
+            height = max(r.height for r in line)
+            if abs(region.center_y - center) <= height / 2:
+                line.append(region)
+                continue
+        lines.append([region])
+    
+    return [sorted(line, key=lambda r: r.box[0]) for line in lines]
+
+
+def expand_box(
+    box: Tuple[float, float, float, float],
+    image_size: Tuple[int, int],
+    margin: float = 0.2
+) -> Tuple[int, int, int, int]:
+    """Pad a box by a fraction of its height on every side, clipped to the image."""
+    width, height = image_size
+    pad = (box[3] - box[1]) * margin
+    return (
+        max(int(box[0] - pad), 0),
+        max(int(box[1] - pad), 0),
+        min(int(box[2] + pad + 1), width),
+        min(int(box[3] + pad + 1), height),
+    )
+
+
+def letterbox(
+    crop: Image.Image,
+    size: int,
+    max_scale: float = 3.0,
+    resample: int = Image.Resampling.BICUBIC
+) -> Image.Image:
+    """
+    Fit a crop into a square model input without distorting it.
+    
+    Text lines are much wider than tall; stretching them to a square
+    would smear the glyphs. The crop is scaled to fit (never more than
+    ``max_scale``) and centered on a canvas filled with its mean color.
+    
+    Args:
+        crop: Region crop
+        size: Model input size in pixels per side
+        max_scale: Upper bound on upscaling
+        resample: PIL resampling filter
+        
+    Returns:
+        size x size RGB image
+    """
+    scale = min(size / crop.width, size / crop.height, max_scale)
+    scaled = (max(int(crop.width * scale), 1), max(int(crop.height * scale), 1))
+    if scaled != crop.size:
+        crop = crop.resize(scaled, resample)
+    
+    fill = tuple(int(c) for c in np.asarray(crop).reshape(-1, 3).mean(axis=0))
+    canvas = Image.new("RGB", (size, size), fill)
+    canvas.paste(crop, ((size - scaled[0]) // 2, (size - scaled[1]) // 2))
+    return canvas
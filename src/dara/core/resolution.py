@@ -0,0 +1,211 @@
+"""
+DARA Core - Input Resolution
+Per-mode input sizes, image-token budgets and position-embedding interpolation.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+import torch
+import torch.nn.functional as F
+from torch import nn
+
+from ..utils.logging import get_logger
+
+logger = get_logger("resolution")
+
+# Total downsampling of the Florence-2 DaViT encoder (patch strides 4*2*2*2)
+PATCH_STRIDE = 32
+
+_token_lock = threading.Lock()
+
+
+def validate_input_size(size: int) -> int:
+    """
+    Check that an input size maps onto a whole encoder grid.
+    
+    Args:
+        size: Input size in pixels per side
+        
+    Returns:
+        The size, unchanged
+    """
+    if size < PATCH_STRIDE or size % PATCH_STRIDE:
+        raise ValueError(
+            f"Input size {size} must be a positive multiple of {PATCH_STRIDE}"
+        )
+    return size
+
+
+def grid_size(size: Tuple[int, int]) -> Tuple[int, int]:
+    """Encoder feature grid (columns, rows) for an input (width, height)."""
+    return (size[0] // PATCH_STRIDE, size[1] // PATCH_STRIDE)
+
+
+def image_token_count(size: Tuple[int, int]) -> int:
+    """
+    Visual tokens the encoder emits for an input size.
+    
+    One per grid cell plus the pooled global token, e.g. 577 at 768x768.
+    """
+    columns, rows = grid_size(size)
+    return columns * rows + 1
+
+
+def resolve_mode_size(mode_handler, config) -> int:
+    """
+    Input size for a mode: config override, then the mode's profile,
+    then the global default.
+    
+    Args:
+        mode_handler: BaseMode instance
+        config: DARA Config
+        
+    Returns:
+        Input size in pixels per side
+    """
+    size = (
+        config.inference.mode_image_sizes.get(mode_handler.name)
+        or mode_handler.image_size
+        or config.inference.input_size
+    )
+    return validate_input_size(int(size))
+
+
+def warn_untrained_positions(mode_sizes: Dict[str, int], trained_size: int, interpolation: str) -> None:
+    """
+    Warn about modes whose grid reaches position rows the model never trained.
+    
+    With "extend", sizes above the trained one index rows and columns
+    of the position table past the trained grid; "interpolate" resamples
+    the trained grid instead.
+    
+    Args:
+        mode_sizes: Input size per mode
+        trained_size: Input size the model was trained at (pixels per side)
+        interpolation: "extend" or "interpolate"
+    """
+    if interpolation != "extend":
+        return
+    larger = {mode: size for mode, size in mode_sizes.items() if size > trained_size}
+    if larger:
+        logger.warning(
+            "Modes %s run above the trained %spx with position_interpolation='extend', "
+            "which uses untrained position embeddings; use 'interpolate' for them",
+            larger, trained_size
+        )
+
+
+@contextmanager
+def image_token_budget(hf_processor, size: Tuple[int, int]):
+    """
+    Make the HF processor emit the image-token count for ``size``.
+    
+    Processors that expand prompts with image placeholder tokens size
+    that expansion for their configured resolution. Other processors
+    (such as the remote-code Florence-2 one) are left untouched.
+    """
+    if not hasattr(hf_processor, "num_image_tokens"):
+        yield
+        return
+    
+    with _token_lock:
+        original = hf_processor.num_image_tokens
+        hf_processor.num_image_tokens = image_token_count(size)
+        try:
+            yield
+        finally:
+            hf_processor.num_image_tokens = original
+
+
+class InterpolatedPositionEmbedding(nn.Module):
+    """
+    Drop-in for a learned 1-D position table indexed by ``arange(n)``.
+    
+    Florence-2 learns row and column embeddings for up to 50 positions
+    but is trained on a 24x24 grid. In "interpolate" mode every grid
+    size other than the trained one resamples the trained positions, so
+    a 16x16 or 32x32 grid still spans the same spatial extent. In
+    "extend" mode the table prefix is used as-is and only grids larger
+    than the table are interpolated. Resampled tables are cached per
+    length.
+    """
+    
+    def __init__(self, embedding: nn.Embedding, trained_length: int, mode: str = "extend"):
+        super().__init__()
+        if mode not in ("extend", "interpolate"):
+            raise ValueError(f"Unknown interpolation mode '{mode}'. Available: extend, interpolate")
+        self.embedding = embedding
+        self.trained_length = min(trained_length, embedding.num_embeddings)
+        self.mode = mode
+        self._tables: Dict[int, torch.Tensor] = {}
+    
+    @property
+    def weight(self) -> torch.Tensor:
+        return self.embedding.weight
+    
+    @property
+    def num_embeddings(self) -> int:
+        return self.embedding.num_embeddings
+    
+    def forward(self, positions: torch.Tensor) -> torch.Tensor:
+        length = positions.numel()
+        if self.mode == "extend" and length <= self.embedding.num_embeddings:
+            return self.embedding(positions)
+        if self.mode == "interpolate" and length == self.trained_length:
+            return self.embedding(positions)
+        
+        table = self._tables.get(length)
+        if table is None:
+            source_length = self.trained_length if self.mode == "interpolate" else self.embedding.num_embeddings
+            source = self.embedding.weight[:source_length]
+            # (L, D) -> (1, D, L) for 1-D linear resampling
+            table = F.interpolate(
+                source.T.unsqueeze(0).float(),
+                size=length,
+                mode="linear",
+                align_corners=False
+            ).squeeze(0).T.to(source.dtype).contiguous()
+            self._tables[length] = table
+        return table[positions]
+
+
+def install_position_interpolation(
+    model: nn.Module,
+    trained_size: int,
+    mode: str = "extend"
+) -> int:
+    """
+    Wrap the vision encoder's learned 2-D position embeddings.
+    
+    Finds every module with ``row_embeddings`` and ``column_embeddings``
+    tables (Florence-2's image position embedding, in both the remote
+    code and the transformers implementation) and wraps them in
+    InterpolatedPositionEmbedding.
+    
+    Args:
+        model: Loaded model
+        trained_size: Input size the model was trained at (pixels per side)
+        mode: "extend" or "interpolate"
+        
+    Returns:
+        Number of position-embedding modules wrapped
+    """
+    trained_length = trained_size // PATCH_STRIDE
+    wrapped = 0
+    
+    for module in model.modules():
+        rows = getattr(module, "row_embeddings", None)
+        columns = getattr(module, "column_embeddings", None)
+        if not isinstance(rows, nn.Embedding) or not isinstance(columns, nn.Embedding):
+            continue
+        module.row_embeddings = InterpolatedPositionEmbedding(rows, trained_length, mode)
+        module.column_embeddings = InterpolatedPositionEmbedding(columns, trained_length, mode)
+        wrapped += 1
+    
+    if wrapped:
+        logger.debug("Position interpolation (%s) on %s module(s), trained grid %s", mode, wrapped, trained_length)
+    else:
+        logger.debug("No learned 2-D position embeddings found; interpolation not installed")
+    return wrapped
@@ -0,0 +1,217 @@
+"""
+DARA Core - Stub Backend
+Deterministic stand-ins for the Florence-2 model, processor and TTS
+engine, for benchmarks and CI without weights or network.
+"""
+
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+from torch import nn
+
+# Canned answer per task prompt; region boxes are fractions of the image
+CANNED_OUTPUTS: Dict[str, Any] = {
+    "<MORE_DETAILED_CAPTION>": (
+        "The image shows a man walking down a flight of stairs next to a wooden "
+        "chair. There is a door on the left and a window behind him."
+    ),
+    "<CAPTION>": "a woman smiling at the camera",
+    "<OCR>": "BANK INDONESIA 50000 LIMA PULUH RIBU RUPIAH",
+    "<OCR_WITH_REGION>": {
+        "quad_boxes": [
+            [0.1, 0.1, 0.8, 0.1, 0.8, 0.25, 0.1, 0.25],
+            [0.1, 0.35, 0.7, 0.35, 0.7, 0.5, 0.1, 0.5],
+        ],
+        "labels": ["BANK INDONESIA", "50000 LIMA PULUH RIBU RUPIAH"],
+    },
+}
+
+# Synthetic delays, in milliseconds
+LATENCY_STAGES = ("generate", "per_image", "decode", "tts")
+
+BOS, PAD, EOS = 0, 1, 2
+# Florence-2 preprocessor_config.json values
+IMAGE_MEAN = [0.485, 0.456, 0.406]
+IMAGE_STD = [0.229, 0.224, 0.225]
+
+
+def validate_latency(latency_ms: Optional[Dict[str, float]]) -> Dict[str, float]:
+    """Check stub delay names; missing stages take no time."""
+    latency_ms = dict(latency_ms or {})
+    for name in latency_ms:
+        if name not in LATENCY_STAGES:
+            raise ValueError(f"Invalid stub latency stage '{name}'. Available: {', '.join(LATENCY_STAGES)}")
+    return {name: float(latency_ms.get(name, 0.0)) for name in LATENCY_STAGES}
+
+
+def _sleep_ms(ms: float) -> None:
+    if ms > 0:
+        time.sleep(ms / 1000)
+
+
+class _StubImageConfig:
+    """The image processor attributes ImageProcessor and PixelPreprocessor read."""
+    size = {"height": 768, "width": 768}
+    image_mean = IMAGE_MEAN
+    image_std = IMAGE_STD
+    do_rescale = True
+    rescale_factor = 1 / 255
+    do_normalize = True
+    resample = 3  # bicubic
+
+
+class _StubTokenizer:
+    pad_token_id = PAD
+    bos_token_id = BOS
+    eos_token_id = EOS
+
+
+class StubProcessor:
+    """
+    Florence-2 processor stand-in.
+    
+    Prompts tokenize to fixed ids that the StubModel maps back to the
+    prompt's canned output; batch_decode and post_process_generation
+    return that output, with region boxes scaled to the image size.
+    
+    Example:
+        >>> processor = StubProcessor(outputs={"<OCR>": "Rp 20.000"})
+        >>> model = StubModel(processor, latency_ms={"generate": 80})
+    """
+    
+    def __init__(
+        self,
+        outputs: Optional[Dict[str, Any]] = None,
+        latency_ms: Optional[Dict[str, float]] = None
+    ):
+        """
+        Initialize stub processor.
+        
+        Args:
+            outputs: Canned output per task prompt (merged over CANNED_OUTPUTS)
+            latency_ms: Synthetic delays; "decode" is spent in batch_decode
+        """
+        self.outputs = {**CANNED_OUTPUTS, **(outputs or {})}
+        self.latency_ms = validate_latency(latency_ms)
+        self.image_processor = _StubImageConfig()
+        self.tokenizer = _StubTokenizer()
+        
+        # Output token ids start after the special tokens
+        self._output_ids = {prompt: index + 3 for index, prompt in enumerate(self.outputs)}
+        self._prompts_by_id = {index: prompt for prompt, index in self._output_ids.items()}
+        self._prompts_by_ids: Dict[Tuple[int, ...], str] = {}
+    
+    def encode_prompt(self, prompt: str) -> List[int]:
+        """Token ids for a prompt (stable across runs and processes)."""
+        ids = [BOS] + [3 + byte for byte in prompt.encode("utf-8")] + [EOS]
+        self._prompts_by_ids[tuple(ids)] = prompt
+        return ids
+    
+    def prompt_for(self, ids: torch.Tensor) -> Optional[str]:
+        """Prompt a row of (possibly padded) input ids was encoded from."""
+        ids = tuple(i for i in ids.tolist() if i != PAD)
+        return self._prompts_by_ids.get(ids)
+    
+    def output_id(self, prompt: Optional[str]) -> int:
+        """Token id standing for a prompt's canned output (EOS if none)."""
+        return self._output_ids.get(prompt, EOS)
+    
+    def __call__(self, text=None, images=None, return_tensors="pt", padding=False, **kwargs) -> dict:
+        prompts = [text] if isinstance(text, str) else list(text or [])
+        encoded = [self.encode_prompt(prompt) for prompt in prompts]
+        length = max((len(ids) for ids in encoded), default=0)
+        input_ids = torch.full((len(encoded), length), PAD, dtype=torch.long)
+        for row, ids in zip(input_ids, encoded):
+            row[:len(ids)] = torch.tensor(ids)
+        
+        result = {"input_ids": input_ids}
+        if images is not None:
+            images = images if isinstance(images, list) else [images]
+            array = np.stack([np.asarray(image.convert("RGB"), dtype=np.float32) for image in images])
+            array = (array / 255 - IMAGE_MEAN) / IMAGE_STD
+            result["pixel_values"] = torch.from_numpy(array.transpose(0, 3, 1, 2).astype(np.float32))
+        return result
+    
+    def batch_decode(self, sequences, skip_special_tokens: bool = False) -> List[str]:
+        _sleep_ms(self.latency_ms["decode"])
+        texts = []
+        for row in sequences:
+            ids = row.tolist() if hasattr(row, "tolist") else list(row)
+            prompt = self._prompts_by_id.get(ids[2] if len(ids) > 2 else EOS)
+            output = self.outputs.get(prompt, "")
+            texts.append(output if isinstance(output, str) else " ".join(output.get("labels", [])))
+        return texts
+    
+    def post_process_generation(self, text: str, task: str, image_size: Tuple[int, int]) -> dict:
+        output = self.outputs.get(task)
+        if isinstance(output, dict) and "quad_boxes" in output:
+            width, height = image_size
+            boxes = [
+                [value * (width if i % 2 == 0 else height) for i, value in enumerate(quad)]
+                for quad in output["quad_boxes"]
+            ]
+            return {task: {"quad_boxes": boxes, "labels": list(output["labels"])}}
+        return {task: text}
+
+
+class StubModel(nn.Module):
+    """
+    Florence-2 model stand-in with a configurable generate delay.
+    
+    generate sleeps latency_ms["generate"] plus latency_ms["per_image"]
+    per batch row, then returns, per row, ids that StubProcessor decodes
+    to the row's canned output, padded to about one token per word.
+    """
+    
+    def __init__(self, processor: StubProcessor, latency_ms: Optional[Dict[str, float]] = None):
+        super().__init__()
+        self.processor = processor
+        self.latency_ms = validate_latency(latency_ms if latency_ms is not None else processor.latency_ms)
+        self.calls = 0
+        self.images = 0
+    
+    def generate(self, input_ids: torch.Tensor, pixel_values: Optional[torch.Tensor] = None, **kwargs) -> torch.Tensor:
+        batch = input_ids.shape[0]
+        _sleep_ms(self.latency_ms["generate"] + self.latency_ms["per_image"] * batch)
+        self.calls += 1
+        self.images += batch
+        
+        rows = []
+        for ids in input_ids:
+            prompt = self.processor.prompt_for(ids)
+            output = self.processor.outputs.get(prompt, "")
+            words = len(output.split()) if isinstance(output, str) else len(output.get("labels", [])) * 4
+            rows.append([EOS, BOS, self.processor.output_id(prompt)] + [5] * max(0, words - 1) + [EOS])
+        
+        length = max(len(row) for row in rows)
+        generated = torch.full((batch, length), PAD, dtype=torch.long)
+        for target, row in zip(generated, rows):
+            target[:len(row)] = torch.tensor(row)
+        return generated
+
+
+class StubSpeechEngine:
+    """pyttsx3 engine stand-in that writes a tiny file after latency_ms["tts"]."""
+    
+    def __init__(self, latency_ms: Optional[Dict[str, float]] = None):
+        self.latency_ms = validate_latency(latency_ms)
+        self._properties: Dict[str, Any] = {"voices": []}
+        self._queue: List[Tuple[str, str]] = []
+    
+    def setProperty(self, name: str, value: Any) -> None:
+        self._properties[name] = value
+    
+    def getProperty(self, name: str) -> Any:
+        return self._properties.get(name)
+    
+    def save_to_file(self, text: str, path: str) -> None:
+        self._queue.append((text, path))
+    
+    def runAndWait(self) -> None:
+        queue, self._queue = self._queue, []
+        for text, path in queue:
+            _sleep_ms(self.latency_ms["tts"])
+            Path(path).write_bytes(text.encode("utf-8"))
@@ -0,0 +1,266 @@
+"""
+DARA Core - Tiled OCR
+Overlapping tile planning, blank-tile detection and line stitching.
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from .regions import TextRegion, reading_order
+
+# Side of the grayscale thumbnail used for blank-tile checks
+BLANK_CHECK_SIZE = 96
+
+# Gradient magnitude (0-255 scale) that counts as an edge pixel
+EDGE_THRESHOLD = 24
+
+_TOKEN_NORMALIZE = re.compile(r"[^\w]+")
+
+Box = Tuple[float, float, float, float]
+
+
+@dataclass
+class Tile:
+    """
+    One tile of a source image.
+    
+    Attributes:
+        box: (left, top, right, bottom) in source pixels
+        row: Tile row index
+        column: Tile column index
+    """
+    box: Tuple[int, int, int, int]
+    row: int
+    column: int
+    
+    @property
+    def size(self) -> Tuple[int, int]:
+        return (self.box[2] - self.box[0], self.box[3] - self.box[1])
+
+
+def _axis_starts(length: int, window: int, overlap: int) -> List[int]:
+    """Evenly spread window starts so the last window ends at the edge."""
+    if length <= window:
+        return [0]
+    count = math.ceil((length - overlap) / (window - overlap))
+    step = (length - window) / (count - 1)
+    return [round(i * step) for i in range(count)]
+
+
+def plan_tiles(
+    image_size: Tuple[int, int],
+    tile_size: int,
+    overlap: float = 0.15,
+    max_tiles: int = 16
+) -> List[Tile]:
+    """
+    Split an image into overlapping square tiles, in reading order.
+    
+    Tiles are ``tile_size`` source pixels per side, so each one reaches
+    the model at native resolution. When that would exceed
+    ``max_tiles``, the window grows until the grid fits and tiles are
+    downscaled instead.
+    
+    Args:
+        image_size: Source (width, height)
+        tile_size: Model input size in pixels per side
+        overlap: Fraction of each tile shared with its neighbour
+        max_tiles: Upper bound on the number of tiles
+        
+    Returns:
+        Tiles ordered row by row, left to right
+    """
+    width, height = image_size
+    if max(width, height) <= tile_size:
+        return [Tile(box=(0, 0, width, height), row=0, column=0)]
+    window = min(tile_size, width, height)
+    
+    while True:
+        pad = int(window * overlap)
+        xs = _axis_starts(width, window, pad)
+        ys = _axis_starts(height, window, pad)
+        if len(xs) * len(ys) <= max_tiles or window >= max(width, height):
+            break
+        window = min(int(window * 1.25) + 1, max(width, height))
+    
+    return [
+        Tile(
+            box=(x, y, min(x + window, width), min(y + window, height)),
+            row=row,
+            column=column
+        )
+        for row, y in enumerate(ys)
+        for column, x in enumerate(xs)
+    ]
+
+
+def is_blank(
+    image: Image.Image,
+    min_std: float = 6.0,
+    min_edge_density: float = 0.004
+) -> bool:
+    """
+    Cheap check for tiles with nothing to read.
+    
+    A tile is blank when its grayscale thumbnail is nearly flat (low
+    standard deviation) or has almost no strong gradients (low edge
+    density), e.g. empty paper, table tops or sky.
+    
+    Args:
+        image: Tile image
+        min_std: Minimum grayscale standard deviation for content
+        min_edge_density: Minimum fraction of edge pixels for content
+        
+    Returns:
+        True if the tile can be skipped
+    """
+    thumb = image.convert("L")
+    thumb.thumbnail((BLANK_CHECK_SIZE, BLANK_CHECK_SIZE))
+    gray = np.asarray(thumb, dtype=np.float32)
+    
+    if gray.std() < min_std:
+        return True
+    
+    gx = np.abs(np.diff(gray, axis=1))
+    gy = np.abs(np.diff(gray, axis=0))
+    edges = (gx > EDGE_THRESHOLD).sum() + (gy > EDGE_THRESHOLD).sum()
+    return edges / (gx.size + gy.size) < min_edge_density
+
+
+def _normalize(token: str) -> str:
+    return _TOKEN_NORMALIZE.sub("", token.lower())
+
+
+def merge_overlap(left: str, right: str, min_overlap: int = 2) -> str:
+    """
+    Join two texts, dropping a word run that ends one and starts the other.
+    
+    Finds the longest run of words ending ``left`` that also starts
+    ``right`` (ignoring case and punctuation). Runs shorter than
+    ``min_overlap`` words are treated as coincidence. A ``right`` text
+    already contained in ``left`` is dropped.
+    
+    Args:
+        left: Accumulated text
+        right: Next text
+        min_overlap: Minimum words for a match
+        
+    Returns:
+        Merged text
+    """
+    left_tokens, right_tokens = left.split(), right.split()
+    if not right_tokens:
+        return left
+    if not left_tokens:
+        return right
+    
+    left_norm = [_normalize(t) for t in left_tokens]
+    right_norm = [_normalize(t) for t in right_tokens]
+    
+    if len(right_norm) <= len(left_norm):
+        joined_left = " " + " ".join(left_norm) + " "
+        if " " + " ".join(right_norm) + " " in joined_left:
+            return left
+    
+    for k in range(min(len(left_norm), len(right_norm)), min_overlap - 1, -1):
+        if left_norm[-k:] == right_norm[:k]:
+            return " ".join(left_tokens + right_tokens[k:])
+    
+    return " ".join(left_tokens + right_tokens)
+
+
+def _area(box: Box) -> float:
+    return max(box[2] - box[0], 0.0) * max(box[3] - box[1], 0.0)
+
+
+def _intersection(a: Box, b: Box) -> float:
+    return _area((max(a[0], b[0]), max(a[1], b[1]), min(a[2], b[2]), min(a[3], b[3])))
+
+
+def _cut_margin(box: Box, tile: Tile, image_size: Tuple[int, int]) -> float:
+    """Distance from a box to the nearest tile edge that cuts through the page."""
+    left, top, right, bottom = tile.box
+    width, height = image_size
+    margins = [math.inf]
+    if left > 0:
+        margins.append(box[0] - left)
+    if top > 0:
+        margins.append(box[1] - top)
+    if right < width:
+        margins.append(right - box[2])
+    if bottom < height:
+        margins.append(bottom - box[3])
+    return min(margins)
+
+
+def stitch_regions(
+    tiles: List[Tile],
+    tile_regions: List[Optional[List[TextRegion]]],
+    image_size: Tuple[int, int],
+    duplicate_overlap: float = 0.5
+) -> Tuple[str, Dict[str, int]]:
+    """
+    Stitch per-tile text lines into one text in reading order.
+    
+    Line boxes are moved from tile to page coordinates. A line read by
+    two tiles (it lies in their overlap strip) yields two boxes covering
+    the same place; only the copy farthest from a tile cut is kept, as
+    the other may be clipped. The remaining lines are ordered with
+    reading_order. Pieces of one long line read by neighbouring tiles
+    overlap horizontally and are joined dropping the words they share.
+    
+    Args:
+        tiles: Tiles from plan_tiles
+        tile_regions: Text regions per tile in tile pixels, None for
+            skipped tiles
+        image_size: Source (width, height)
+        duplicate_overlap: Fraction of the smaller box two boxes from
+            different tiles must share to be the same line
+        
+    Returns:
+        Tuple of (text, one line per output line; counts of "lines" and
+        "duplicates" dropped)
+    """
+    placed = []  # (region in page pixels, cut margin, tile index)
+    for index, (tile, regions) in enumerate(zip(tiles, tile_regions)):
+        dx, dy = tile.box[0], tile.box[1]
+        for region in regions or []:
+            if not region.label:
+                continue
+            box = (region.box[0] + dx, region.box[1] + dy, region.box[2] + dx, region.box[3] + dy)
+            placed.append((TextRegion(box=box, label=region.label), _cut_margin(box, tile, image_size), index))
+    
+    # Most trustworthy copies first: away from cuts, then larger
+    placed.sort(key=lambda item: (-item[1], -_area(item[0].box)))
+    kept: List[Tuple[TextRegion, int]] = []
+    duplicates = 0
+    for region, _, index in placed:
+        if any(
+            other_index != index
+            and _intersection(region.box, other.box)
+            >= duplicate_overlap * min(_area(region.box), _area(other.box))
+            for other, other_index in kept
+        ):
+            duplicates += 1
+            continue
+        kept.append((region, index))
+    
+    lines = reading_order([region for region, _ in kept])
+    texts = []
+    for line in lines:
+        text, right = "", -math.inf
+        for region in line:
+            # Overlapping pieces of one line share the words in between
+            if region.box[0] < right:
+                text = merge_overlap(text, region.label, min_overlap=1)
+            else:
+                text = f"{text} {region.label}".strip()
+            right = max(right, region.box[2])
+        texts.append(text)
+    
+    return "\n".join(texts), {"lines": len(lines), "duplicates": duplicates}
@@ -5,6 +5,7 @@ from .emotion import EmotionMode
 from .medicine import MedicineMode
 from .currency import CurrencyMode
 from .text import TextMode
+from .router import ModeRouter, RouteDecision
 
 __all__ = [
     "BaseMode", 
@@ -13,5 +14,7 @@ __all__ = [
     "EmotionMode", 
     "MedicineMode", 
     "CurrencyMode", 
-    "TextMode"
+    "TextMode",
+    "ModeRouter",
+    "RouteDecision"
 ]
@@ -3,18 +3,38 @@ DARA Modes - Base Mode Handler
 Abstract base class for all intelligent mode handlers.
 """
 
+import math
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
-from typing import Optional, Any
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Optional, Any, List, Sequence
 
 from ..utils.text import TextUtils
+from ..utils.timing import stage
+
+# Below this many outputs per worker, a process pool costs more than it saves
+MIN_OUTPUTS_PER_WORKER = 256
+
+# Mode handler of a process_batch worker process
+_worker_mode: Optional["BaseMode"] = None
+
+
+def _init_worker(mode: "BaseMode") -> None:
+    global _worker_mode
+    _worker_mode = mode
+
+
+def _process_in_worker(raw_output: Any, language: str) -> "ModeResult":
+    return _worker_mode.process(raw_output, language)
 
 
-@dataclass
 class ModeResult:
     """
     Structured result from mode processing.
     
+    Uses __slots__ rather than a per-instance __dict__, since batches
+    and caches hold many of these at once.
+    
     Attributes:
         text: Final processed text output
         confidence: Confidence score (0.0 - 1.0)
@@ -22,11 +42,31 @@ class ModeResult:
         metadata: Mode-specific metadata
         suggestions: Helpful suggestions for user
     """
-    text: str
-    confidence: float
-    raw_output: str
-    metadata: dict = field(default_factory=dict)
-    suggestions: list = field(default_factory=list)
+    __slots__ = ("text", "confidence", "raw_output", "metadata", "suggestions")
+    
+    def __init__(
+        self,
+        text: str,
+        confidence: float,
+        raw_output: str,
+        metadata: Optional[dict] = None,
+        suggestions: Optional[list] = None
+    ):
+        self.text = text
+        self.confidence = confidence
+        self.raw_output = raw_output
+        self.metadata = {} if metadata is None else metadata
+        self.suggestions = [] if suggestions is None else suggestions
+    
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+    
+    def __repr__(self) -> str:
+        return (f"ModeResult(text={self.text!r}, confidence={self.confidence!r}, "
+                f"raw_output={self.raw_output!r}, metadata={self.metadata!r}, "
+                f"suggestions={self.suggestions!r})")
     
     def to_dict(self) -> dict:
         """Convert to dictionary."""
@@ -57,6 +97,21 @@ class BaseMode(ABC):
     MODE_CURRENCY = "currency"
     MODE_TEXT = "text"
     
+    # Model input size in pixels per side (multiple of 32); None uses
+    # InferenceConfig.input_size. Visual tokens scale with its square:
+    # 512 -> 257, 768 -> 577, 1024 -> 1025.
+    image_size: Optional[int] = None
+    
+    # Whether the prompt reads text, so the image can be OCR'd in tiles
+    supports_tiling: bool = False
+    
+    # Whether text regions can be detected first and read crop by crop
+    supports_regions: bool = False
+    
+    # Results below this confidence are re-run on the escalation model
+    # (ModelConfig.escalation_model_id); None never escalates
+    escalation_threshold: Optional[float] = 0.5
+    
     @property
     @abstractmethod
     def name(self) -> str:
@@ -88,6 +143,39 @@ class BaseMode(ABC):
         """
         pass
     
+    def process_batch(
+        self,
+        raw_outputs: Sequence[Any],
+        language: str = "en",
+        workers: Optional[int] = None
+    ) -> List[ModeResult]:
+        """
+        Process many raw outputs, e.g. when re-scoring stored results.
+        
+        Results are identical to calling process on each output, in
+        order. With ``workers`` > 1 and a large enough batch, outputs are
+        split across a process pool; the handler is sent to each worker
+        once rather than with every chunk.
+        
+        Args:
+            raw_outputs: Raw model outputs
+            language: Output language code ('en' or 'id')
+            workers: Worker processes (None or 1 processes in this process)
+            
+        Returns:
+            One ModeResult per raw output
+        """
+        if not workers or workers <= 1 or len(raw_outputs) < workers * MIN_OUTPUTS_PER_WORKER:
+            return [self.process(raw_output, language) for raw_output in raw_outputs]
+        
+        chunksize = math.ceil(len(raw_outputs) / (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self,)
+        ) as pool:
+            return list(pool.map(_process_in_worker, raw_outputs, repeat(language), chunksize=chunksize))
+    
     def preprocess(self, raw_output: Any) -> str:
         """
         Preprocess raw output to clean string.
@@ -104,6 +192,44 @@ class BaseMode(ABC):
         
         return TextUtils.clean(str(raw_output))
     
+    def image_hints(self, image: Any) -> Optional[dict]:
+        """
+        Cheap pixel-level analysis run before generation.
+        
+        Args:
+            image: RGB PIL image as loaded for this mode
+            
+        Returns:
+            Hints passed to fast_path and cross_check, or None
+        """
+        return None
+    
+    def fast_path(self, hints: Optional[dict], language: str = "en") -> Optional[ModeResult]:
+        """
+        Answer from image hints alone, skipping generation.
+        
+        Args:
+            hints: Output of image_hints
+            language: Output language code ('en' or 'id')
+            
+        Returns:
+            ModeResult, or None to run the model
+        """
+        return None
+    
+    def cross_check(self, result: ModeResult, hints: Optional[dict]) -> ModeResult:
+        """
+        Reconcile a model result with image hints (may adjust confidence).
+        
+        Args:
+            result: Result from process
+            hints: Output of image_hints
+            
+        Returns:
+            The (possibly updated) result
+        """
+        return result
+    
     def calculate_confidence(self, text: str, patterns_matched: int = 0) -> float:
         """
         Calculate confidence score based on output quality.
@@ -150,9 +276,10 @@ class BaseMode(ABC):
         try:
             from ..services.translation import TranslationService
             translator = TranslationService()
-            return translator.translate(text, target=language)
+            with stage("translate"):
+                return translator.translate(text, target=language)
         except Exception:
             return text
     
     def __repr__(self) -> str:
-        return f"<{self.__class__.__name__}(name={self.name}, prompt={self.prompt})>"
+        return f"<{self.__class__.__name__}(name={self.name}, prompt={self.prompt}, image_size={self.image_size})>"
@@ -4,7 +4,11 @@ Provides intelligent Indonesian Rupiah and multi-currency detection.
 """
 
 import re
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+
 from .base import BaseMode, ModeResult
+from ..utils.keywords import KeywordMatcher
 from ..utils.text import TextUtils
 
 
@@ -16,13 +20,17 @@ class CurrencyMode(BaseMode):
     denomination database including colors and features.
     """
     
-    # Indonesian Rupiah denomination database
+    escalation_threshold = 0.75  # no denomination found
+    
+    # Indonesian Rupiah denomination database ("hsv" is the dominant
+    # color as hue degrees, saturation and value, for the color fast path)
     IDR_DENOMINATIONS = {
         "100000": {
             "color_en": "red/pink",
             "color_id": "merah/pink",
             "figure": "Soekarno-Hatta",
             "value_text": "Rp 100.000",
+            "hsv": (345, 0.45, 0.85),
             "keywords": ["100000", "100.000", "seratus ribu", "hundred thousand"]
         },
         "75000": {
@@ -30,6 +38,7 @@ class CurrencyMode(BaseMode):
             "color_id": "merah-putih",
             "figure": "Kemerdekaan",
             "value_text": "Rp 75.000",
+            "hsv": (355, 0.3, 0.85),
             "keywords": ["75000", "75.000", "tujuh puluh lima ribu"]
         },
         "50000": {
@@ -37,6 +46,7 @@ class CurrencyMode(BaseMode):
             "color_id": "biru",
             "figure": "I Gusti Ngurah Rai",
             "value_text": "Rp 50.000",
+            "hsv": (210, 0.45, 0.7),
             "keywords": ["50000", "50.000", "lima puluh ribu", "fifty thousand"]
         },
         "20000": {
@@ -44,6 +54,7 @@ class CurrencyMode(BaseMode):
             "color_id": "hijau",
             "figure": "Otto Iskandar Dinata",
             "value_text": "Rp 20.000",
+            "hsv": (135, 0.4, 0.65),
             "keywords": ["20000", "20.000", "dua puluh ribu", "twenty thousand"]
         },
         "10000": {
@@ -51,6 +62,7 @@ class CurrencyMode(BaseMode):
             "color_id": "ungu",
             "figure": "Frans Kaisiepo",
             "value_text": "Rp 10.000",
+            "hsv": (280, 0.3, 0.65),
             "keywords": ["10000", "10.000", "sepuluh ribu", "ten thousand"]
         },
         "5000": {
@@ -58,6 +70,7 @@ class CurrencyMode(BaseMode):
             "color_id": "coklat",
             "figure": "Idham Chalid",
             "value_text": "Rp 5.000",
+            "hsv": (30, 0.4, 0.55),
             "keywords": ["5000", "5.000", "lima ribu", "five thousand"]
         },
         "2000": {
@@ -65,6 +78,7 @@ class CurrencyMode(BaseMode):
             "color_id": "abu-abu",
             "figure": "M. Hoesni Thamrin",
             "value_text": "Rp 2.000",
+            "hsv": (0, 0.05, 0.6),
             "keywords": ["2000", "2.000", "dua ribu", "two thousand"]
         },
         "1000": {
@@ -72,10 +86,26 @@ class CurrencyMode(BaseMode):
             "color_id": "hijau muda",
             "figure": "Tjut Meutia",
             "value_text": "Rp 1.000",
+            "hsv": (95, 0.3, 0.75),
             "keywords": ["1000", "1.000", "seribu", "one thousand"]
         }
     }
     
+    _idr_matcher = KeywordMatcher({denom: info["keywords"] for denom, info in IDR_DENOMINATIONS.items()})
+    
+    # Read-only entry per denomination, built once. Results list only the
+    # denomination keys (the table's own strings); see denomination().
+    _IDR_ENTRIES = {
+        denom: MappingProxyType({
+            "denomination": denom,
+            "value_text": info["value_text"],
+            "color_en": info["color_en"],
+            "color_id": info["color_id"],
+            "figure": info["figure"]
+        })
+        for denom, info in IDR_DENOMINATIONS.items()
+    }
+    
     # Other currency patterns
     OTHER_CURRENCIES = {
         "USD": {"symbol": "$", "pattern": r'\$\s*[\d.,]+'},
@@ -83,6 +113,46 @@ class CurrencyMode(BaseMode):
         "GBP": {"symbol": "£", "pattern": r'£\s*[\d.,]+'},
     }
     
+    def __init__(
+        self,
+        color_classifier=None,
+        color_threshold: float = 0.85,
+        fast_path: bool = False
+    ):
+        """
+        Initialize the currency handler.
+        
+        Args:
+            color_classifier: BanknoteColorClassifier over IDR_DENOMINATIONS
+                (None disables the color fast path and cross-check)
+            color_threshold: Color similarity treated as certain: enough to
+                skip the model, or to doubt an OCR read that disagrees
+            fast_path: Answer from color alone when confident (only with
+                a calibrated classifier, see scripts/calibrate_currency.py)
+        """
+        self.color_classifier = color_classifier
+        self.color_threshold = color_threshold
+        self.fast_path_enabled = fast_path
+    
+    @classmethod
+    def color_references(cls) -> dict:
+        """Nominal HSV color per denomination, for BanknoteColorClassifier."""
+        return {denom: info["hsv"] for denom, info in cls.IDR_DENOMINATIONS.items()}
+    
+    @classmethod
+    def denomination(cls, denom: str) -> Mapping[str, str]:
+        """
+        Details of a denomination listed in a result's "idr_detected".
+        
+        Args:
+            denom: Denomination key, e.g. "50000"
+            
+        Returns:
+            Read-only mapping with denomination, value_text, color_en,
+            color_id and figure
+        """
+        return cls._IDR_ENTRIES[denom]
+    
     @property
     def name(self) -> str:
         return self.MODE_CURRENCY
@@ -103,6 +173,9 @@ class CurrencyMode(BaseMode):
         - Indonesian Rupiah denominations with colors
         - Other major currencies (USD, EUR, GBP)
         - Total value if multiple detected
+        
+        metadata["idr_detected"] lists denomination keys (e.g. "50000");
+        CurrencyMode.denomination() gives their colors and figures.
         """
         text = self.preprocess(raw_output)
         normalized_text = TextUtils.normalize_currency(text)
@@ -135,7 +208,7 @@ class CurrencyMode(BaseMode):
             confidence = min(1.0, confidence + 0.2)  # Boost for IDR detection
         
         # Calculate total value
-        total_idr = sum(int(d["denomination"]) for d in idr_detected)
+        total_idr = sum(int(denom) for denom in idr_detected)
         
         return ModeResult(
             text=output_text,
@@ -150,39 +223,77 @@ class CurrencyMode(BaseMode):
             suggestions=self._get_suggestions(idr_detected, language)
         )
     
+    def image_hints(self, image: Any) -> Optional[dict]:
+        """Classify the note by color (None without a classifier)."""
+        if self.color_classifier is None:
+            return None
+        return self.color_classifier.classify(image).to_dict()
+    
+    def fast_path(self, hints: Optional[dict], language: str = "en") -> Optional[ModeResult]:
+        """Answer from the denomination table when a calibrated color match is confident."""
+        if not self.fast_path_enabled or not self._color_certain(hints):
+            return None
+        
+        detected = [self._IDR_ENTRIES[hints["label"]]["denomination"]]
+        return ModeResult(
+            text=self._format_idr_output(detected, language),
+            confidence=hints["confidence"],
+            raw_output="",
+            metadata={
+                "idr_detected": detected,
+                "other_detected": [],
+                "total_idr": int(hints["label"]),
+                "count": 1,
+                "source": "color",
+                "color": hints
+            },
+            suggestions=self._get_suggestions(detected, language)
+        )
+    
+    def cross_check(self, result: ModeResult, hints: Optional[dict]) -> ModeResult:
+        """
+        Compare OCR denominations with the color match.
+        
+        Agreement raises confidence by 0.1; a confident color match that
+        OCR contradicts lowers it by 0.2, which can trigger escalation.
+        """
+        if not hints or hints["label"] is None:
+            return result
+        
+        read = result.metadata.get("idr_detected", [])
+        agrees = hints["label"] in read if read else None
+        if agrees:
+            result.confidence = min(1.0, result.confidence + 0.1)
+        elif agrees is False and self._color_certain(hints):
+            result.confidence = max(0.0, result.confidence - 0.2)
+        
+        result.metadata["color_check"] = {
+            "denomination": hints["label"],
+            "confidence": hints["confidence"],
+            "agrees": agrees
+        }
+        return result
+    
+    def _color_certain(self, hints: Optional[dict]) -> bool:
+        """Whether a color match is trustworthy without OCR: calibrated, a known note, above threshold."""
+        return bool(
+            hints
+            and hints.get("calibrated")
+            and hints["label"] in self.IDR_DENOMINATIONS
+            and hints["confidence"] >= self.color_threshold
+        )
+    
     def _detect_idr(self, normalized_text: str, original_text: str) -> list:
-        """Detect Indonesian Rupiah denominations."""
-        detected = []
-        text_lower = normalized_text.lower()
-        original_lower = original_text.lower()
-        
-        for denom, info in self.IDR_DENOMINATIONS.items():
-            for keyword in info["keywords"]:
-                if keyword in text_lower or keyword in original_lower:
-                    detected.append({
-                        "denomination": denom,
-                        "value_text": info["value_text"],
-                        "color_en": info["color_en"],
-                        "color_id": info["color_id"],
-                        "figure": info["figure"]
-                    })
-                    break
+        """Detect Indonesian Rupiah denominations (as denomination keys)."""
+        found = set(self._idr_matcher.find(normalized_text)) | set(self._idr_matcher.find(original_text))
+        detected = [denom for denom in self.IDR_DENOMINATIONS if denom in found]
         
         # Also check for explicit Rp patterns
         rp_pattern = r'[Rr]p\.?\s*([\d.,]+)'
         for match in re.finditer(rp_pattern, normalized_text):
             value = match.group(1).replace('.', '').replace(',', '')
-            if value in self.IDR_DENOMINATIONS:
-                info = self.IDR_DENOMINATIONS[value]
-                entry = {
-                    "denomination": value,
-                    "value_text": info["value_text"],
-                    "color_en": info["color_en"],
-                    "color_id": info["color_id"],
-                    "figure": info["figure"]
-                }
-                if entry not in detected:
-                    detected.append(entry)
+            if value in self.IDR_DENOMINATIONS and value not in detected:
+                detected.append(self._IDR_ENTRIES[value]["denomination"])
         
         return detected
     
@@ -205,7 +316,8 @@ class CurrencyMode(BaseMode):
         """Format output for IDR detection."""
         parts = []
         
-        for item in detected:
+        for denom in detected:
+            item = self._IDR_ENTRIES[denom]
             if language == "id":
                 color = item["color_id"]
                 parts.append(f"{item['value_text']} (warna {color})")
@@ -214,7 +326,7 @@ class CurrencyMode(BaseMode):
                 parts.append(f"{item['value_text']} ({color} color)")
         
         if len(detected) > 1:
-            total = sum(int(d["denomination"]) for d in detected)
+            total = sum(int(denom) for denom in detected)
             if language == "id":
                 return f"Terdeteksi: {', '.join(parts)}. Total: Rp {total:,}"
             else:
@@ -238,10 +350,10 @@ class CurrencyMode(BaseMode):
         if language == "id":
             suggestions = ["Periksa ciri-ciri keamanan uang"]
             if idr_detected:
-                suggestions.append(f"Warna utama: {idr_detected[0]['color_id']}")
+                suggestions.append(f"Warna utama: {self._IDR_ENTRIES[idr_detected[0]]['color_id']}")
         else:
             suggestions = ["Verify security features"]
             if idr_detected:
-                suggestions.append(f"Primary color: {idr_detected[0]['color_en']}")
+                suggestions.append(f"Primary color: {self._IDR_ENTRIES[idr_detected[0]]['color_en']}")
         
         return suggestions
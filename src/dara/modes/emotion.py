@@ -4,6 +4,7 @@ Provides emotion analysis from facial expressions.
 """
 
 from .base import BaseMode, ModeResult
+from ..utils.keywords import KeywordMatcher
 
 
 class EmotionMode(BaseMode):
@@ -17,22 +18,22 @@ class EmotionMode(BaseMode):
     # Emotion mappings with keywords and advice
     EMOTIONS = {
         "happy": {
-            "keywords": ["smile", "smiling", "happy", "laugh", "joy", "cheerful", "grinning"],
+            "keywords": ["smile", "smiles", "smiling", "happy", "laugh", "laughs", "laughing", "joy", "joyful", "cheerful", "grin", "grinning"],
             "advice_en": "They seem in good spirits!",
             "advice_id": "Mereka terlihat senang!"
         },
         "sad": {
-            "keywords": ["sad", "cry", "crying", "tear", "upset", "frown", "depressed", "down"],
+            "keywords": ["sad", "cry", "cries", "crying", "tear", "tears", "upset", "frown", "frowning", "depressed", "down"],
             "advice_en": "Offer comfort or support.",
             "advice_id": "Tawarkan dukungan atau hibur mereka."
         },
         "angry": {
-            "keywords": ["angry", "mad", "furious", "shout", "yelling", "aggressive", "frustrated"],
+            "keywords": ["angry", "mad", "furious", "shout", "shouting", "yell", "yelling", "aggressive", "frustrated"],
             "advice_en": "Give them space or ask calmly.",
             "advice_id": "Beri mereka ruang atau tanya dengan tenang."
         },
         "fearful": {
-            "keywords": ["fear", "scared", "afraid", "terror", "frightened", "anxious", "worried"],
+            "keywords": ["fear", "fearful", "scared", "afraid", "terror", "terrified", "frightened", "anxious", "worried"],
             "advice_en": "Reassure them that they are safe.",
             "advice_id": "Yakinkan mereka bahwa mereka aman."
         },
@@ -48,6 +49,8 @@ class EmotionMode(BaseMode):
         }
     }
     
+    _matcher = KeywordMatcher({emotion: data["keywords"] for emotion, data in EMOTIONS.items()})
+    
     @property
     def name(self) -> str:
         return self.MODE_EMOTION
@@ -68,10 +71,10 @@ class EmotionMode(BaseMode):
         and provides appropriate social guidance.
         """
         text = self.preprocess(raw_output)
-        text_lower = text.lower()
+        counts = self._matcher.counts(text)
         
         # Detect emotion and get advice
-        detected_emotion, confidence_boost = self._detect_emotion(text_lower)
+        detected_emotion, confidence_boost = self._detect_emotion(counts)
         emotion_data = self.EMOTIONS.get(detected_emotion, self.EMOTIONS["neutral"])
         
         # Format output
@@ -101,14 +104,14 @@ class EmotionMode(BaseMode):
             raw_output=raw_output,
             metadata={
                 "detected_emotion": detected_emotion,
-                "all_detected": self._get_all_emotions(text_lower)
+                "all_detected": self._get_all_emotions(counts)
             },
             suggestions=self._get_suggestions(detected_emotion, language)
         )
     
-    def _detect_emotion(self, text: str) -> tuple:
+    def _detect_emotion(self, counts: dict) -> tuple:
         """
-        Detect primary emotion from text.
+        Detect primary emotion from keyword counts.
         
         Returns:
             Tuple of (emotion_name, confidence_boost)
@@ -116,8 +119,8 @@ class EmotionMode(BaseMode):
         best_match = "neutral"
         max_matches = 0
         
-        for emotion, data in self.EMOTIONS.items():
-            matches = sum(1 for kw in data["keywords"] if kw in text)
+        for emotion in self.EMOTIONS:
+            matches = counts.get(emotion, 0)
             if matches > max_matches:
                 max_matches = matches
                 best_match = emotion
@@ -127,13 +130,9 @@ class EmotionMode(BaseMode):
         
         return best_match, confidence_boost
     
-    def _get_all_emotions(self, text: str) -> list:
+    def _get_all_emotions(self, counts: dict) -> list:
         """Get all detected emotions with counts."""
-        results = []
-        for emotion, data in self.EMOTIONS.items():
-            matches = sum(1 for kw in data["keywords"] if kw in text)
-            if matches > 0:
-                results.append({"emotion": emotion, "strength": matches})
+        results = [{"emotion": emotion, "strength": matches} for emotion, matches in counts.items()]
         return sorted(results, key=lambda x: x["strength"], reverse=True)
     
     def _get_suggestions(self, emotion: str, language: str) -> list:
@@ -4,9 +4,182 @@ Provides intelligent medicine label and dosage reading.
 """
 
 import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
 from .base import BaseMode, ModeResult
+from ..utils.keywords import KeywordMatcher
 from ..utils.text import TextUtils
 
+# Dosage units, longest first so "mcg" is not read as "m" + "cg"
+DOSAGE_UNITS = ["mg", "ml", "g", "mcg", "IU", "unit", "tablet", "capsule", "cap", "tab"]
+_UNITS = "|".join(sorted(DOSAGE_UNITS, key=len, reverse=True))
+
+# Milligrams per unit, for units with a fixed mass
+_MG_PER_UNIT = {"mg": 1.0, "g": 1000.0, "mcg": 0.001}
+
+# Canonical names for Indonesian and abbreviated terms
+_UNIT_NAMES = {"cap": "capsule", "tab": "tablet", "kapsul": "capsule", "kali": "time", "iu": "IU"}
+_MEAL_RELATIONS = {"sebelum": "before", "sesudah": "after", "bersama": "with"}
+
+# "1.500" on Indonesian labels is fifteen hundred; "0.125" stays a decimal
+_THOUSANDS = re.compile(r"[1-9]\d{0,2}(?:\.\d{3})+")
+
+_EXPIRY_LABEL = r"\b(?:exp(?:iry)?|ed|best\s+before)\b[:.\s]*"
+
+# One alternation, scanned once per label. At a given position the
+# first alternative that matches wins, so labelled expiry dates are
+# tried before bare MM/YYYY and dosages. The leading lookahead lists
+# every alternative's first character, so other positions are skipped
+# without trying each alternative.
+_LABEL_PATTERN = re.compile(
+    r"(?=[\dabemstw])(?:" + "|".join([
+        # take 2 tablets daily
+        r"(?P<freq_en>take\s+(?P<freq_en_dose>(?P<freq_en_count>\d+)\s+(?P<freq_en_unit>time|tablet|capsule|cap|tab)s?)"
+        r"(?:\s*(?P<freq_en_per>a\s+day|daily|per\s+day))?)",
+        # minum 3 kali sehari
+        r"(?P<freq_id>minum\s+(?P<freq_id_dose>(?P<freq_id_count>\d+)\s+(?P<freq_id_unit>kali|tablet|kapsul))"
+        r"(?:\s*(?P<freq_id_per>sehari))?)",
+        # after meals / sesudah makan
+        r"(?P<meal>(?P<meal_en>before|after|with)\s+(?:meal|food|breakfast|lunch|dinner)s?"
+        r"|(?P<meal_id>sebelum|sesudah|bersama)\s+makan)",
+        # every 8 hours / setiap 8 jam
+        r"(?P<interval>(?:every\s+(?P<interval_en>\d+)\s+hours?)|(?:setiap\s+(?P<interval_id>\d+)\s+jam))",
+        # EXP: 12/05/2026, EXP May 2026
+        _EXPIRY_LABEL + r"(?P<expiry_date>\d{1,2}[/-]\d{1,2}[/-]\d{2,4})",
+        _EXPIRY_LABEL + r"(?P<expiry_month>[^\W\d_]+\s+\d{4})",
+        # 500mg, 2,5 ml
+        r"(?<![\d.,])(?P<dose>(?P<dose_value>\d+(?:[.,]\d+)?)\s*(?P<dose_unit>" + _UNITS + r")s?)(?![^\W\d_])",
+        # 12/2026
+        r"(?<!\d)(?P<expiry_bare>\d{2}/\d{4})(?!\d)",
+    ]) + ")",
+    re.IGNORECASE
+)
+
+# Instruction kinds, most specific first (the spoken instruction is the best one found)
+_INSTRUCTION_PRIORITY = ("freq_en", "freq_id", "meal_en", "meal_id", "interval_en", "interval_id")
+_EXPIRY_PRIORITY = ("expiry_date", "expiry_month", "expiry_bare")
+
+
+@dataclass
+class Dosage:
+    """
+    One dosage found on a label.
+    
+    Attributes:
+        text: Text as printed (e.g. "500mg")
+        value: Numeric amount
+        unit: Canonical unit ("mg", "ml", "tablet", ...)
+        mg: Amount in milligrams, None for units without a fixed mass
+    """
+    text: str
+    value: float
+    unit: str
+    mg: Optional[float] = None
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary."""
+        return {"text": self.text, "value": self.value, "unit": self.unit, "mg": self.mg}
+
+
+@dataclass
+class LabelInfo:
+    """
+    Structured fields extracted from a medicine label.
+    
+    Attributes:
+        dosages: Distinct dosages in reading order (at most 5)
+        frequency: {"text", "count", "unit", "daily"} for "take 2 tablets daily"
+        meal_timing: {"text", "relation"} with relation "before", "after" or "with"
+        interval_hours: Hours between doses ("every 8 hours")
+        instructions: Most specific instruction text found
+        expiry: Expiry date text
+    """
+    dosages: List[Dosage] = field(default_factory=list)
+    frequency: Optional[dict] = None
+    meal_timing: Optional[dict] = None
+    interval_hours: Optional[int] = None
+    instructions: str = ""
+    expiry: str = ""
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary."""
+        return {
+            "dosages": [dosage.to_dict() for dosage in self.dosages],
+            "frequency": self.frequency,
+            "meal_timing": self.meal_timing,
+            "interval_hours": self.interval_hours,
+            "instructions": self.instructions,
+            "expiry": self.expiry
+        }
+
+
+def _dosage(text: str, value: str, unit: str) -> Dosage:
+    unit = _UNIT_NAMES.get(unit.lower(), unit.lower())
+    if _THOUSANDS.fullmatch(value):
+        value = value.replace(".", "")
+    amount = float(value.replace(",", "."))
+    mg = amount * _MG_PER_UNIT[unit] if unit in _MG_PER_UNIT else None
+    return Dosage(text=text.strip(), value=amount, unit=unit, mg=mg)
+
+
+def extract_label(text: str, max_dosages: int = 5) -> LabelInfo:
+    """
+    Extract dosages, frequency, meal timing, interval and expiry in one scan.
+    
+    Args:
+        text: Cleaned OCR text
+        max_dosages: Maximum distinct dosages to keep
+        
+    Returns:
+        LabelInfo with every field found
+    """
+    info = LabelInfo()
+    dosages = {}
+    instructions = {}
+    expiry = {}
+    
+    for match in _LABEL_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if kind == "dose":
+            dosage = _dosage(match.group("dose"), match.group("dose_value"), match.group("dose_unit"))
+            dosages.setdefault(dosage.text.lower(), dosage)
+        elif kind in ("freq_en", "freq_id"):
+            count, unit = match.group(f"{kind}_count"), match.group(f"{kind}_unit")
+            if info.frequency is None:
+                info.frequency = {
+                    "text": match.group(kind).strip(),
+                    "count": int(count),
+                    "unit": _UNIT_NAMES.get(unit.lower(), unit.lower()),
+                    "daily": match.group(f"{kind}_per") is not None,
+                }
+            # "take 1 tablet" also states a dosage
+            if unit.lower() in ("tablet", "capsule", "cap", "tab"):
+                dosage = _dosage(match.group(f"{kind}_dose"), count, unit)
+                dosages.setdefault(dosage.text.lower(), dosage)
+            instructions.setdefault(kind, match.group(kind).strip())
+        elif kind == "meal":
+            language = "meal_en" if match.group("meal_en") else "meal_id"
+            relation = match.group(language)
+            if info.meal_timing is None:
+                info.meal_timing = {
+                    "text": match.group("meal").strip(),
+                    "relation": _MEAL_RELATIONS.get(relation.lower(), relation.lower()),
+                }
+            instructions.setdefault(language, match.group(kind).strip())
+        elif kind == "interval":
+            language = "interval_en" if match.group("interval_en") else "interval_id"
+            if info.interval_hours is None:
+                info.interval_hours = int(match.group(language))
+            instructions.setdefault(language, match.group(kind).strip())
+        elif kind in _EXPIRY_PRIORITY:
+            expiry.setdefault(kind, match.group(kind).strip())
+    
+    info.dosages = list(dosages.values())[:max_dosages]
+    info.instructions = next((instructions[k] for k in _INSTRUCTION_PRIORITY if k in instructions), "")
+    info.expiry = next((expiry[k] for k in _EXPIRY_PRIORITY if k in expiry), "")
+    return info
+
 
 class MedicineMode(BaseMode):
     """
@@ -16,15 +189,21 @@ class MedicineMode(BaseMode):
     and provides safety reminders.
     """
     
+    supports_tiling = True
+    escalation_threshold = 0.75  # no dosage, instructions or expiry found
+    
     # Common medicine keywords
     MEDICINE_KEYWORDS = [
-        "tablet", "capsule", "syrup", "drops", "cream", "ointment",
-        "injection", "inhaler", "patch", "suspension", "solution",
+        "tablet", "tablets", "capsule", "capsules", "syrup", "drops",
+        "cream", "ointment", "injection", "inhaler", "patch",
+        "suspension", "solution",
         "obat", "tablet", "kapsul", "sirup", "tetes", "krim", "salep"
     ]
     
-    # Dosage units
-    DOSAGE_UNITS = ["mg", "ml", "g", "mcg", "IU", "unit", "tablet", "capsule", "cap", "tab"]
+    _medicine_matcher = KeywordMatcher({"medicine": MEDICINE_KEYWORDS})
+    
+    # Dosage units (the extraction pattern is compiled from the module list)
+    DOSAGE_UNITS = DOSAGE_UNITS
     
     @property
     def name(self) -> str:
@@ -51,9 +230,10 @@ class MedicineMode(BaseMode):
         text = self.preprocess(raw_output)
         
         # Extract structured information
-        dosages = self._extract_dosages(text)
-        instructions = self._extract_instructions(text)
-        expiry = self._extract_expiry(text)
+        label = extract_label(text)
+        dosages = [dosage.text for dosage in label.dosages]
+        instructions = label.instructions
+        expiry = label.expiry
         
         # Build output
         output_parts = []
@@ -94,73 +274,16 @@ class MedicineMode(BaseMode):
                 "dosages": dosages,
                 "instructions": instructions,
                 "expiry": expiry,
-                "is_medicine": self._is_likely_medicine(text)
+                "is_medicine": self._is_likely_medicine(text, label),
+                "label": label.to_dict()
             },
             suggestions=suggestions
         )
     
-    def _extract_dosages(self, text: str) -> list:
-        """Extract dosage patterns from text."""
-        # Pattern: number followed by unit
-        pattern = r'(\d+(?:[.,]\d+)?\s*(?:' + '|'.join(self.DOSAGE_UNITS) + r')s?)'
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        
-        # Clean and deduplicate
-        cleaned = []
-        seen = set()
-        for match in matches:
-            normalized = match.strip().lower()
-            if normalized not in seen:
-                seen.add(normalized)
-                cleaned.append(match.strip())
-        
-        return cleaned[:5]  # Limit to 5 dosages
-    
-    def _extract_instructions(self, text: str) -> str:
-        """Extract usage instructions."""
-        instruction_patterns = [
-            r'(take\s+\d+\s+(?:time|tablet|capsule|cap|tab)s?\s*(?:a\s+day|daily|per\s+day)?)',
-            r'(minum\s+\d+\s+(?:kali|tablet|kapsul)\s*(?:sehari)?)',
-            r'((?:before|after|with)\s+(?:meal|food|breakfast|lunch|dinner)s?)',
-            r'((?:sebelum|sesudah|bersama)\s+makan)',
-            r'(every\s+\d+\s+hours?)',
-            r'(setiap\s+\d+\s+jam)'
-        ]
-        
-        for pattern in instruction_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
-        
-        return ""
-    
-    def _extract_expiry(self, text: str) -> str:
-        """Extract expiry date."""
-        # Common expiry patterns
-        patterns = [
-            r'(?:exp(?:iry)?|ed|best\s+before)[:\s]*(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-            r'(?:exp(?:iry)?|ed|best\s+before)[:\s]*(\w+\s+\d{4})',
-            r'(\d{2}/\d{4})'  # MM/YYYY format
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
-        
-        return ""
-    
-    def _is_likely_medicine(self, text: str) -> bool:
+    def _is_likely_medicine(self, text: str, label: LabelInfo) -> bool:
         """Check if text is likely from medicine packaging."""
-        text_lower = text.lower()
-        
-        # Check for medicine keywords
-        keyword_count = sum(1 for kw in self.MEDICINE_KEYWORDS if kw in text_lower)
-        
-        # Check for dosage patterns
-        has_dosage = bool(self._extract_dosages(text))
-        
-        return keyword_count >= 1 or has_dosage
+        # Check for medicine keywords, then dosage patterns
+        return self._medicine_matcher.search(text) or bool(label.dosages)
     
     def _get_safety_suggestions(self, language: str) -> list:
         """Get medicine safety suggestions."""
@@ -0,0 +1,110 @@
+"""
+DARA Modes - Automatic Mode Router
+Picks the most likely mode from one cheap caption pass.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from ..utils.keywords import KeywordMatcher
+from ..utils.text import TextUtils
+from .base import BaseMode
+
+
+@dataclass
+class RouteDecision:
+    """
+    Router output.
+    
+    Attributes:
+        mode: Selected mode name
+        scores: Keyword score per candidate mode
+        caption: Caption the decision was based on
+    """
+    mode: str
+    scores: Dict[str, float] = field(default_factory=dict)
+    caption: str = ""
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary."""
+        return {
+            "mode": self.mode,
+            "scores": self.scores,
+            "caption": self.caption
+        }
+
+
+class ModeRouter:
+    """
+    Routes an image to one mode from a short ``<CAPTION>``.
+    
+    The caption pass runs at a small input size, so it costs a fraction
+    of a full mode. Florence-2 captions name the salient object ("a
+    person holding a 50000 rupiah bill", "a box of paracetamol
+    tablets"), which keyword cues map to a mode. Scene is the fallback
+    when nothing more specific is found.
+    """
+    
+    # Florence-2 task prompt for the routing pass (same as emotion mode)
+    prompt = "<CAPTION>"
+    
+    # Fallback when no cue matches
+    DEFAULT_MODE = BaseMode.MODE_SCENE
+    
+    # Cue words per mode with weights; ties go to the earlier mode
+    CUES: Dict[str, Dict[str, float]] = {
+        BaseMode.MODE_CURRENCY: {
+            "money": 2, "banknote": 3, "bill": 2, "bills": 2, "cash": 2,
+            "currency": 3, "rupiah": 3, "dollar": 2, "dollars": 2,
+            "note": 1, "notes": 1, "coin": 2, "coins": 2, "wallet": 1,
+        },
+        BaseMode.MODE_MEDICINE: {
+            "medicine": 3, "medication": 3, "pill": 3, "pills": 3,
+            "tablet": 2, "tablets": 2, "capsule": 3, "capsules": 3,
+            "blister": 3, "drug": 2, "drugs": 2, "prescription": 3,
+            "syrup": 2, "vitamin": 2, "vitamins": 2, "pharmacy": 2,
+        },
+        BaseMode.MODE_TEXT: {
+            "text": 3, "document": 3, "paper": 2, "page": 2, "book": 2,
+            "receipt": 3, "letter": 2, "menu": 2, "sign": 2, "poster": 2,
+            "newspaper": 3, "writing": 2, "words": 2, "screen": 1,
+            "label": 1, "card": 1,
+        },
+        BaseMode.MODE_EMOTION: {
+            "face": 3, "portrait": 3, "selfie": 3, "smiling": 2,
+            "smile": 2, "crying": 2, "frowning": 2, "laughing": 2,
+            "expression": 2, "close up of a man": 2, "close up of a woman": 2,
+            "close up of a person": 2,
+        },
+    }
+    
+    _matcher = KeywordMatcher(CUES)
+    
+    @property
+    def modes(self) -> List[str]:
+        """Modes the router can select."""
+        return list(self.CUES) + [self.DEFAULT_MODE]
+    
+    def route(self, caption: str) -> RouteDecision:
+        """
+        Pick a mode for a caption.
+        
+        Args:
+            caption: Raw ``<CAPTION>`` output
+            
+        Returns:
+            RouteDecision with the chosen mode and per-mode scores
+        """
+        text = TextUtils.clean(caption).lower()
+        found = self._matcher.find(text)
+        scores = {
+            mode: float(sum(cues[cue] for cue in found.get(mode, [])))
+            for mode, cues in self.CUES.items()
+        }
+        
+        best = max(scores, key=lambda mode: scores[mode])
+        mode = best if scores[best] > 0 else self.DEFAULT_MODE
+        return RouteDecision(mode=mode, scores=scores, caption=text)
+    
+    def __repr__(self) -> str:
+        return f"<ModeRouter(prompt={self.prompt}, modes={self.modes})>"
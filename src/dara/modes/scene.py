@@ -4,6 +4,7 @@ Provides detailed scene description with contextual understanding.
 """
 
 from .base import BaseMode, ModeResult
+from ..utils.keywords import KeywordMatcher
 
 
 class SceneMode(BaseMode):
@@ -14,6 +15,39 @@ class SceneMode(BaseMode):
     spatial relationships, and potential hazards.
     """
     
+    # Whole words only, so plural forms are listed ("air" must not match "chair")
+    HAZARD_KEYWORDS = [
+        "stairs", "staircase", "step", "steps", "fire", "flame", "flames",
+        "stove", "water", "pool", "edge", "cliff", "hole", "holes", "wet",
+        "slippery", "sharp", "hot",
+        "tangga", "api", "air", "tepi", "basah", "licin", "tajam", "panas"
+    ]
+    
+    NAVIGATION_HINTS = {
+        "door": "Door detected",
+        "exit": "Exit sign visible",
+        "left": "Object on the left",
+        "right": "Object on the right",
+        "table": "Table nearby",
+        "chair": "Chair in scene",
+        "pintu": "Pintu terdeteksi",
+        "kiri": "Objek di kiri",
+        "kanan": "Objek di kanan"
+    }
+    
+    PEOPLE_KEYWORDS = [
+        "person", "people", "man", "men", "woman", "women", "child",
+        "children", "boy", "girl", "group",
+        "orang", "pria", "wanita", "anak", "kelompok"
+    ]
+    
+    # One pass over the caption finds all three keyword sets
+    _matcher = KeywordMatcher({
+        "hazard": HAZARD_KEYWORDS,
+        "navigation": NAVIGATION_HINTS,
+        "people": PEOPLE_KEYWORDS,
+    })
+    
     @property
     def name(self) -> str:
         return self.MODE_SCENE
@@ -36,9 +70,10 @@ class SceneMode(BaseMode):
         - Navigation suggestions
         """
         text = self.preprocess(raw_output)
+        found = self._matcher.find(text)
         
         # Analyze for safety concerns
-        hazards = self._detect_hazards(text)
+        hazards = self._detect_hazards(found)
         suggestions = []
         
         if hazards:
@@ -47,7 +82,7 @@ class SceneMode(BaseMode):
             ])
         
         # Add navigation context
-        nav_hints = self._extract_navigation(text)
+        nav_hints = self._extract_navigation(found)
         suggestions.extend(nav_hints)
         
         # Translate if needed
@@ -62,56 +97,20 @@ class SceneMode(BaseMode):
             raw_output=raw_output,
             metadata={
                 "hazards_detected": hazards,
-                "has_people": self._has_people(raw_output)
+                "has_people": self._has_people(found)
             },
             suggestions=suggestions
         )
     
-    def _detect_hazards(self, text: str) -> list:
+    def _detect_hazards(self, found: dict) -> list:
         """Detect potential hazards mentioned in scene."""
-        hazard_keywords = [
-            "stairs", "step", "fire", "flame", "stove", "water", "pool",
-            "edge", "cliff", "hole", "wet", "slippery", "sharp", "hot",
-            "tangga", "api", "air", "tepi", "basah", "licin", "tajam", "panas"
-        ]
-        
-        text_lower = text.lower()
-        found = []
-        
-        for keyword in hazard_keywords:
-            if keyword in text_lower:
-                found.append(keyword)
-        
-        return found[:3]  # Limit to top 3
+        return found.get("hazard", [])[:3]  # Limit to top 3
     
-    def _extract_navigation(self, text: str) -> list:
+    def _extract_navigation(self, found: dict) -> list:
         """Extract navigation-relevant hints."""
-        nav_keywords = {
-            "door": "Door detected",
-            "exit": "Exit sign visible",
-            "left": "Object on the left",
-            "right": "Object on the right",
-            "table": "Table nearby",
-            "chair": "Chair in scene",
-            "pintu": "Pintu terdeteksi",
-            "kiri": "Objek di kiri",
-            "kanan": "Objek di kanan"
-        }
-        
-        text_lower = text.lower()
-        hints = []
-        
-        for keyword, hint in nav_keywords.items():
-            if keyword in text_lower:
-                hints.append(hint)
-        
+        hints = [self.NAVIGATION_HINTS[keyword] for keyword in found.get("navigation", [])]
         return hints[:3]  # Limit hints
     
-    def _has_people(self, text: str) -> bool:
+    def _has_people(self, found: dict) -> bool:
         """Check if people are mentioned in scene."""
-        people_keywords = [
-            "person", "people", "man", "woman", "child", "group",
-            "orang", "pria", "wanita", "anak", "kelompok"
-        ]
-        text_lower = text.lower()
-        return any(kw in text_lower for kw in people_keywords)
+        return "people" in found
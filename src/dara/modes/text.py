@@ -3,7 +3,10 @@ DARA Modes - Text Extraction Handler
 Provides OCR text extraction and formatting.
 """
 
+import re
+
 from .base import BaseMode, ModeResult
+from ..utils.keywords import KeywordMatcher
 from ..utils.text import TextUtils
 
 
@@ -15,6 +18,21 @@ class TextMode(BaseMode):
     signs, documents, and printed materials.
     """
     
+    supports_tiling = True
+    supports_regions = True
+    escalation_threshold = 0.6  # short or gibberish-looking OCR
+    
+    # Text type cues, checked in this order
+    _type_matcher = KeywordMatcher({
+        "sign": ["exit", "entrance", "warning", "danger", "keluar", "masuk", "awas", "bahaya"],
+        "address": ["jalan", "jl", "street", "no.", "blok", "lantai"],
+        "contact": ["telepon", "phone", "email", "@"],
+        "menu_price": ["rp", "harga", "price", "menu", "$", "€"],
+    })
+    
+    # Indonesian phone numbers (08xx or +62), which keywords cannot express
+    _PHONE = re.compile(r"(?:\+62|(?<!\d)08)\d[\d -]{5,}")
+    
     @property
     def name(self) -> str:
         return self.MODE_TEXT
@@ -27,6 +45,18 @@ class TextMode(BaseMode):
     def description(self) -> str:
         return "Extracts and reads text from images"
     
+    def preprocess(self, raw_output) -> str:
+        """
+        Clean raw output, keeping line breaks.
+        
+        Region OCR returns one line per text line in reading order;
+        _format_for_speech turns those breaks into spoken pauses.
+        """
+        if isinstance(raw_output, str) and "\n" in raw_output:
+            lines = (TextUtils.clean(line) for line in raw_output.splitlines())
+            return "\n".join(line for line in lines if line)
+        return super().preprocess(raw_output)
+    
     def process(self, raw_output: str, language: str = "en") -> ModeResult:
         """
         Process OCR text extraction output.
@@ -107,7 +137,8 @@ class TextMode(BaseMode):
             confidence += 0.1
         
         # Penalize gibberish-looking text
-        alpha_ratio = sum(1 for c in text if c.isalnum()) / max(len(text), 1)
+        alnum = len(text) - text.count(' ') - TextUtils.count_special(text)
+        alpha_ratio = alnum / max(len(text), 1)
         if alpha_ratio < 0.5:
             confidence -= 0.2
         
@@ -115,23 +146,14 @@ class TextMode(BaseMode):
     
     def _detect_text_type(self, text: str) -> str:
         """Detect the type of text content."""
-        text_lower = text.lower()
-        
-        # Check for sign patterns
-        if any(word in text_lower for word in ['exit', 'entrance', 'warning', 'danger', 'keluar', 'masuk', 'awas', 'bahaya']):
-            return "sign"
-        
-        # Check for address patterns
-        if any(word in text_lower for word in ['jalan', 'jl', 'street', 'no.', 'blok', 'lantai']):
-            return "address"
-        
-        # Check for phone/contact
-        if any(pattern in text for pattern in ['08', '+62', 'telepon', 'phone', 'email', '@']):
-            return "contact"
-        
-        # Check for menu/price
-        if any(word in text_lower for word in ['rp', 'harga', 'price', 'menu', '$', '€']):
-            return "menu_price"
+        found = self._type_matcher.find(text)
+        if self._PHONE.search(text):
+            found["contact"] = ["phone"]
+        
+        # First type in sign, address, contact, menu_price order
+        for text_type in self._type_matcher.categories:
+            if text_type in found:
+                return text_type
         
         return "general"
     
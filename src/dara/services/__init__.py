@@ -2,5 +2,12 @@
 from .tts import TTSService
 from .translation import TranslationService
 from .cache import InferenceCache
+from .metrics import MetricsRegistry, DARAMetrics, start_http_server
+from .tracing import Tracer, JSONLExporter, OpenTelemetryExporter, tail_breakdown
+from . import serialization
 
-__all__ = ["TTSService", "TranslationService", "InferenceCache"]
+__all__ = [
+    "TTSService", "TranslationService", "InferenceCache",
+    "MetricsRegistry", "DARAMetrics", "start_http_server",
+    "Tracer", "JSONLExporter", "OpenTelemetryExporter", "tail_breakdown", "serialization"
+]
@@ -1,27 +1,53 @@
 """
 DARA Services - Inference Cache
-Provides LRU caching for model inference results to speed up repeated queries.
+Provides size-bounded caching for model inference results to speed up repeated queries.
 """
 
-from typing import Optional, Any
+from typing import Optional, Any, List, Tuple
 from collections import OrderedDict
-from dataclasses import dataclass
 from pathlib import Path
 import hashlib
+import heapq
+import itertools
 import json
+import sys
+import threading
 import time
 
 from ..utils.logging import get_logger
+from . import serialization
 
 logger = get_logger("cache")
 
+# Eviction policies
+POLICIES = ("lru", "gdsf")
+
+# Why entries leave the cache: entry limit, byte limit, TTL
+EVICTION_REASONS = ("capacity", "bytes", "expired")
+
+# Per-entry bookkeeping (key, CacheEntry, OrderedDict link) added to value sizes
+ENTRY_OVERHEAD = 200
+
 
-@dataclass
 class CacheEntry:
     """Single cache entry with metadata."""
-    value: Any
-    timestamp: float
-    hits: int = 0
+    __slots__ = ("value", "timestamp", "hits", "size", "cost", "priority")
+    
+    def __init__(
+        self,
+        value: Any,
+        timestamp: float,
+        hits: int = 0,
+        size: int = 0,
+        cost: float = 1.0,
+        priority: float = 0.0
+    ):
+        self.value = value
+        self.timestamp = timestamp
+        self.hits = hits
+        self.size = size
+        self.cost = cost
+        self.priority = priority
     
     def touch(self) -> None:
         """Update access metadata."""
@@ -29,21 +55,67 @@ class CacheEntry:
         self.timestamp = time.time()
 
 
+def estimate_size(value: Any) -> int:
+    """
+    Approximate deep size of a value in bytes.
+    
+    Follows dict, list, tuple and set contents and instance __dict__s;
+    objects reachable twice are counted once.
+    
+    Args:
+        value: Object to measure
+        
+    Returns:
+        Size estimate in bytes
+    """
+    size = 0
+    seen = set()
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(obj, "__dict__"):
+            stack.append(vars(obj))
+    return size
+
+
 class InferenceCache:
     """
-    LRU cache for model inference results.
+    Size-bounded cache for model inference results.
     
     Features:
-    - In-memory LRU eviction
-    - Optional disk persistence
-    - Cache statistics
+    - Bounded by entry count and optionally by bytes (per-entry size estimates)
+    - LRU or GDSF eviction
+    - TTL expiry, checked on access and by an amortized sweep
+    - Optional compact storage (values held as binary payloads)
+    - Optional disk persistence (binary; legacy JSON files still load)
+    - Cache statistics, including bytes held and eviction reasons
+    - Thread-safe: detect_async workers share one cache
+    
+    GDSF (Greedy-Dual-Size-Frequency) keeps the entries with the highest
+    ``L + hits * cost / size``, where L rises to the priority of each
+    evicted entry so long-idle entries age out. Small, popular and
+    expensive results (pass the inference time as ``cost``) stay; one-off
+    large OCR results go first.
     """
     
     def __init__(
         self,
         maxsize: int = 100,
         persist_path: Optional[str] = None,
-        ttl_seconds: Optional[int] = None
+        ttl_seconds: Optional[float] = None,
+        compact: bool = False,
+        max_bytes: Optional[int] = None,
+        policy: str = "lru",
+        sweep_interval: Optional[float] = None
     ):
         """
         Initialize the cache.
@@ -51,14 +123,40 @@ class InferenceCache:
         Args:
             maxsize: Maximum number of entries
             persist_path: Optional path for disk persistence
-            ttl_seconds: Optional time-to-live for entries
+            ttl_seconds: Optional time-to-live for entries (since last access)
+            compact: Store values encoded with services.serialization.
+                Uses a fraction of the memory of nested dicts, and every
+                get returns a fresh copy; tuples come back as lists.
+            max_bytes: Optional bound on the estimated bytes held
+            policy: Eviction policy ("lru" or "gdsf")
+            sweep_interval: Seconds between expiry sweeps, run during
+                get/set (defaults to ttl_seconds)
         """
+        if policy not in POLICIES:
+            available = ", ".join(POLICIES)
+            raise ValueError(f"Invalid cache policy '{policy}'. Available: {available}")
+        
         self.maxsize = maxsize
         self.ttl_seconds = ttl_seconds
         self.persist_path = Path(persist_path) if persist_path else None
+        self.compact = compact
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.sweep_interval = sweep_interval if sweep_interval is not None else ttl_seconds
         
         self._cache: OrderedDict[str, CacheEntry] = OrderedDict()
-        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._stats = {"hits": 0, "misses": 0, "rejected": 0}
+        self._evictions = {reason: 0 for reason in EVICTION_REASONS}
+        self._bytes = 0
+        self._last_sweep = time.time()
+        
+        # Guards the entries, byte count, stats and GDSF heap
+        self._lock = threading.Lock()
+        
+        # GDSF: lazy min-heap of (priority, seq, key) and the aging value L
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._inflation = 0.0
         
         if self.persist_path and self.persist_path.exists():
             self._load_from_disk()
@@ -82,27 +180,31 @@ class InferenceCache:
         """
         key = self._make_key(image_hash, prompt, **kwargs)
         
-        if key not in self._cache:
-            self._stats["misses"] += 1
-            return None
-        
-        entry = self._cache[key]
-        
-        # Check TTL
-        if self.ttl_seconds and (time.time() - entry.timestamp) > self.ttl_seconds:
-            del self._cache[key]
-            self._stats["misses"] += 1
-            return None
-        
-        # Move to end (most recently used)
-        self._cache.move_to_end(key)
-        entry.touch()
-        self._stats["hits"] += 1
+        with self._lock:
+            self._maybe_sweep()
+            entry = self._cache.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            
+            # Check TTL
+            if self._expired(entry, time.time()):
+                self._remove(key, "expired")
+                self._stats["misses"] += 1
+                return None
+            
+            # Move to end (most recently used)
+            self._cache.move_to_end(key)
+            entry.touch()
+            if self.policy == "gdsf":
+                self._prioritize(key, entry)
+            self._stats["hits"] += 1
+            value, hits = entry.value, entry.hits
         
-        logger.debug(f"Cache hit for key {key[:8]}... (hits: {entry.hits})")
-        return entry.value
+        logger.debug("Cache hit for key %.8s... (hits: %s)", key, hits)
+        return serialization.loads(value) if self.compact else value
     
-    def set(self, image_hash: str, prompt: str, result: Any, **kwargs) -> None:
+    def set(self, image_hash: str, prompt: str, result: Any, cost: float = 1.0, **kwargs) -> None:
         """
         Store result in cache.
         
@@ -110,26 +212,120 @@ class InferenceCache:
             image_hash: Hash of input image
             prompt: Model prompt used
             result: Result to cache
+            cost: Cost of recomputing the result, e.g. inference
+                milliseconds (used by the "gdsf" policy)
             **kwargs: Additional parameters
         """
         key = self._make_key(image_hash, prompt, **kwargs)
+        value = serialization.dumps(result) if self.compact else result
+        size = self._entry_size(value)
+        with self._lock:
+            self._maybe_sweep()
+            self._store(key, value, time.time(), cost, size)
+    
+    def _store(self, key: str, value: Any, timestamp: float, cost: float, size: int) -> None:
+        """Insert an entry, evicting others to stay within both bounds (lock held)."""
+        if key in self._cache:
+            self._remove(key)
+        
+        if self.max_bytes is not None and size > self.max_bytes:
+            self._stats["rejected"] += 1
+            logger.debug("Not caching %.8s...: %s bytes exceeds max_bytes", key, size)
+            return
+        
+        while self._cache and len(self._cache) >= self.maxsize:
+            self._evict("capacity")
+        while self._cache and self.max_bytes is not None and self._bytes + size > self.max_bytes:
+            self._evict("bytes")
+        
+        entry = CacheEntry(value=value, timestamp=timestamp, size=size, cost=cost)
+        self._cache[key] = entry
+        self._bytes += size
+        if self.policy == "gdsf":
+            self._prioritize(key, entry)
+        
+        logger.debug("Cached result for key %.8s... (%s bytes)", key, size)
+    
+    def _entry_size(self, value: Any) -> int:
+        """Estimated bytes an entry holds, bookkeeping included."""
+        if self.compact:
+            return sys.getsizeof(value) + ENTRY_OVERHEAD
+        return estimate_size(value) + ENTRY_OVERHEAD
+    
+    def _expired(self, entry: CacheEntry, now: float) -> bool:
+        return bool(self.ttl_seconds) and (now - entry.timestamp) > self.ttl_seconds
+    
+    def _prioritize(self, key: str, entry: CacheEntry) -> None:
+        """Recompute an entry's GDSF priority and queue it."""
+        entry.priority = self._inflation + (entry.hits + 1) * entry.cost / entry.size
+        heapq.heappush(self._heap, (entry.priority, next(self._seq), key))
+        
+        # Drop stale heap items once they outnumber live entries
+        if len(self._heap) > 2 * len(self._cache) + 64:
+            self._heap = [(e.priority, next(self._seq), k) for k, e in self._cache.items()]
+            heapq.heapify(self._heap)
+    
+    def _victim(self) -> str:
+        """Key of the next entry to evict."""
+        if self.policy == "lru":
+            return next(iter(self._cache))
         
-        # Evict if at capacity
-        while len(self._cache) >= self.maxsize:
-            evicted_key, _ = self._cache.popitem(last=False)
-            self._stats["evictions"] += 1
-            logger.debug(f"Evicted cache entry {evicted_key[:8]}...")
+        while True:
+            priority, _, key = heapq.heappop(self._heap)
+            entry = self._cache.get(key)
+            if entry is not None and entry.priority == priority:
+                self._inflation = priority
+                return key
+    
+    def _evict(self, reason: str) -> None:
+        key = self._victim()
+        self._remove(key, reason)
+        logger.debug("Evicted cache entry %.8s... (%s)", key, reason)
+    
+    def _remove(self, key: str, reason: Optional[str] = None) -> None:
+        entry = self._cache.pop(key)
+        self._bytes -= entry.size
+        if reason:
+            self._evictions[reason] += 1
+    
+    def _maybe_sweep(self) -> None:
+        """Run an expiry sweep if sweep_interval has passed since the last one (lock held)."""
+        if self.ttl_seconds and time.time() - self._last_sweep >= self.sweep_interval:
+            self._sweep()
+    
+    def sweep(self) -> int:
+        """
+        Remove all expired entries.
         
-        self._cache[key] = CacheEntry(value=result, timestamp=time.time())
-        self._cache.move_to_end(key)
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            return self._sweep()
+    
+    def _sweep(self) -> int:
+        """Remove expired entries (lock held)."""
+        now = time.time()
+        self._last_sweep = now
+        if not self.ttl_seconds:
+            return 0
         
-        logger.debug(f"Cached result for key {key[:8]}...")
+        expired = [key for key, entry in self._cache.items() if self._expired(entry, now)]
+        for key in expired:
+            self._remove(key, "expired")
+        if expired:
+            logger.debug("Swept %s expired cache entries", len(expired))
+        return len(expired)
     
     def clear(self) -> int:
         """Clear all cache entries. Returns count of cleared entries."""
-        count = len(self._cache)
-        self._cache.clear()
-        logger.info(f"Cleared {count} cache entries")
+        with self._lock:
+            count = len(self._cache)
+            self._cache.clear()
+            self._heap.clear()
+            self._bytes = 0
+            self._inflation = 0.0
+        logger.info("Cleared %s cache entries", count)
         return count
     
     @property
@@ -137,15 +333,29 @@ class InferenceCache:
         """Current number of entries."""
         return len(self._cache)
     
+    @property
+    def nbytes(self) -> int:
+        """Estimated bytes held by all entries."""
+        return self._bytes
+    
     @property
     def stats(self) -> dict:
         """Get cache statistics."""
-        total = self._stats["hits"] + self._stats["misses"]
-        hit_rate = self._stats["hits"] / total if total > 0 else 0
+        with self._lock:
+            stats = dict(self._stats)
+            evictions = dict(self._evictions)
+            size, nbytes = len(self._cache), self._bytes
+        total = stats["hits"] + stats["misses"]
+        hit_rate = stats["hits"] / total if total > 0 else 0
         return {
-            **self._stats,
-            "size": self.size,
+            **stats,
+            "evictions": sum(evictions.values()),
+            "eviction_reasons": evictions,
+            "size": size,
             "maxsize": self.maxsize,
+            "bytes": nbytes,
+            "max_bytes": self.max_bytes,
+            "policy": self.policy,
             "hit_rate": round(hit_rate, 3)
         }
     
@@ -156,34 +366,45 @@ class InferenceCache:
         
         try:
             self.persist_path.parent.mkdir(parents=True, exist_ok=True)
-            # Only save string-serializable entries
-            data = {
-                k: {"value": v.value, "timestamp": v.timestamp}
-                for k, v in self._cache.items()
-                if isinstance(v.value, (str, dict, list))
-            }
-            with open(self.persist_path, "w") as f:
-                json.dump(data, f)
-            logger.info(f"Saved {len(data)} cache entries to disk")
+            # Only save serializable entries (compact values are already bytes)
+            with self._lock:
+                data = {
+                    k: {"value": v.value, "timestamp": v.timestamp, "cost": v.cost}
+                    for k, v in self._cache.items()
+                    if isinstance(v.value, (str, dict, list, bytes))
+                }
+            with open(self.persist_path, "wb") as f:
+                f.write(serialization.dumps(data))
+            logger.info("Saved %s cache entries to disk", len(data))
         except Exception as e:
-            logger.warning(f"Failed to save cache to disk: {e}")
+            logger.warning("Failed to save cache to disk: %s", e)
     
     def _load_from_disk(self) -> None:
         """Load cache from disk."""
         try:
-            with open(self.persist_path, "r") as f:
-                data = json.load(f)
+            with open(self.persist_path, "rb") as f:
+                payload = f.read()
+            
+            # Files written before the binary format are JSON
+            if payload.lstrip()[:1] == b"{":
+                data = json.loads(payload.decode("utf-8"))
+            else:
+                data = serialization.loads(payload)
             
             for key, entry in data.items():
-                self._cache[key] = CacheEntry(
-                    value=entry["value"],
-                    timestamp=entry["timestamp"]
-                )
-            logger.info(f"Loaded {len(data)} cache entries from disk")
+                value = entry["value"]
+                encoded = isinstance(value, bytes) and value[:2] == serialization.MAGIC
+                if self.compact and not encoded:
+                    value = serialization.dumps(value)
+                elif not self.compact and encoded:
+                    value = serialization.loads(value)
+                with self._lock:
+                    self._store(key, value, entry["timestamp"], entry.get("cost", 1.0), self._entry_size(value))
+            logger.info("Loaded %s cache entries from disk", len(data))
         except Exception as e:
-            logger.warning(f"Failed to load cache from disk: {e}")
+            logger.warning("Failed to load cache from disk: %s", e)
     
     def __del__(self):
         """Save to disk on cleanup."""
-        if self.persist_path:
+        if getattr(self, "persist_path", None):
             self._save_to_disk()
@@ -0,0 +1,479 @@
+"""
+DARA Services - Metrics
+In-process counters, gauges and histograms in the Prometheus text format.
+"""
+
+import bisect
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ..utils.logging import get_logger
+from ..utils.memory import resident_memory_bytes
+
+logger = get_logger("metrics")
+
+# Latency buckets in seconds, from a cache hit to a multi-pass OCR request
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelKey = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    """Base for a metric family: one value per label combination."""
+    kind = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelKey, Any] = {}
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Dict[str, Any]) -> LabelKey:
+        if len(labels) != len(self.labelnames) or set(labels) != set(self.labelnames):
+            expected = ", ".join(self.labelnames) or "none"
+            raise ValueError(f"Metric '{self.name}' expects labels ({expected}), got ({', '.join(labels) or 'none'})")
+        return tuple(str(labels[name]) for name in self.labelnames)
+    
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        """Yield (sample name, formatted labels, value)."""
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, _format_labels(self.labelnames, key), value
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(f"{name}{labels} {_format_value(value)}" for name, labels, value in self.samples())
+        return lines
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+    
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}({self.name}, series={len(self._values)})>"
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+    kind = "counter"
+    
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        """Increase by amount (must not be negative)."""
+        if amount < 0:
+            raise ValueError(f"Counter '{self.name}' cannot decrease")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def set_total(self, value: float, **labels) -> None:
+        """Mirror a monotonic count kept elsewhere (e.g. cache stats)."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+    
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    """Value that goes up and down; may be computed on collection."""
+    kind = "gauge"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._functions: Dict[LabelKey, Callable[[], Optional[float]]] = {}
+    
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+    
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+    
+    def set_function(self, function: Callable[[], Optional[float]], **labels) -> None:
+        """Compute the value when collected (None skips the sample)."""
+        key = self._key(labels)
+        with self._lock:
+            self._functions[key] = function
+    
+    def value(self, **labels) -> float:
+        key = self._key(labels)
+        if key in self._functions:
+            return self._functions[key]() or 0.0
+        return self._values.get(key, 0.0)
+    
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        yield from super().samples()
+        with self._lock:
+            functions = list(self._functions.items())
+        for key, function in functions:
+            try:
+                value = function()
+            except Exception as e:
+                logger.debug("Gauge %s callback failed: %s", self.name, e)
+                continue
+            if value is not None:
+                yield self.name, _format_labels(self.labelnames, key), value
+
+
+class Histogram(_Metric):
+    """
+    Distribution over fixed buckets, for server-side quantiles.
+    
+    Dashboards compute p50/p95/p99 with ``histogram_quantile`` over the
+    ``_bucket`` series; ``quantile`` gives the same estimate locally.
+    """
+    kind = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        if "le" in self.labelnames:
+            raise ValueError(f"Histogram '{name}' cannot use the reserved label 'le'")
+        self.buckets = tuple(sorted(buckets))
+    
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            # Per-bucket counts; render() accumulates them into "le" buckets
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+    
+    def count(self, **labels) -> int:
+        state = self._values.get(self._key(labels))
+        return state[2] if state else 0
+    
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """
+        Estimate a quantile by linear interpolation within its bucket.
+        
+        Args:
+            q: Quantile in [0, 1] (0.95 for p95)
+            **labels: Series to read
+            
+        Returns:
+            Estimate in the observed unit, None without observations
+        """
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            if not state or not state[2]:
+                return None
+            counts, total = list(state[0]), state[2]
+        
+        rank = q * total
+        cumulative, lower = 0, 0.0
+        for bound, bucket_count in zip(self.buckets, counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                return lower + (bound - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+            lower = bound
+        # Beyond the largest finite bucket
+        return self.buckets[-1]
+    
+    def samples(self) -> Iterator[Tuple[str, str, float]]:
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+        names = self.labelnames + ("le",)
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", _format_labels(names, key + (_format_value(bound),)), cumulative
+            yield f"{self.name}_bucket", _format_labels(names, key + ("+Inf",)), count
+            yield f"{self.name}_sum", _format_labels(self.labelnames, key), total
+            yield f"{self.name}_count", _format_labels(self.labelnames, key), count
+
+
+class MetricsRegistry:
+    """
+    Named metric families plus collectors run before each export.
+    
+    Example:
+        >>> registry = MetricsRegistry()
+        >>> requests = registry.counter("app_requests_total", "Requests", ("mode",))
+        >>> requests.inc(mode="scene")
+        >>> print(registry.render())
+    """
+    
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+    
+    def _get_or_create(self, cls, name: str, *args, **kwargs) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric '{name}' is already registered as a {metric.kind}")
+            return metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._get_or_create(Counter, name, documentation, labelnames)
+    
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge."""
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Get or create a histogram."""
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+    
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+    
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Run collector (which updates metrics from polled stats) before each export."""
+        self._collectors.append(collector)
+    
+    def collect(self) -> None:
+        """Run all collectors; failures are logged and skipped."""
+        for collector in list(self._collectors):
+            try:
+                collector()
+            except Exception as e:
+                logger.warning("Metrics collector failed: %s", e)
+    
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (0.0.4)."""
+        self.collect()
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+    
+    def __repr__(self) -> str:
+        return f"<MetricsRegistry(metrics={len(self._metrics)})>"
+
+
+def model_memory_bytes(model: Any) -> int:
+    """Bytes held by a torch module's parameters and buffers."""
+    tensors = list(model.parameters()) + list(model.buffers())
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+class DARAMetrics:
+    """
+    DARA's metric families on a registry.
+    
+    Request, stage and token metrics are recorded by DARA as requests
+    run; cache, TTS, translation, queue and memory metrics are read
+    from the services when the registry is exported. Create with
+    ``DARA.enable_metrics()``.
+    
+    Example:
+        >>> metrics = dara.enable_metrics()
+        >>> metrics.serve(port=9464)  # GET /metrics
+    """
+    
+    def __init__(self, dara: Any, registry: Optional[MetricsRegistry] = None,
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """
+        Define DARA's metrics.
+        
+        Args:
+            dara: DARA instance whose services are collected
+            registry: Registry to add to (a new one by default)
+            buckets: Latency histogram buckets in seconds
+        """
+        self.dara = dara
+        self.registry = registry or MetricsRegistry()
+        r = self.registry
+        
+        self.requests = r.counter("dara_requests_total", "Detect requests", ("mode", "language"))
+        self.errors = r.counter("dara_request_errors_total", "Detect requests that raised", ("mode", "language"))
+        self.in_flight = r.gauge("dara_requests_in_flight", "Detect requests running now")
+        self.latency = r.histogram(
+            "dara_request_duration_seconds", "Detect latency", ("mode",), buckets
+        )
+        self.stage_latency = r.histogram(
+            "dara_stage_duration_seconds", "Detect latency per stage (see utils/timing.py)",
+            ("mode", "stage"), buckets
+        )
+        self.tokens = r.counter("dara_tokens_generated_total", "Tokens generated", ("task",))
+        self.tts_latency = r.histogram("dara_tts_synthesis_seconds", "TTS synthesis time", (), buckets)
+        
+        self.cache_requests = r.counter("dara_cache_requests_total", "Cache lookups", ("layer", "result"))
+        self.cache_evictions = r.counter("dara_cache_evictions_total", "Cache evictions", ("layer", "reason"))
+        self.cache_entries = r.gauge("dara_cache_entries", "Entries held per cache", ("layer",))
+        self.cache_bytes = r.gauge("dara_cache_bytes", "Estimated bytes held per cache", ("layer",))
+        self.translations = r.counter(
+            "dara_translation_calls_total", "Translation backend calls", ("result",)
+        )
+        self.tts_requests = r.counter("dara_tts_requests_total", "TTS requests", ("result",))
+        
+        self.queue_depth = r.gauge("dara_queue_depth", "Work waiting per queue", ("queue",))
+        self.model_memory = r.gauge("dara_model_memory_bytes", "Parameter and buffer bytes", ("model",))
+        self.rss = r.gauge("dara_process_resident_memory_bytes", "Process resident set size")
+        self.rss.set_function(resident_memory_bytes)
+        
+        self._model_bytes: Dict[int, int] = {}
+        if getattr(dara, "tts", None) is not None:
+            self.track_queue("tts", lambda: dara.tts.stats["queue_depth"])
+        if hasattr(dara, "pending_requests"):
+            self.track_queue("detect", lambda: dara.pending_requests)
+        r.add_collector(self.collect)
+    
+    def record_request(self, mode: str, language: str, timings: Dict[str, float]) -> None:
+        """Count a finished request and observe its stage timings (milliseconds)."""
+        self.requests.inc(mode=mode, language=language)
+        self.latency.observe(timings["total"] / 1000, mode=mode)
+        for stage, ms in timings.items():
+            if stage != "total":
+                self.stage_latency.observe(ms / 1000, mode=mode, stage=stage)
+        if "audio/synthesize" in timings:
+            self.tts_latency.observe(timings["audio/synthesize"] / 1000)
+    
+    def record_error(self, mode: str, language: str) -> None:
+        self.errors.inc(mode=mode, language=language)
+    
+    def record_tokens(self, task: str, count: int) -> None:
+        self.tokens.inc(count, task=task)
+    
+    def track_queue(self, name: str, depth: Callable[[], Optional[float]]) -> None:
+        """Report a queue's depth, read on each export."""
+        self.queue_depth.set_function(depth, queue=name)
+    
+    def collect(self) -> None:
+        """Copy polled service stats into metrics."""
+        dara = self.dara
+        
+        cache = getattr(dara, "cache", None)
+        if cache is not None:
+            stats = cache.stats
+            self.cache_requests.set_total(stats["hits"], layer="inference", result="hit")
+            self.cache_requests.set_total(stats["misses"], layer="inference", result="miss")
+            for reason, count in stats.get("eviction_reasons", {}).items():
+                self.cache_evictions.set_total(count, layer="inference", reason=reason)
+            self.cache_entries.set(stats["size"], layer="inference")
+            self.cache_bytes.set(stats.get("bytes", 0), layer="inference")
+        
+        tts = getattr(dara, "tts", None)
+        if tts is not None:
+            stats = tts.stats
+            self.cache_requests.set_total(stats["cache_hits"], layer="tts", result="hit")
+            self.cache_requests.set_total(stats["cache_misses"], layer="tts", result="miss")
+            self.tts_requests.set_total(stats["generated"], result="ok")
+            self.tts_requests.set_total(stats["failures"], result="failure")
+        
+        from .translation import TranslationService
+        info = TranslationService.stats()
+        self.cache_requests.set_total(info["hits"], layer="translation", result="hit")
+        self.cache_requests.set_total(info["misses"], layer="translation", result="miss")
+        self.cache_entries.set(info["size"], layer="translation")
+        self.translations.set_total(info["calls"] - info["failures"], result="ok")
+        self.translations.set_total(info["failures"], result="failure")
+        
+        model = getattr(dara, "model", None)
+        if model is not None and hasattr(model, "parameters"):
+            self.model_memory.set(self._memory(model), model="base")
+        cascade = getattr(dara, "cascade", None)
+        if cascade is not None:
+            loaded = cascade._model
+            self.model_memory.set(self._memory(loaded) if loaded is not None else 0, model="escalation")
+    
+    def _memory(self, model: Any) -> int:
+        """Model bytes, computed once per loaded model."""
+        key = id(model)
+        if key not in self._model_bytes:
+            self._model_bytes[key] = model_memory_bytes(model)
+        return self._model_bytes[key]
+    
+    def render(self) -> str:
+        """Export the registry in the Prometheus text format."""
+        return self.registry.render()
+    
+    def serve(self, port: int = 9464, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+        """Serve the registry at /metrics from a daemon thread (see start_http_server)."""
+        return start_http_server(self.registry, port, host)
+    
+    def __repr__(self) -> str:
+        return f"<DARAMetrics(registry={self.registry})>"
+
+
+def start_http_server(registry: MetricsRegistry, port: int = 9464, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """
+    Serve a registry at /metrics for Prometheus to scrape.
+    
+    Args:
+        registry: Registry to export
+        port: TCP port (0 picks a free one; see server.server_port)
+        host: Interface to bind
+        
+    Returns:
+        Running server (call shutdown() to stop)
+    """
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            logger.debug(format, *args)
+    
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name="dara-metrics", daemon=True)
+    thread.start()
+    logger.info("Serving metrics on http://%s:%s/metrics", host, server.server_port)
+    return server
@@ -0,0 +1,252 @@
+"""
+DARA Services - Result Serialization
+Compact binary encoding of results for cache persistence and responses.
+"""
+
+import struct
+from typing import Any, List, Optional
+
+# Optional msgpack backend
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+# Every payload starts with MAGIC, a version byte and a backend byte
+MAGIC = b"DR"
+VERSION = 1
+BACKENDS = ("msgpack", "struct")
+_BACKEND_CODES = {"msgpack": b"M", "struct": b"S"}
+
+_FLOAT64 = struct.Struct("<d")
+_INT64_MIN, _INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+# struct backend type tags
+_NONE, _TRUE, _FALSE = b"N", b"T", b"F"
+_INT, _BIG_INT, _FLOAT = b"i", b"L", b"d"
+_STR, _STR_REF, _BYTES = b"s", b"r", b"b"
+_LIST, _MAP = b"l", b"m"
+
+
+def default_backend() -> str:
+    """msgpack when installed, else the built-in struct encoding."""
+    return "msgpack" if MSGPACK_AVAILABLE else "struct"
+
+
+def _plain(obj: Any) -> Any:
+    """Convert objects without a native encoding (NumPy scalars, sets, others)."""
+    if hasattr(obj, "item") and callable(obj.item):
+        try:
+            return obj.item()
+        except (TypeError, ValueError):
+            pass
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+def _varint(value: int, out: bytearray) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+class _StructEncoder:
+    """
+    Tagged binary encoding built on ``struct``.
+    
+    Each string is written once per payload; repeats (dict keys,
+    denomination names) become a varint reference into the strings
+    seen so far.
+    """
+    
+    def __init__(self):
+        self.out = bytearray()
+        self.strings = {}
+    
+    def encode(self, obj: Any) -> None:
+        out = self.out
+        if obj is None:
+            out += _NONE
+        elif obj is True:
+            out += _TRUE
+        elif obj is False:
+            out += _FALSE
+        elif isinstance(obj, int):
+            if _INT64_MIN <= obj <= _INT64_MAX:
+                # Zigzag varint: small magnitudes of either sign take one byte
+                out += _INT
+                _varint((obj << 1) ^ (obj >> 63), out)
+            else:
+                # Digits are written inline, outside the string table
+                out += _BIG_INT
+                self._raw(str(obj).encode("ascii"))
+        elif isinstance(obj, float):
+            out += _FLOAT
+            out += _FLOAT64.pack(obj)
+        elif isinstance(obj, str):
+            self._string_tagged(obj)
+        elif isinstance(obj, (bytes, bytearray)):
+            out += _BYTES
+            _varint(len(obj), out)
+            out += obj
+        elif isinstance(obj, (list, tuple)):
+            out += _LIST
+            _varint(len(obj), out)
+            for item in obj:
+                self.encode(item)
+        elif isinstance(obj, dict):
+            out += _MAP
+            _varint(len(obj), out)
+            for key, value in obj.items():
+                self.encode(key)
+                self.encode(value)
+        else:
+            self.encode(_plain(obj))
+    
+    def _string_tagged(self, value: str) -> None:
+        index = self.strings.get(value)
+        if index is not None:
+            self.out += _STR_REF
+            _varint(index, self.out)
+            return
+        self.out += _STR
+        self._string(value)
+    
+    def _string(self, value: str) -> None:
+        self._raw(value.encode("utf-8"))
+        self.strings[value] = len(self.strings)
+    
+    def _raw(self, encoded: bytes) -> None:
+        _varint(len(encoded), self.out)
+        self.out += encoded
+
+
+class _StructDecoder:
+    def __init__(self, data: bytes, pos: int):
+        self.data = data
+        self.pos = pos
+        self.strings: List[str] = []
+    
+    def decode(self) -> Any:
+        data = self.data
+        tag = data[self.pos:self.pos + 1]
+        self.pos += 1
+        
+        if tag == _NONE:
+            return None
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+        if tag == _INT:
+            value, self.pos = _read_varint(data, self.pos)
+            return (value >> 1) ^ -(value & 1)
+        if tag == _FLOAT:
+            value = _FLOAT64.unpack_from(data, self.pos)[0]
+            self.pos += 8
+            return value
+        if tag == _STR:
+            return self._string()
+        if tag == _STR_REF:
+            index, self.pos = _read_varint(data, self.pos)
+            return self.strings[index]
+        if tag == _BIG_INT:
+            return int(self._raw().decode("ascii"))
+        if tag == _BYTES:
+            length, self.pos = _read_varint(data, self.pos)
+            value = bytes(data[self.pos:self.pos + length])
+            self.pos += length
+            return value
+        if tag == _LIST:
+            count, self.pos = _read_varint(data, self.pos)
+            return [self.decode() for _ in range(count)]
+        if tag == _MAP:
+            count, self.pos = _read_varint(data, self.pos)
+            result = {}
+            for _ in range(count):
+                key = self.decode()
+                result[key] = self.decode()
+            return result
+        raise ValueError(f"Corrupt payload: unknown tag {tag!r} at byte {self.pos - 1}")
+    
+    def _string(self) -> str:
+        value = self._raw().decode("utf-8")
+        self.strings.append(value)
+        return value
+    
+    def _raw(self) -> bytes:
+        length, self.pos = _read_varint(self.data, self.pos)
+        value = bytes(self.data[self.pos:self.pos + length])
+        self.pos += length
+        return value
+
+
+def dumps(obj: Any, backend: Optional[str] = None) -> bytes:
+    """
+    Encode a result (nested dicts, lists, strings, numbers) to bytes.
+    
+    Tuples come back as lists; NumPy scalars as Python numbers; other
+    objects via ``to_dict()`` or ``str()``.
+    
+    Args:
+        obj: Object to encode
+        backend: "msgpack" or "struct" (defaults to msgpack when installed)
+        
+    Returns:
+        Encoded payload
+    """
+    backend = backend or default_backend()
+    if backend not in BACKENDS:
+        available = ", ".join(BACKENDS)
+        raise ValueError(f"Invalid serialization backend '{backend}'. Available: {available}")
+    
+    header = MAGIC + bytes([VERSION]) + _BACKEND_CODES[backend]
+    if backend == "msgpack":
+        if not MSGPACK_AVAILABLE:
+            raise ImportError("msgpack not installed. Install with: pip install msgpack")
+        return header + msgpack.packb(obj, use_bin_type=True, default=_plain)
+    
+    encoder = _StructEncoder()
+    encoder.encode(obj)
+    return header + bytes(encoder.out)
+
+
+def loads(data: bytes) -> Any:
+    """
+    Decode a payload written by ``dumps`` (either backend).
+    
+    Args:
+        data: Encoded payload
+        
+    Returns:
+        Decoded object
+    """
+    if data[:2] != MAGIC or len(data) < 4:
+        raise ValueError("Not a DARA payload")
+    if data[2] != VERSION:
+        raise ValueError(f"Unsupported payload version {data[2]}")
+    
+    code = data[3:4]
+    if code == _BACKEND_CODES["msgpack"]:
+        if not MSGPACK_AVAILABLE:
+            raise ImportError("Payload is msgpack-encoded but msgpack is not installed")
+        return msgpack.unpackb(data[4:], raw=False, strict_map_key=False)
+    if code == _BACKEND_CODES["struct"]:
+        return _StructDecoder(data, 4).decode()
+    raise ValueError(f"Unknown payload backend {code!r}")
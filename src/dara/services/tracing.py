@@ -0,0 +1,329 @@
+"""
+DARA Services - Tracing
+Per-request traces: one span per detect call and per stage inside it
+(cache lookup, generate, translate, TTS, ...), kept in a ring buffer
+and optionally written to JSONL or forwarded to OpenTelemetry.
+
+Spans use OpenTelemetry's data model (32-hex trace ID, 16-hex span
+IDs, parent links, Unix-nanosecond times, attributes, status), so a
+JSONL file can be converted to OTLP without reshaping.
+"""
+
+import atexit
+import json
+import queue
+import random
+import re
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Sequence
+
+from ..utils.logging import current_request_id, get_logger, new_request_id
+from ..utils.timing import StageTimer, current_timer
+
+try:
+    from opentelemetry import trace as otel_trace
+    OTEL_AVAILABLE = True
+except ImportError:
+    OTEL_AVAILABLE = False
+
+logger = get_logger("tracing")
+
+# Request IDs of this shape double as trace IDs
+_TRACE_ID = re.compile(r"[0-9a-f]{32}")
+
+Trace = Dict[str, Any]
+TraceExporter = Callable[[Trace], None]
+
+
+def _span_id() -> str:
+    return f"{random.getrandbits(64):016x}"
+
+
+class Span:
+    """One timed operation of a trace."""
+    __slots__ = ("name", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+    
+    def __init__(self, name: str, parent_id: Optional[str] = None, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.span_id = _span_id()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = dict(attributes or {})
+        self.error: Optional[str] = None
+    
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+    
+    def to_dict(self, trace_id: str) -> Dict[str, Any]:
+        return {
+            "trace_id": trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "status": {"code": "ERROR", "message": self.error} if self.error else {"code": "OK"},
+        }
+
+
+class TracingStageTimer(StageTimer):
+    """
+    StageTimer that also records a span per stage under a root span.
+    
+    Stages become child spans of the stage they are nested in, so the
+    trace mirrors the timing breakdown; annotate() adds attributes to
+    the innermost open span. The finished trace goes to the tracer.
+    """
+    
+    def __init__(self, tracer: "Tracer", name: str, attributes: Optional[Dict[str, Any]] = None):
+        super().__init__()
+        self.tracer = tracer
+        self.request_id = current_request_id() or new_request_id()
+        self.trace_id = self.request_id if _TRACE_ID.fullmatch(self.request_id) else new_request_id()
+        self.root = Span(name, attributes={"dara.request_id": self.request_id, **(attributes or {})})
+        self.spans: List[Span] = [self.root]
+        self._open: List[Span] = [self.root]
+    
+    def __enter__(self) -> "TracingStageTimer":
+        self.root.start_ns = time.time_ns()
+        return super().__enter__()
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        super().__exit__(exc_type, exc, tb)
+        self.root.end_ns = time.time_ns()
+        if exc is not None:
+            self.root.error = f"{exc_type.__name__}: {exc}"
+        self.tracer.export(self.to_trace())
+    
+    def stage_started(self, name: str) -> None:
+        span = Span(name, self._open[-1].span_id)
+        self.spans.append(span)
+        self._open.append(span)
+    
+    def stage_finished(self, name: str) -> None:
+        self._open.pop().end_ns = time.time_ns()
+    
+    def annotate(self, attributes: Dict[str, Any]) -> None:
+        self._open[-1].attributes.update(attributes)
+    
+    def to_trace(self) -> Trace:
+        """The trace as a JSON-serializable dictionary."""
+        return {
+            "trace_id": self.trace_id,
+            "request_id": self.request_id,
+            "name": self.root.name,
+            "start_time_unix_nano": self.root.start_ns,
+            "duration_ms": round(self.root.duration_ms, 3),
+            "error": self.root.error,
+            "spans": [span.to_dict(self.trace_id) for span in self.spans],
+        }
+
+
+def annotate(**attributes: Any) -> None:
+    """
+    Add attributes to the current span, if the request is traced.
+    
+    A no-op (one context variable lookup) otherwise.
+    
+    Example:
+        >>> annotate(cache_hit=True)
+    """
+    timer = current_timer()
+    if isinstance(timer, TracingStageTimer):
+        timer.annotate(attributes)
+
+
+class JSONLExporter:
+    """
+    Append traces to a JSONL file (one trace per line) from a background
+    thread; when max_pending traces are waiting, new ones are dropped
+    rather than slowing requests down.
+    """
+    
+    def __init__(self, path: str, max_pending: int = 1000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.dropped = 0
+        self._queue: queue.Queue = queue.Queue(max_pending)
+        self._thread = threading.Thread(target=self._write, name="dara-traces", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+    
+    def __call__(self, trace: Trace) -> None:
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+    
+    def _write(self) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            while True:
+                trace = self._queue.get()
+                if trace is None:
+                    return
+                f.write(json.dumps(trace, ensure_ascii=False, default=str) + "\n")
+                if self._queue.empty():
+                    f.flush()
+    
+    def close(self) -> None:
+        """Write waiting traces and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+
+class OpenTelemetryExporter:
+    """
+    Replay finished traces through the OpenTelemetry API, so a configured
+    SDK (OTLP, Jaeger, ...) receives them. OpenTelemetry assigns its own
+    IDs; DARA's request ID is kept as the "dara.request_id" attribute.
+    """
+    
+    def __init__(self, tracer_provider: Any = None):
+        if not OTEL_AVAILABLE:
+            raise ImportError("OpenTelemetryExporter requires opentelemetry-api (pip install opentelemetry-sdk)")
+        self.tracer = otel_trace.get_tracer("dara", tracer_provider=tracer_provider)
+    
+    def __call__(self, trace: Trace) -> None:
+        started = {}
+        for span in trace["spans"]:  # parents come before their children
+            parent = started.get(span["parent_span_id"])
+            context = otel_trace.set_span_in_context(parent) if parent is not None else None
+            started[span["span_id"]] = self.tracer.start_span(
+                span["name"],
+                context=context,
+                attributes={k: v for k, v in span["attributes"].items() if isinstance(v, (str, bool, int, float))},
+                start_time=span["start_time_unix_nano"]
+            )
+            if span["status"]["code"] == "ERROR":
+                status = otel_trace.Status(otel_trace.StatusCode.ERROR, span["status"]["message"])
+                started[span["span_id"]].set_status(status)
+        for span in reversed(trace["spans"]):
+            started[span["span_id"]].end(end_time=span["end_time_unix_nano"])
+
+
+class Tracer:
+    """
+    Traces of detect calls, kept in memory and passed to exporters.
+    
+    Example:
+        >>> tracer = dara.enable_tracing(exporters=[JSONLExporter("traces.jsonl")])
+        >>> dara.detect("photo.jpg", mode="text")
+        >>> tracer.traces[-1]["spans"]
+        >>> tail_breakdown(tracer.traces, quantile=0.99)
+    """
+    
+    def __init__(
+        self,
+        exporters: Sequence[TraceExporter] = (),
+        buffer_size: int = 1000,
+        sample_rate: float = 1.0
+    ):
+        """
+        Initialize tracer.
+        
+        Args:
+            exporters: Called with each finished trace (exceptions are
+                logged and ignored)
+            buffer_size: Recent traces kept in .traces
+            sample_rate: Fraction of requests traced
+        """
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError(f"Invalid sample rate '{sample_rate}'. Available: 0.0 to 1.0")
+        self.exporters = list(exporters)
+        self.traces: Deque[Trace] = deque(maxlen=buffer_size)
+        self.sample_rate = sample_rate
+    
+    def sampled(self) -> bool:
+        """Whether to trace the next request."""
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+    
+    def timer(self, name: str, **attributes: Any) -> TracingStageTimer:
+        """A StageTimer that traces the request it times."""
+        return TracingStageTimer(self, name, attributes)
+    
+    def export(self, trace: Trace) -> None:
+        self.traces.append(trace)
+        for exporter in self.exporters:
+            try:
+                exporter(trace)
+            except Exception as e:
+                logger.warning("Trace exporter failed: %s", e)
+    
+    def find(self, request_id: str) -> List[Trace]:
+        """Buffered traces of one request."""
+        return [trace for trace in self.traces if trace["request_id"] == request_id]
+    
+    def __repr__(self) -> str:
+        return f"<Tracer(traces={len(self.traces)}, exporters={len(self.exporters)}, sample_rate={self.sample_rate})>"
+
+
+def load_traces(path: str) -> List[Trace]:
+    """Read traces written by JSONLExporter."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def tail_breakdown(traces: Iterable[Trace], quantile: float = 0.99) -> Dict[str, Any]:
+    """
+    Where the slowest requests spend their time, against all requests.
+    
+    Args:
+        traces: Finished traces (Tracer.traces or load_traces())
+        quantile: Requests at or above this duration quantile are the tail
+        
+    Returns:
+        Dictionary with:
+            - requests, tail_requests, threshold_ms
+            - spans: per span name, mean exclusive ms over all requests
+              and over the tail, and the tail's extra ms over the mean
+              (largest first: the subsystem behind the tail)
+    """
+    traces = list(traces)
+    if not traces:
+        return {"requests": 0, "tail_requests": 0, "threshold_ms": None, "spans": {}}
+    durations = sorted(trace["duration_ms"] for trace in traces)
+    threshold = durations[min(len(durations) - 1, int(quantile * len(durations)))]
+    tail = [trace for trace in traces if trace["duration_ms"] >= threshold]
+    
+    def mean_exclusive(group: List[Trace]) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        for trace in group:
+            for name, ms in _exclusive_ms(trace).items():
+                totals[name] = totals.get(name, 0.0) + ms
+        return {name: ms / len(group) for name, ms in totals.items()}
+    
+    overall, slow = mean_exclusive(traces), mean_exclusive(tail)
+    spans = {
+        name: {
+            "mean_ms": round(overall.get(name, 0.0), 3),
+            "tail_mean_ms": round(slow.get(name, 0.0), 3),
+            "tail_extra_ms": round(slow.get(name, 0.0) - overall.get(name, 0.0), 3),
+        }
+        for name in set(overall) | set(slow)
+    }
+    return {
+        "requests": len(traces),
+        "tail_requests": len(tail),
+        "threshold_ms": threshold,
+        "spans": dict(sorted(spans.items(), key=lambda item: -item[1]["tail_extra_ms"])),
+    }
+
+
+def _exclusive_ms(trace: Trace) -> Dict[str, float]:
+    """Per span name, time not spent in child spans (the root's is "other")."""
+    children: Dict[Optional[str], float] = {}
+    for span in trace["spans"]:
+        children[span["parent_span_id"]] = children.get(span["parent_span_id"], 0.0) + span["duration_ms"]
+    result: Dict[str, float] = {}
+    for span in trace["spans"]:
+        name = "other" if span["parent_span_id"] is None else span["name"]
+        result[name] = result.get(name, 0.0) + max(0.0, span["duration_ms"] - children.get(span["span_id"], 0.0))
+    return result
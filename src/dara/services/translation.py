@@ -7,6 +7,7 @@ from typing import Optional
 from functools import lru_cache
 
 from ..utils.logging import get_logger
+from .tracing import annotate
 
 logger = get_logger("translation")
 
@@ -21,6 +22,9 @@ class TranslationService:
     
     SUPPORTED_LANGUAGES = {"en", "id"}
     
+    # Backend calls and failures across instances (the translate cache is shared too)
+    _counts = {"calls": 0, "failures": 0}
+    
     def __init__(self, cache_size: int = 500):
         """
         Initialize translation service.
@@ -64,16 +68,20 @@ class TranslationService:
             return text
         
         if target not in self.SUPPORTED_LANGUAGES:
-            logger.warning(f"Unsupported target language: {target}")
+            logger.warning("Unsupported target language: %s", target)
             return text
         
+        self._counts["calls"] += 1
+        annotate(target=target, characters=len(text))
         try:
             translator = self._translator_class(source=source, target=target)
             result = translator.translate(text)
-            logger.debug(f"Translated to {target}: {text[:50]}... -> {result[:50]}...")
+            logger.debug("Translated to %s: %.50s... -> %.50s...", target, text, result)
             return result
         except Exception as e:
-            logger.warning(f"Translation failed: {e}")
+            self._counts["failures"] += 1
+            annotate(failed=True)
+            logger.warning("Translation failed: %s", e)
             return text
     
     def to_indonesian(self, text: str) -> str:
@@ -92,10 +100,16 @@ class TranslationService:
     @property
     def cache_info(self) -> dict:
         """Get cache statistics."""
-        info = self.translate.cache_info()
+        return self.stats()
+    
+    @classmethod
+    def stats(cls) -> dict:
+        """Cache statistics and backend calls and failures, across all instances."""
+        info = cls.translate.cache_info()
         return {
             "hits": info.hits,
             "misses": info.misses,
             "size": info.currsize,
-            "maxsize": info.maxsize
+            "maxsize": info.maxsize,
+            **cls._counts
         }
@@ -3,13 +3,16 @@ DARA Services - Text-to-Speech
 Provides TTS generation with caching and multiple engine support.
 """
 
-from typing import Optional
+from typing import Any, Optional
 from pathlib import Path
 import hashlib
+import threading
 import uuid
 from concurrent.futures import ThreadPoolExecutor
 
 from ..utils.logging import get_logger
+from ..utils.timing import stage
+from .tracing import annotate
 
 logger = get_logger("tts")
 
@@ -26,7 +29,8 @@ class TTSService:
         self,
         cache_dir: Optional[str] = None,
         rate: int = 150,
-        enable_cache: bool = True
+        enable_cache: bool = True,
+        engine: Optional[Any] = None
     ):
         """
         Initialize TTS service.
@@ -35,6 +39,8 @@ class TTSService:
             cache_dir: Directory for cached audio files
             rate: Speech rate (words per minute)
             enable_cache: Whether to cache generated audio
+            engine: pyttsx3-compatible engine to use instead of
+                initializing pyttsx3 (e.g. core/stub.py's StubSpeechEngine)
         """
         self.rate = rate
         self.enable_cache = enable_cache
@@ -42,7 +48,14 @@ class TTSService:
         
         self._engine = None
         self._executor = ThreadPoolExecutor(max_workers=1)
-        self._init_engine()
+        self._stats = {"cache_hits": 0, "cache_misses": 0, "generated": 0, "failures": 0}
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        if engine is not None:
+            self._engine = engine
+            self._engine.setProperty('rate', self.rate)
+        else:
+            self._init_engine()
         
         if self.enable_cache:
             self.cache_dir.mkdir(parents=True, exist_ok=True)
@@ -53,9 +66,9 @@ class TTSService:
             import pyttsx3
             self._engine = pyttsx3.init()
             self._engine.setProperty('rate', self.rate)
-            logger.info(f"TTS engine initialized with rate={self.rate}")
+            logger.info("TTS engine initialized with rate=%s", self.rate)
         except Exception as e:
-            logger.warning(f"Failed to initialize TTS engine: {e}")
+            logger.warning("Failed to initialize TTS engine: %s", e)
             self._engine = None
     
     def _get_cache_key(self, text: str, language: str) -> str:
@@ -85,7 +98,7 @@ class TTSService:
             # Default to first available voice
             return voices[0].id if voices else None
         except Exception as e:
-            logger.warning(f"Voice selection failed: {e}")
+            logger.warning("Voice selection failed: %s", e)
             return None
     
     def generate(
@@ -114,8 +127,12 @@ class TTSService:
             cache_path = self._get_cache_path(cache_key)
             
             if cache_path.exists():
-                logger.debug(f"TTS cache hit: {cache_key[:8]}...")
+                self._stats["cache_hits"] += 1
+                annotate(tts_cache_hit=True)
+                logger.debug("TTS cache hit: %.8s...", cache_key)
                 return str(cache_path)
+            self._stats["cache_misses"] += 1
+            annotate(tts_cache_hit=False)
         
         # Generate new audio
         try:
@@ -133,14 +150,18 @@ class TTSService:
                 save_path = Path(f"output_{uuid.uuid4().hex}.mp3")
             
             # Generate audio
-            self._engine.save_to_file(text, str(save_path))
-            self._engine.runAndWait()
+            with stage("synthesize"):
+                self._engine.save_to_file(text, str(save_path))
+                self._engine.runAndWait()
             
-            logger.debug(f"Generated TTS audio: {save_path}")
+            self._stats["generated"] += 1
+            logger.debug("Generated TTS audio: %s", save_path)
             return str(save_path)
             
         except Exception as e:
-            logger.error(f"TTS generation failed: {e}")
+            self._stats["failures"] += 1
+            annotate(tts_failed=True)
+            logger.error("TTS generation failed: %s", e)
             return None
     
     def generate_async(self, text: str, language: str = "en") -> "Future":
@@ -154,7 +175,15 @@ class TTSService:
         Returns:
             Future that resolves to audio path
         """
-        return self._executor.submit(self.generate, text, language)
+        with self._pending_lock:
+            self._pending += 1
+        future = self._executor.submit(self.generate, text, language)
+        future.add_done_callback(self._finish_pending)
+        return future
+    
+    def _finish_pending(self, _future) -> None:
+        with self._pending_lock:
+            self._pending -= 1
     
     def clear_cache(self) -> int:
         """
@@ -174,7 +203,7 @@ class TTSService:
             except Exception:
                 pass
         
-        logger.info(f"Cleared {count} cached audio files")
+        logger.info("Cleared %s cached audio files", count)
         return count
     
     @property
@@ -182,6 +211,11 @@ class TTSService:
         """Check if TTS engine is available."""
         return self._engine is not None
     
+    @property
+    def stats(self) -> dict:
+        """Cache hits and misses, audio generated, failures and queued async requests."""
+        return {**self._stats, "queue_depth": self._pending}
+    
     def __del__(self):
         """Cleanup executor on destruction."""
         if hasattr(self, '_executor'):
@@ -1,6 +1,14 @@
 # Utils module exports
 from .image import ImageUtils
 from .text import TextUtils
-from .logging import setup_logging, get_logger
+from .keywords import KeywordMatcher
+from .logging import setup_logging, get_logger, request_scope, current_request_id
+from .timing import StageTimer, stage
+from .memory import MemoryProfiler
+from .profiling import RequestProfiler
 
-__all__ = ["ImageUtils", "TextUtils", "setup_logging", "get_logger"]
+__all__ = [
+    "ImageUtils", "TextUtils", "KeywordMatcher", "setup_logging", "get_logger",
+    "request_scope", "current_request_id",
+    "StageTimer", "stage", "MemoryProfiler", "RequestProfiler"
+]
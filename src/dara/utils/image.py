@@ -5,10 +5,18 @@ Provides image loading, preprocessing, and optimization utilities.
 
 from PIL import Image
 from pathlib import Path
-from typing import Union, Tuple, Optional
+from typing import Any, Union, Tuple, Optional
 import hashlib
 import io
 
+# Anything ImageUtils.load accepts: paths, PIL images, HxWxC uint8 arrays
+# (numpy, CPU torch tensors or raw memoryviews), encoded bytes/buffers
+# and binary file-like objects.
+ImageInput = Union[str, Path, Image.Image, bytes, bytearray, memoryview, Any]
+
+# PIL modes for uint8 arrays by channel count
+_ARRAY_MODES = {1: "L", 3: "RGB", 4: "RGBA"}
+
 
 class ImageUtils:
     """Utility class for image processing operations."""
@@ -22,14 +30,19 @@ class ImageUtils:
     
     @staticmethod
     def load(
-        image_input: Union[str, Path, Image.Image],
+        image_input: ImageInput,
         convert_rgb: bool = True
     ) -> Image.Image:
         """
         Load image from various input types.
         
+        Uncompressed arrays go through Image.frombuffer without any
+        disk I/O or encode/decode round trip (see from_array).
+        
         Args:
-            image_input: Path string, Path object, or PIL Image
+            image_input: Path string, Path object, PIL Image, HxW/HxWxC
+                uint8 array (numpy, CPU torch tensor, memoryview),
+                encoded image bytes/buffer, or binary file-like object
             convert_rgb: Whether to convert to RGB mode
             
         Returns:
@@ -45,6 +58,14 @@ class ImageUtils:
             if not path.exists():
                 raise FileNotFoundError(f"Image not found: {path}")
             image = Image.open(path)
+        elif isinstance(image_input, (bytes, bytearray)):
+            image = Image.open(io.BytesIO(image_input))
+        elif isinstance(image_input, memoryview) and image_input.ndim <= 1:
+            image = Image.open(io.BytesIO(image_input))
+        elif hasattr(image_input, "read"):
+            image = Image.open(image_input)
+        elif ImageUtils._is_array(image_input):
+            image = ImageUtils.from_array(image_input)
         else:
             raise ValueError(f"Unsupported image input type: {type(image_input)}")
         
@@ -53,6 +74,57 @@ class ImageUtils:
         
         return image
     
+    @staticmethod
+    def _is_array(obj: Any) -> bool:
+        """Check for array-like pixel data without importing numpy/torch."""
+        return (
+            hasattr(obj, "__array_interface__")
+            or isinstance(obj, memoryview)
+            or (hasattr(obj, "numpy") and hasattr(obj, "shape"))
+        )
+    
+    @staticmethod
+    def from_array(array: Any) -> Image.Image:
+        """
+        Wrap an HxW or HxWxC uint8 pixel array as a PIL Image.
+        
+        L and RGBA arrays are mapped without copying (the image shares
+        the caller's buffer, so keep the frame unchanged until inference
+        returns). RGB is unpacked once into PIL's 4-byte pixel storage.
+        Strided views (e.g. a BGR->RGB ``frame[..., ::-1]``) are made
+        contiguous first.
+        
+        Args:
+            array: numpy array, CPU torch tensor or memoryview
+            
+        Returns:
+            PIL Image sharing the array's memory when possible
+            
+        Raises:
+            ValueError: If dtype or shape is not supported
+        """
+        import numpy as np
+        
+        if hasattr(array, "numpy") and not hasattr(array, "__array_interface__"):
+            # torch.Tensor: zero-copy view of CPU memory
+            array = array.detach().numpy()
+        array = np.asarray(array)
+        
+        if array.dtype != np.uint8:
+            raise ValueError(f"Unsupported array dtype: {array.dtype} (expected uint8)")
+        if array.ndim == 3 and array.shape[2] == 1:
+            array = array[:, :, 0]
+        channels = 1 if array.ndim == 2 else (array.shape[2] if array.ndim == 3 else 0)
+        if channels not in _ARRAY_MODES:
+            raise ValueError(f"Unsupported array shape: {array.shape} (expected HxW or HxWx3/4)")
+        
+        if not array.flags["C_CONTIGUOUS"]:
+            array = np.ascontiguousarray(array)
+        
+        mode = _ARRAY_MODES[channels]
+        height, width = array.shape[:2]
+        return Image.frombuffer(mode, (width, height), array, "raw", mode, 0, 1)
+    
     @staticmethod
     def resize_smart(
         image: Image.Image,
@@ -81,6 +153,44 @@ class ImageUtils:
         
         return image.resize(new_size, Image.Resampling.LANCZOS)
     
+    @staticmethod
+    def load_for_model(
+        image_input: ImageInput,
+        size: Tuple[int, int],
+        resample: int = Image.Resampling.BICUBIC
+    ) -> Tuple[Image.Image, str, Tuple[int, int]]:
+        """
+        Decode, resize and hash an image in one fused pass.
+        
+        JPEGs are decoded with DCT-domain downscaling (PIL draft) to the
+        smallest 1/2, 1/4 or 1/8 scale that still covers ``size``, then
+        resized exactly once to the model input. The cache hash is taken
+        from that same resized image, so no full-resolution resize is
+        ever done.
+        
+        Args:
+            image_input: Any input accepted by load()
+            size: Model input (width, height)
+            resample: PIL resampling filter for the single resize
+            
+        Returns:
+            Tuple of (model-sized RGB image, hash, original (width, height))
+        """
+        size = tuple(size)
+        image = ImageUtils.load(image_input, convert_rgb=False)
+        original_size = image.size
+        
+        # Only draft images we opened ourselves; never mutate a caller's image
+        if not isinstance(image_input, Image.Image):
+            image.draft(None, size)
+        
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        if image.size != size:
+            image = image.resize(size, resample)
+        
+        return image, ImageUtils.compute_hash(image), original_size
+    
     @staticmethod
     def compute_hash(image: Image.Image, size: int = 8) -> str:
         """
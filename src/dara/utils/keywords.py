@@ -0,0 +1,145 @@
+"""
+DARA Utilities - Keyword Matching
+Finds keywords from many categories in one pass with a precompiled trie regex.
+"""
+
+import re
+from typing import Dict, Iterable, Iterator, List, Mapping, Tuple
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Trie key marking the end of a keyword
+_END = ""
+
+
+def _normalize(keyword: str) -> str:
+    return _WHITESPACE.sub(" ", keyword.strip().lower())
+
+
+def _boundary(char: str, ahead: bool) -> str:
+    """
+    Lookaround that stops a keyword edge from sitting inside a longer token.
+    
+    A letter may not touch another letter ("air" in "chair", "step" in
+    "stepped") and a digit may not touch another digit ("1000" in
+    "10000"), but a letter may touch a digit ("Rp10.000"). Punctuation
+    edges ("no.", "$", "+62") need no boundary.
+    """
+    if char.isdigit():
+        cls = r"\d"
+    elif char.isalpha():
+        cls = r"[^\W\d_]"
+    else:
+        return ""
+    return f"(?!{cls})" if ahead else f"(?<!{cls})"
+
+
+def _trie_pattern(node: dict) -> str:
+    """Regex for a trie node; longer continuations are tried before an end."""
+    branches = [
+        (r"\s+" if char == " " else re.escape(char)) + _trie_pattern(child)
+        for char, child in sorted(node.items())
+        if char != _END
+    ]
+    if _END in node:
+        branches.append(node[_END])
+    if len(branches) == 1:
+        return branches[0]
+    return "(?:" + "|".join(branches) + ")"
+
+
+class KeywordMatcher:
+    """
+    Precompiled multi-category keyword matcher.
+    
+    All keywords are merged into one trie-shaped regex, so a text is
+    scanned once regardless of vocabulary size and shared prefixes are
+    compared once. Matching is case-insensitive and whole-token (see
+    _boundary); at each position the longest keyword wins.
+    
+    Example:
+        >>> matcher = KeywordMatcher({"hazard": ["stairs", "step"], "nav": ["door"]})
+        >>> matcher.find("Stairs next to a stepped door")
+        {'hazard': ['stairs'], 'nav': ['door']}
+    """
+    
+    def __init__(self, vocabulary: Mapping[str, Iterable[str]]):
+        """
+        Compile the matcher.
+        
+        Args:
+            vocabulary: Keywords per category; a keyword may appear in
+                several categories
+        """
+        self.categories: List[str] = list(vocabulary)
+        
+        # Keyword -> categories, and (category, keyword) -> vocabulary rank
+        self._categories: Dict[str, List[str]] = {}
+        self._rank: Dict[Tuple[str, str], int] = {}
+        for category, keywords in vocabulary.items():
+            for keyword in keywords:
+                normalized = _normalize(keyword)
+                if not normalized or (category, normalized) in self._rank:
+                    continue
+                self._categories.setdefault(normalized, []).append(category)
+                self._rank[(category, normalized)] = len(self._rank)
+        
+        trie: dict = {}
+        for keyword in self._categories:
+            node = trie.setdefault(_boundary(keyword[0], ahead=False), {})
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[_END] = _boundary(keyword[-1], ahead=True)
+        
+        # Lookbehinds keyed by first character class sit above their branches
+        pattern = "|".join(
+            lookbehind + _trie_pattern(node) for lookbehind, node in sorted(trie.items())
+        )
+        self._pattern = re.compile(pattern or r"(?!)", re.IGNORECASE)
+    
+    def finditer(self, text: str) -> Iterator[Tuple[str, str]]:
+        """
+        Yield (category, keyword) for every occurrence, in text order.
+        
+        Args:
+            text: Text to scan
+        """
+        for match in self._pattern.finditer(text):
+            keyword = _normalize(match.group(0))
+            for category in self._categories.get(keyword, ()):
+                yield category, keyword
+    
+    def find(self, text: str) -> Dict[str, List[str]]:
+        """
+        Distinct keywords found per category.
+        
+        Categories and keywords keep their vocabulary order, so results
+        do not depend on where in the text a keyword appeared.
+        
+        Args:
+            text: Text to scan
+            
+        Returns:
+            Category to matched keywords (categories without matches omitted)
+        """
+        # Ranks run category by category, so sorting restores vocabulary order
+        result: Dict[str, List[str]] = {}
+        for _, (category, keyword) in sorted({(self._rank[hit], hit) for hit in self.finditer(text)}):
+            result.setdefault(category, []).append(keyword)
+        return result
+    
+    def counts(self, text: str) -> Dict[str, int]:
+        """Number of distinct keywords found per category."""
+        return {category: len(keywords) for category, keywords in self.find(text).items()}
+    
+    def keywords(self, text: str) -> List[str]:
+        """Distinct keywords found in any category, in vocabulary order."""
+        found = sorted({(self._rank[hit], hit[1]) for hit in self.finditer(text)})
+        return list(dict.fromkeys(keyword for _, keyword in found))
+    
+    def search(self, text: str) -> bool:
+        """True if any keyword occurs in the text."""
+        return self._pattern.search(text) is not None
+    
+    def __repr__(self) -> str:
+        return f"<KeywordMatcher(categories={len(self.categories)}, keywords={len(self._categories)})>"
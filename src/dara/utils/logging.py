@@ -1,33 +1,253 @@
 """
 DARA Utilities - Logging Configuration
 Provides structured logging with configurable levels and formatting.
+
+Records are handed to a background thread (QueueHandler/QueueListener),
+so console and file I/O never run on the request path. Log calls use
+lazy %-style arguments: logger.debug("Cache hit for %s", key) costs a
+level check when DEBUG is off.
 """
 
+import atexit
+import json
 import logging
+import os
+import queue
 import sys
-from typing import Optional
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from pathlib import Path
 
 # Default format for log messages
 LOG_FORMAT = "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s"
 DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+# Records waiting for the writer thread; beyond this they are dropped
+QUEUE_SIZE = 10000
+
 # Module-level logger cache
 _loggers: dict = {}
 
+# ID of the request being served in this context (see request_scope)
+_request_id: ContextVar[Optional[str]] = ContextVar("dara_request_id", default=None)
+
+# Attributes every LogRecord has; anything else came from extra={...}
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class _State:
+    """The handlers setup_logging installed, so it can replace them."""
+    listener: Optional[QueueListener] = None
+    handlers: List[logging.Handler] = []
+    rate_limiter: Optional["RateLimitFilter"] = None
+    configured = False
+
+
+def new_request_id() -> str:
+    """A fresh request ID (32 hex characters, also used as trace ID)."""
+    return uuid.uuid4().hex
+
+
+def current_request_id() -> Optional[str]:
+    """ID of the request being served in this context, or None."""
+    return _request_id.get()
+
+
+@contextmanager
+def request_scope(request_id: Optional[str] = None) -> Iterator[str]:
+    """
+    Tag log records (and traces) inside the block with a request ID.
+    
+    Nested scopes without an explicit ID keep the enclosing request's ID.
+    
+    Args:
+        request_id: ID to use (e.g. an incoming X-Request-ID header);
+            a new one by default
+            
+    Returns:
+        The request ID in effect
+    """
+    if request_id is None and _request_id.get() is not None:
+        yield _request_id.get()
+        return
+    token = _request_id.set(request_id or new_request_id())
+    try:
+        yield _request_id.get()
+    finally:
+        _request_id.reset(token)
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the current request ID (in the logging thread)."""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Let one WARNING record per message through per interval.
+    
+    Records are keyed by logger, level and formatted message, so the
+    same warning about different modes or errors is not merged; pass
+    extra={"rate_limit_key": ...} to group differently. Only WARNING is
+    limited by default: errors always get through. Suppressed counts
+    are reported with the next record let through for the key ("[N
+    similar suppressed]" suffix and "suppressed" field), or by flush()
+    once the interval has passed, which runs as records arrive and at
+    shutdown_logging().
+    """
+    
+    def __init__(
+        self,
+        interval_seconds: float = 60.0,
+        level: int = logging.WARNING,
+        max_level: int = logging.WARNING
+    ):
+        super().__init__()
+        self.interval_seconds = interval_seconds
+        self.level = level
+        self.max_level = max_level
+        # key -> [last emitted, suppressed, logger name, level, message]
+        self._seen: Dict[Tuple[str, int, Any], List[Any]] = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not self.level <= record.levelno <= self.max_level or getattr(record, "_rate_limit_summary", False):
+            return True
+        # Shared by several handlers: decide once per record
+        decided = getattr(record, "_rate_limited", None)
+        if decided is not None:
+            return not decided
+        record._rate_limited = self._limit(record)
+        if len(self._seen) > 1000 or time.monotonic() - self._last_flush >= self.interval_seconds:
+            self.flush()
+        return not record._rate_limited
+    
+    def _limit(self, record: logging.LogRecord) -> bool:
+        """True to suppress the record."""
+        message = record.getMessage()
+        key = (record.name, record.levelno, getattr(record, "rate_limit_key", None) or message)
+        now = time.monotonic()
+        with self._lock:
+            seen = self._seen.get(key)
+            if seen is not None and now - seen[0] < self.interval_seconds:
+                seen[1] += 1
+                seen[4] = message
+                return True
+            suppressed = seen[1] if seen is not None else 0
+            self._seen[key] = [now, 0, record.name, record.levelno, message]
+        if suppressed:
+            record.suppressed = suppressed
+            record.msg = f"{message} [{suppressed} similar suppressed]"
+            record.args = None
+        return False
+    
+    def flush(self, force: bool = False) -> None:
+        """
+        Log a summary for each key with suppressed records whose interval
+        has passed (every key when force), and forget idle keys.
+        """
+        now = time.monotonic()
+        summaries = []
+        with self._lock:
+            self._last_flush = now
+            for key, seen in list(self._seen.items()):
+                if not force and now - seen[0] < self.interval_seconds:
+                    continue
+                if seen[1]:
+                    summaries.append(seen[2:] + [seen[1]])
+                del self._seen[key]
+        # Logged outside the lock: the summaries pass through this filter too
+        for name, level, message, suppressed in summaries:
+            logging.getLogger(name).log(
+                level, "%s [%d similar suppressed]", message, suppressed,
+                extra={"suppressed": suppressed, "_rate_limit_summary": True}
+            )
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    One JSON object per line: ts, level, logger, message, request_id,
+    any extra={...} fields (e.g. mode, timings) and exception.
+    """
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)) + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_") and value is not None:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _BackgroundHandler(QueueHandler):
+    """QueueHandler that never blocks: a full queue drops the record."""
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args now (they may change later) but keep extra fields and
+        # the exception text for the writer's formatter
+        record = logging.makeLogRecord(vars(record))
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
 
 def setup_logging(
     level: str = "INFO",
     log_file: Optional[str] = None,
-    format_string: Optional[str] = None
+    format_string: Optional[str] = None,
+    json_format: bool = False,
+    background: bool = True,
+    rate_limit_seconds: float = 60.0
 ) -> None:
     """
     Configure the root logger for DARA.
     
+    Replaces handlers installed by an earlier call; handlers added to
+    the "dara" logger by other code are left alone.
+    
     Args:
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_file: Optional path to write logs to file
         format_string: Optional custom format string
+        json_format: Write one JSON object per record instead
+        background: Write from a background thread (records beyond
+            QUEUE_SIZE waiting are dropped rather than blocking)
+        rate_limit_seconds: Repeats of a warning (same logger and
+            message) within this interval are suppressed (0 disables);
+            errors are never suppressed
     """
     log_level = getattr(logging, level.upper(), logging.INFO)
     fmt = format_string or LOG_FORMAT
@@ -36,28 +256,91 @@ def setup_logging(
     root_logger = logging.getLogger("dara")
     root_logger.setLevel(log_level)
     
-    # Clear existing handlers
-    root_logger.handlers.clear()
+    # Remove the handlers of a previous call
+    shutdown_logging()
     
     # Create formatter
-    formatter = logging.Formatter(fmt, datefmt=DATE_FORMAT)
+    formatter = JSONFormatter() if json_format else logging.Formatter(fmt, datefmt=DATE_FORMAT)
     
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(log_level)
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
+    writers: List[logging.Handler] = [console_handler]
     
     # Optional file handler
     if log_file:
         log_path = Path(log_file)
         log_path.parent.mkdir(parents=True, exist_ok=True)
         file_handler = logging.FileHandler(log_path, encoding="utf-8")
-        file_handler.setLevel(log_level)
         file_handler.setFormatter(formatter)
-        root_logger.addHandler(file_handler)
+        writers.append(file_handler)
+    
+    # Filters run in the calling thread, before the queue
+    filters: List[logging.Filter] = [RequestIdFilter()]
+    if rate_limit_seconds > 0:
+        _State.rate_limiter = RateLimitFilter(rate_limit_seconds)
+        filters.append(_State.rate_limiter)
+    
+    if background:
+        handler = _BackgroundHandler(queue.Queue(QUEUE_SIZE))
+        _State.listener = QueueListener(handler.queue, *writers)
+        _State.listener.start()
+        _State.handlers = [handler]
+    else:
+        _State.handlers = writers
     
-    root_logger.info(f"DARA logging initialized at {level} level")
+    for handler in _State.handlers:
+        for log_filter in filters:
+            handler.addFilter(log_filter)
+        root_logger.addHandler(handler)
+    _State.configured = True
+    
+    root_logger.info("DARA logging initialized at %s level", level)
+
+
+def ensure_logging(level: str = "INFO") -> None:
+    """
+    Configure logging on first use, then only adjust the level.
+    
+    What DARA() calls, so constructing several models neither resets an
+    application's setup_logging() nor restarts the writer. The first
+    setup honours DARA_LOG_FILE and DARA_LOG_FORMAT ("json").
+    
+    Args:
+        level: Logging level
+    """
+    if _State.configured:
+        logging.getLogger("dara").setLevel(getattr(logging, level.upper(), logging.INFO))
+        return
+    setup_logging(
+        level=level,
+        log_file=os.getenv("DARA_LOG_FILE") or None,
+        json_format=os.getenv("DARA_LOG_FORMAT", "text").lower() == "json"
+    )
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and remove the handlers setup_logging installed."""
+    root_logger = logging.getLogger("dara")
+    if _State.rate_limiter is not None:
+        # Report what is still suppressed before the handlers go
+        _State.rate_limiter.flush(force=True)
+        _State.rate_limiter = None
+    for handler in _State.handlers:
+        root_logger.removeHandler(handler)
+    if _State.listener is not None:
+        _State.listener.stop()  # drains the queue first
+        for handler in _State.listener.handlers:
+            handler.close()
+        _State.listener = None
+    else:
+        for handler in _State.handlers:
+            handler.close()
+    _State.handlers = []
+    _State.configured = False
+
+
+atexit.register(shutdown_logging)
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -66,7 +349,7 @@ def get_logger(name: str) -> logging.Logger:
     
     Args:
         name: Logger name (will be prefixed with 'dara.')
-    
+        
     Returns:
         Configured logger instance
     """
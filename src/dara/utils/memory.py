@@ -0,0 +1,359 @@
+"""
+DARA Utilities - Memory Profiling
+Resident memory, torch allocator statistics and tracemalloc allocations
+per detect stage, and memory retained across requests.
+"""
+
+import gc
+import os
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+import torch
+
+from .timing import StageTimer
+
+# Optional: accurate RSS on every platform
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# Allocations made by the profiler itself
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def resident_memory_bytes() -> Optional[int]:
+    """Resident set size of this process (None if it cannot be read)."""
+    if PSUTIL_AVAILABLE:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def peak_resident_memory_bytes() -> Optional[int]:
+    """Highest RSS since start or the last reset_peak_resident_memory()."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak if peak > 1 << 32 else peak * 1024
+    except (ImportError, AttributeError):
+        return None
+
+
+def reset_peak_resident_memory() -> bool:
+    """Restart the peak RSS from the current RSS (Linux only); True on success."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def torch_memory_stats() -> Dict[str, int]:
+    """Torch allocator bytes on the accelerator in use (empty on CPU)."""
+    if torch.cuda.is_available() and torch.cuda.is_initialized():
+        return {
+            "allocated": torch.cuda.memory_allocated(),
+            "reserved": torch.cuda.memory_reserved(),
+            "peak_allocated": torch.cuda.max_memory_allocated(),
+        }
+    mps = getattr(torch, "mps", None)
+    if mps is not None and torch.backends.mps.is_available():
+        return {"allocated": mps.current_allocated_memory(), "reserved": mps.driver_allocated_memory()}
+    return {}
+
+
+def _reset_torch_peak() -> None:
+    if torch.cuda.is_available() and torch.cuda.is_initialized():
+        torch.cuda.reset_peak_memory_stats()
+
+
+def _reset_traced_peak() -> None:
+    # tracemalloc.reset_peak is Python 3.9+; earlier peaks run from start
+    reset = getattr(tracemalloc, "reset_peak", None)
+    if reset is not None:
+        reset()
+
+
+def _top_allocators(after: tracemalloc.Snapshot, before: tracemalloc.Snapshot, top_n: int) -> List[dict]:
+    """Source lines that allocated the most between two snapshots."""
+    top = []
+    for diff in after.compare_to(before, "lineno")[:top_n]:
+        if diff.size_diff <= 0:
+            break
+        frame = diff.traceback[0]
+        top.append({
+            "where": f"{frame.filename}:{frame.lineno}",
+            "size_diff": diff.size_diff,
+            "count_diff": diff.count_diff,
+        })
+    return top
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(_IGNORED)
+
+
+class _Mark:
+    """Memory readings as a stage opened, and the highest peaks seen inside it."""
+    __slots__ = ("rss", "traced", "torch", "rss_peak", "traced_peak", "torch_peak", "snapshot")
+    
+    def __init__(self, snapshot: Optional[tracemalloc.Snapshot]):
+        self.rss = resident_memory_bytes() or 0
+        self.traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        self.torch = torch_memory_stats().get("allocated", 0)
+        self.rss_peak = self.traced_peak = self.torch_peak = 0
+        self.snapshot = snapshot
+
+
+class MemoryStageTimer(StageTimer):
+    """
+    StageTimer that also measures memory for every stage.
+    
+    Per stage: RSS change, peak RSS, peak Python allocation (tracemalloc,
+    if tracing) and peak torch allocation above the stage's start, and
+    optionally the source lines that allocated most in it. Peaks are
+    restarted as each stage opens and folded into the enclosing stage
+    as it closes, so an outer stage's peak covers its nested ones.
+    
+    Snapshots make stages much slower; timings taken with them are not
+    comparable with normal runs.
+    """
+    
+    def __init__(self, top_n: int = 5, snapshots: bool = True):
+        """
+        Args:
+            top_n: Top allocating source lines to keep per stage
+            snapshots: Take tracemalloc snapshots to find those lines
+        """
+        super().__init__()
+        self.top_n = top_n
+        self.snapshots = snapshots and top_n > 0
+        self.memory: Dict[str, Dict[str, Any]] = {}
+        self.request: Dict[str, int] = {}
+        self._marks: List[_Mark] = []
+    
+    def __enter__(self) -> "MemoryStageTimer":
+        self.stage_started("")
+        return super().__enter__()
+    
+    def __exit__(self, *exc) -> None:
+        super().__exit__(*exc)
+        self.request = self._close("")
+    
+    def stage_started(self, name: str) -> None:
+        # Fold peaks so far into the enclosing stage before restarting them
+        if self._marks:
+            self._fold(self._marks[-1])
+        reset_peak_resident_memory()
+        _reset_traced_peak()
+        _reset_torch_peak()
+        self._marks.append(_Mark(_snapshot() if self.snapshots and tracemalloc.is_tracing() else None))
+    
+    def stage_finished(self, name: str) -> None:
+        usage = self._close(name)
+        entry = self.memory.setdefault(name, {
+            "calls": 0, "rss_delta": 0, "rss_peak": 0, "traced_peak": 0, "torch_peak": 0, "top": []
+        })
+        entry["calls"] += 1
+        entry["rss_delta"] += usage["rss_delta"]
+        for key in ("rss_peak", "traced_peak", "torch_peak"):
+            entry[key] = max(entry[key], usage[key])
+        if "top" in usage:
+            entry["top"] = _merge_top(entry["top"] + usage["top"], self.top_n)
+    
+    def _fold(self, mark: _Mark) -> None:
+        """Record the peaks since the last reset in a mark."""
+        mark.rss_peak = max(mark.rss_peak, peak_resident_memory_bytes() or 0)
+        if tracemalloc.is_tracing():
+            mark.traced_peak = max(mark.traced_peak, tracemalloc.get_traced_memory()[1])
+        mark.torch_peak = max(mark.torch_peak, torch_memory_stats().get("peak_allocated", 0))
+    
+    def _close(self, name: str) -> Dict[str, Any]:
+        """Pop a stage's mark and return its usage (bytes above its start)."""
+        mark = self._marks.pop()
+        self._fold(mark)
+        usage = {
+            "rss_delta": (resident_memory_bytes() or 0) - mark.rss,
+            "rss_peak": max(0, mark.rss_peak - mark.rss),
+            "traced_peak": max(0, mark.traced_peak - mark.traced),
+            "torch_peak": max(0, mark.torch_peak - mark.torch),
+        }
+        if mark.snapshot is not None:
+            usage["top"] = _top_allocators(_snapshot(), mark.snapshot, self.top_n)
+        if self._marks:
+            parent = self._marks[-1]
+            parent.rss_peak = max(parent.rss_peak, mark.rss_peak)
+            parent.traced_peak = max(parent.traced_peak, mark.traced_peak)
+            parent.torch_peak = max(parent.torch_peak, mark.torch_peak)
+        return usage
+
+
+def _merge_top(entries: List[dict], top_n: int) -> List[dict]:
+    """Sum allocator entries by source line and keep the largest."""
+    merged: Dict[str, dict] = {}
+    for entry in entries:
+        total = merged.setdefault(entry["where"], {"where": entry["where"], "size_diff": 0, "count_diff": 0})
+        total["size_diff"] += entry["size_diff"]
+        total["count_diff"] += entry["count_diff"]
+    return sorted(merged.values(), key=lambda e: e["size_diff"], reverse=True)[:top_n]
+
+
+class MemoryProfiler:
+    """
+    Opt-in memory profile of detect calls, per mode and per stage.
+    
+    Reports, per mode, the peak RSS, Python and torch memory of a
+    request above its start, the same per stage with the top allocating
+    source lines, and the memory each request left behind (measured
+    after a garbage collection) - steady growth there is a leak, in a
+    cache, the TTS executor or elsewhere. The lines that grew most over
+    the whole run are listed too.
+    
+    Example:
+        >>> profiler = MemoryProfiler()
+        >>> with profiler:
+        ...     for path in images:
+        ...         profiler.detect(dara, path, mode="scene")
+        >>> report = profiler.report()
+    """
+    
+    def __init__(self, top_n: int = 5, snapshots: bool = True, frames: int = 1):
+        """
+        Args:
+            top_n: Top allocating source lines to report per stage
+            snapshots: Find those lines with tracemalloc snapshots (slow)
+            frames: Traceback frames tracemalloc keeps per allocation
+        """
+        self.top_n = top_n
+        self.snapshots = snapshots
+        self.frames = frames
+        self.modes: Dict[str, Dict[str, Any]] = {}
+        self.baseline: Dict[str, int] = {}
+        self._started_tracing = False
+        self._first: Optional[tracemalloc.Snapshot] = None
+    
+    def start(self) -> None:
+        """Start tracing allocations and record the baseline."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._started_tracing = True
+        self.baseline = self._usage()
+    
+    def stop(self) -> None:
+        """Stop tracing (if this profiler started it)."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+    
+    def __enter__(self) -> "MemoryProfiler":
+        self.start()
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        self.stop()
+    
+    @staticmethod
+    def _usage() -> Dict[str, int]:
+        """Memory in use after a full collection."""
+        gc.collect()
+        return {
+            "rss": resident_memory_bytes() or 0,
+            "traced": tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0,
+            "torch": torch_memory_stats().get("allocated", 0),
+        }
+    
+    def detect(self, dara, image_input, mode: str = "scene", **kwargs) -> Dict[str, Any]:
+        """
+        Run dara.detect under the profiler.
+        
+        Args:
+            dara: DARA instance
+            image_input: Image for detect
+            mode: Detection mode
+            **kwargs: Other detect arguments
+            
+        Returns:
+            detect's result, with "timings" (taken while profiling)
+        """
+        before = self._usage()
+        with MemoryStageTimer(self.top_n, self.snapshots) as timer:
+            result = dara.detect(image_input, mode=mode, **kwargs)
+        after = self._usage()
+        if self._first is None and tracemalloc.is_tracing() and self.snapshots:
+            self._first = _snapshot()
+        
+        stats = self.modes.setdefault(mode, {"requests": 0, "peaks": {}, "retained": [], "stages": {}})
+        stats["requests"] += 1
+        for key in ("rss_peak", "traced_peak", "torch_peak"):
+            stats["peaks"][key] = max(stats["peaks"].get(key, 0), timer.request[key])
+        stats["retained"].append({key: after[key] - before[key] for key in after})
+        for name, usage in timer.memory.items():
+            entry = stats["stages"].setdefault(name, {"rss_peak": 0, "traced_peak": 0, "torch_peak": 0, "top": []})
+            for key in ("rss_peak", "traced_peak", "torch_peak"):
+                entry[key] = max(entry[key], usage[key])
+            entry["top"] = _merge_top(entry["top"] + usage["top"], self.top_n)
+        
+        return {**result, "timings": timer.to_dict()}
+    
+    def report(self) -> Dict[str, Any]:
+        """
+        Summarize everything profiled so far (bytes throughout).
+        
+        Returns:
+            Dictionary with:
+                - baseline: rss, traced and torch memory at start()
+                - current: the same now
+                - modes: per mode, requests, peak_* (highest request
+                  peak above its start), retained_* (left behind by all
+                  its requests), retained_per_request_* (mean over the
+                  later half, after caches warmed up) and stages (peaks
+                  and top allocators per stage)
+                - top_growth: source lines that grew most since the
+                  first profiled request
+        """
+        modes = {}
+        for mode, stats in self.modes.items():
+            retained = stats["retained"]
+            later = retained[len(retained) // 2:] or retained
+            summary = {"requests": stats["requests"]}
+            summary.update({f"peak_{key[:-5]}": value for key, value in stats["peaks"].items()})
+            for key in ("rss", "traced", "torch"):
+                summary[f"retained_{key}"] = sum(r[key] for r in retained)
+                summary[f"retained_per_request_{key}"] = sum(r[key] for r in later) / len(later)
+            summary["stages"] = stats["stages"]
+            modes[mode] = summary
+        
+        report = {"baseline": self.baseline, "current": self._usage(), "modes": modes}
+        if self._first is not None and tracemalloc.is_tracing():
+            report["top_growth"] = _top_allocators(_snapshot(), self._first, self.top_n)
+        return report
+
+
+def format_bytes(value: float) -> str:
+    """Human-readable byte count ("12.3 MB")."""
+    sign = "-" if value < 0 else ""
+    value = abs(value)
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024 or unit == "GB":
+            return f"{sign}{value:.0f} {unit}" if unit == "B" else f"{sign}{value:.1f} {unit}"
+        value /= 1024
@@ -0,0 +1,196 @@
+"""
+DARA Utilities - Request Profiling
+cProfile and torch.profiler traces of selected detect calls, on demand.
+"""
+
+import cProfile
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+from itertools import count
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence
+
+import torch
+
+from .logging import current_request_id, get_logger, new_request_id
+
+logger = get_logger("profiling")
+
+TOOLS = ("cprofile", "torch")
+
+
+class RequestProfiler:
+    """
+    Profile selected detect calls and write one trace per request.
+    
+    A request is profiled when any trigger fires:
+    - always: every request (what DARA.profiling() uses)
+    - every_n: every Nth request
+    - slower_than_ms: a request is only known to be slow once it has
+      run, so a slow request arms profiling of the next
+      ``capture_after_slow`` requests of the same mode
+      
+    Profiled requests write ``<request_id>-<mode>.pstats`` (cProfile,
+    open with pstats or snakeviz) and/or ``<request_id>-<mode>.trace.json``
+    (torch.profiler Chrome trace, open in chrome://tracing or Perfetto)
+    to output_dir, and their result gains a "profile" entry naming them.
+    One request is profiled at a time; others run unprofiled meanwhile
+    (a slow-request capture that meets a busy profiler stays armed for
+    the next request of its mode).
+    Requests that trigger nothing pay a counter increment and, with
+    slower_than_ms, two clock reads.
+    
+    Example:
+        >>> dara = DARA(profile=RequestProfiler(every_n=100, slower_than_ms=2000))
+        >>> result = dara.detect("photo.jpg")
+        >>> result.get("profile")  # present on profiled requests
+    """
+    
+    def __init__(
+        self,
+        output_dir: str = ".cache/profiles",
+        tools: Sequence[str] = ("cprofile",),
+        every_n: int = 0,
+        slower_than_ms: Optional[float] = None,
+        capture_after_slow: int = 1,
+        always: bool = False,
+        record_shapes: bool = False,
+        with_stack: bool = False
+    ):
+        """
+        Initialize request profiler.
+        
+        Args:
+            output_dir: Folder for trace files (created on first trace)
+            tools: "cprofile" and/or "torch"
+            every_n: Profile every Nth request (0 disables)
+            slower_than_ms: Arm profiling of a mode after a request of it
+                takes longer than this
+            capture_after_slow: Requests to profile once armed
+            always: Profile every request
+            record_shapes: torch.profiler: record operator input shapes
+            with_stack: torch.profiler: record Python stacks (slower)
+        """
+        for tool in tools:
+            if tool not in TOOLS:
+                raise ValueError(f"Invalid profiling tool '{tool}'. Available: {', '.join(TOOLS)}")
+        self.output_dir = Path(output_dir)
+        self.tools = tuple(tools)
+        self.every_n = every_n
+        self.slower_than_ms = slower_than_ms
+        self.capture_after_slow = capture_after_slow
+        self.always = always
+        self.record_shapes = record_shapes
+        self.with_stack = with_stack
+        
+        # Recently written profiles, newest last
+        self.profiles: Deque[Dict[str, Any]] = deque(maxlen=100)
+        self._counter = count(1)
+        self._armed: Dict[str, int] = {}
+        self._busy = threading.Lock()
+    
+    def run(self, mode: str, fn: Callable[..., Dict[str, Any]], *args, **kwargs) -> Dict[str, Any]:
+        """
+        Run one request, profiling it if a trigger fires.
+        
+        Args:
+            mode: Request mode (slow-request arming is per mode)
+            fn: The request (DARA.detect), called with args and kwargs
+            
+        Returns:
+            fn's result, plus "profile" (request_id, trigger, elapsed_ms,
+            files) when profiled
+        """
+        trigger = self._trigger(mode)
+        if trigger is not None and not self._busy.acquire(blocking=False):
+            if trigger == "after_slow":
+                # Keep the capture for the next request of this mode
+                self._armed[mode] = self._armed.get(mode, 0) + 1
+            trigger = None
+        if trigger is None:
+            if self.slower_than_ms is None:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            self._check_slow(mode, (time.perf_counter() - start) * 1000)
+            return result
+        
+        try:
+            return self._profile(mode, trigger, fn, args, kwargs)
+        finally:
+            self._busy.release()
+    
+    def _trigger(self, mode: str) -> Optional[str]:
+        """Why this request should be profiled, or None."""
+        n = next(self._counter)
+        if self.always:
+            return "always"
+        if self.every_n and n % self.every_n == 0:
+            return f"every_{self.every_n}"
+        if self._armed.get(mode):
+            self._armed[mode] -= 1
+            return "after_slow"
+        return None
+    
+    def _check_slow(self, mode: str, elapsed_ms: float) -> None:
+        if elapsed_ms > self.slower_than_ms and not self._armed.get(mode):
+            self._armed[mode] = self.capture_after_slow
+            logger.warning(
+                "Slow %s request (%.0f ms > %.0f ms); profiling the next %d",
+                mode, elapsed_ms, self.slower_than_ms, self.capture_after_slow
+            )
+    
+    def _profile(self, mode: str, trigger: str, fn: Callable, args: tuple, kwargs: dict) -> Dict[str, Any]:
+        request_id = current_request_id() or new_request_id()
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stem = self.output_dir / f"{request_id}-{mode}"
+        
+        profiler = cProfile.Profile() if "cprofile" in self.tools else None
+        torch_profiler = self._torch_profiler() if "torch" in self.tools else None
+        
+        with ExitStack() as stack:
+            if torch_profiler is not None:
+                stack.enter_context(torch_profiler)
+            if profiler is not None:
+                profiler.enable()
+                stack.callback(profiler.disable)
+            start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+        
+        files: List[str] = []
+        if profiler is not None:
+            profiler.dump_stats(f"{stem}.pstats")
+            files.append(f"{stem}.pstats")
+        if torch_profiler is not None:
+            torch_profiler.export_chrome_trace(f"{stem}.trace.json")
+            files.append(f"{stem}.trace.json")
+        
+        profile = {
+            "request_id": request_id,
+            "mode": mode,
+            "trigger": trigger,
+            "elapsed_ms": round(elapsed_ms, 3),
+            "files": files,
+        }
+        self.profiles.append(profile)
+        logger.info("Profiled request %s (%s, %.0f ms): %s", request_id, trigger, elapsed_ms, ", ".join(files))
+        return {**result, "profile": profile}
+    
+    def _torch_profiler(self) -> "torch.profiler.profile":
+        activities = [torch.profiler.ProfilerActivity.CPU]
+        if torch.cuda.is_available():
+            activities.append(torch.profiler.ProfilerActivity.CUDA)
+        return torch.profiler.profile(
+            activities=activities,
+            record_shapes=self.record_shapes,
+            with_stack=self.with_stack
+        )
+    
+    def __repr__(self) -> str:
+        return (
+            f"<RequestProfiler(tools={self.tools}, every_n={self.every_n}, "
+            f"slower_than_ms={self.slower_than_ms}, always={self.always})>"
+        )
@@ -13,6 +13,15 @@ class TextUtils:
     # Special tokens to remove
     SPECIAL_TOKENS = ["</s>", "<s>", "<pad>", "[PAD]", "[CLS]", "[SEP]"]
     
+    # Precompiled patterns (these run on every model output)
+    _WHITESPACE = re.compile(r'\s+')
+    _NUMBER = re.compile(r'\d+(?:[.,]\d+)*')
+    _DOSAGE = re.compile(r'(\d+(?:[.,]\d+)?\s*(?:mg|ml|g|mcg|IU|tablet|capsule|cap|tab)s?)', re.IGNORECASE)
+    _DOT_THOUSANDS = re.compile(r'(\d)\.(\d{3})')
+    _COMMA_THOUSANDS = re.compile(r'(\d),(\d{3})')
+    # Neither alphanumeric (str.isalnum) nor a space; \w also admits "_"
+    _SPECIAL_CHAR = re.compile(r'[^\w ]|_')
+    
     @staticmethod
     def clean(text: str) -> str:
         """
@@ -31,7 +40,7 @@ class TextUtils:
             text = text.replace(token, "")
         
         # Clean up whitespace
-        text = re.sub(r'\s+', ' ', text)
+        text = TextUtils._WHITESPACE.sub(' ', text)
         return text.strip()
     
     @staticmethod
@@ -45,8 +54,7 @@ class TextUtils:
         Returns:
             List of number strings found
         """
-        pattern = r'\d+(?:[.,]\d+)*'
-        return re.findall(pattern, text)
+        return TextUtils._NUMBER.findall(text)
     
     @staticmethod
     def extract_dosage(text: str) -> list[str]:
@@ -59,8 +67,7 @@ class TextUtils:
         Returns:
             List of dosage strings found
         """
-        pattern = r'(\d+(?:[.,]\d+)?\s*(?:mg|ml|g|mcg|IU|tablet|capsule|cap|tab)s?)'
-        return re.findall(pattern, text, re.IGNORECASE)
+        return TextUtils._DOSAGE.findall(text)
     
     @staticmethod
     def normalize_currency(text: str) -> str:
@@ -74,8 +81,8 @@ class TextUtils:
             Normalized text without thousand separators
         """
         # Remove dots/commas used as thousand separators
-        text = re.sub(r'(\d)\.(\d{3})', r'\1\2', text)
-        text = re.sub(r'(\d),(\d{3})', r'\1\2', text)
+        text = TextUtils._DOT_THOUSANDS.sub(r'\1\2', text)
+        text = TextUtils._COMMA_THOUSANDS.sub(r'\1\2', text)
         return text
     
     @staticmethod
@@ -98,12 +105,28 @@ class TextUtils:
             return False
         
         # Check for excessive special characters
-        special_ratio = sum(1 for c in text if not c.isalnum() and c != ' ') / len(text)
+        special_ratio = TextUtils.count_special(text) / len(text)
         if special_ratio > 0.3:
             return False
         
         return True
     
+    @staticmethod
+    def count_special(text: str) -> int:
+        """
+        Count characters that are neither alphanumeric nor a space.
+        
+        Same result as ``sum(1 for c in text if not c.isalnum() and c != ' ')``
+        in a single regex scan.
+        
+        Args:
+            text: Text to scan
+            
+        Returns:
+            Number of special characters
+        """
+        return len(TextUtils._SPECIAL_CHAR.findall(text))
+    
     @staticmethod
     def truncate(text: str, max_length: int = 200, suffix: str = "...") -> str:
         """
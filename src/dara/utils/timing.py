@@ -0,0 +1,118 @@
+"""
+DARA Utilities - Stage Timing
+Per-stage latency breakdown of a request, collected through a context variable.
+"""
+
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import ContextManager, Dict, List, Optional
+
+# Timer of the request running in this context (None when not timing)
+_active: ContextVar[Optional["StageTimer"]] = ContextVar("dara_stage_timer", default=None)
+
+# Shared no-op returned by stage() when nothing is being timed
+_NOT_TIMING = nullcontext()
+
+
+def stage(name: str) -> ContextManager:
+    """
+    Time a block as a named stage of the current request.
+    
+    A no-op (one context variable lookup) unless a StageTimer is active.
+    
+    Example:
+        >>> with stage("generate"):
+        ...     model.generate(...)
+    """
+    timer = _active.get()
+    if timer is None:
+        return _NOT_TIMING
+    return _Stage(timer, name)
+
+
+def current_timer() -> Optional["StageTimer"]:
+    """StageTimer active in this context, if any."""
+    return _active.get()
+
+
+class _Stage:
+    """One open stage; its time excludes nested stages."""
+    __slots__ = ("timer", "name", "start", "children_ms")
+    
+    def __init__(self, timer: "StageTimer", name: str):
+        self.timer = timer
+        self.name = name
+    
+    def __enter__(self) -> "_Stage":
+        stack = self.timer._stack
+        if stack:
+            self.name = f"{stack[-1].name}/{self.name}"
+        stack.append(self)
+        self.timer.stage_started(self.name)
+        self.children_ms = 0.0
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        elapsed = (time.perf_counter() - self.start) * 1000
+        stack = self.timer._stack
+        stack.pop()
+        if stack:
+            stack[-1].children_ms += elapsed
+        self.timer.add(self.name, elapsed - self.children_ms)
+        self.timer.stage_finished(self.name)
+
+
+class StageTimer:
+    """
+    Wall-clock time per stage for one request.
+    
+    Stages opened inside another stage are recorded under a nested name
+    ("escalate/generate") and excluded from the outer stage, so stage
+    times never overlap and add up to the request's total; time outside
+    any stage is reported as "other".
+    
+    Example:
+        >>> with StageTimer() as timer:
+        ...     with stage("load"):
+        ...         image = load(path)
+        >>> timer.to_dict()
+        {'load': 12.3, 'other': 0.01, 'total': 12.31}
+    """
+    
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.total_ms = 0.0
+        self._stack: List[_Stage] = []
+        self._start = 0.0
+        self._token = None
+    
+    def __enter__(self) -> "StageTimer":
+        self._start = time.perf_counter()
+        self._token = _active.set(self)
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        _active.reset(self._token)
+        self.total_ms = (time.perf_counter() - self._start) * 1000
+    
+    def stage_started(self, name: str) -> None:
+        """Called as a stage opens; subclasses measure more than time here."""
+    
+    def stage_finished(self, name: str) -> None:
+        """Called as a stage closes, after its time was added."""
+    
+    def add(self, name: str, elapsed_ms: float) -> None:
+        """Add time to a stage (stages repeated within a request accumulate)."""
+        self.stages[name] = self.stages.get(name, 0.0) + elapsed_ms
+    
+    def to_dict(self) -> Dict[str, float]:
+        """Milliseconds per stage, plus "other" and "total"."""
+        result = {name: round(ms, 3) for name, ms in self.stages.items()}
+        result["other"] = round(max(0.0, self.total_ms - sum(self.stages.values())), 3)
+        result["total"] = round(self.total_ms, 3)
+        return result
+    
+    def __repr__(self) -> str:
+        return f"<StageTimer(stages={len(self.stages)}, total_ms={self.total_ms:.1f})>"